@@ -1,17 +1,35 @@
 from .shield import AdaptiveShield, RateLimitStrategy
 from .strategies import (
     TokenBucketStrategy,
+    GCRAStrategy,
     SlidingWindowCounterStrategy,
     LeakyBucketStrategy, 
     AdaptiveWindowStrategy
 )
+from .state import ClientStateStore
+from .clock import Clock, MonotonicClock, WallClock, CachedClock, VirtualClock
+from .aio import AsyncAdaptiveShield, RateLimitMiddleware
+from .metrics import LatencyHistogram
+from .routing import RouteMatcher, RouteNormalizer
 
 __version__ = "1.0.0"
 __all__ = [
     "AdaptiveShield",
     "RateLimitStrategy",
     "TokenBucketStrategy",
+    "GCRAStrategy",
     "SlidingWindowCounterStrategy",
     "LeakyBucketStrategy",
     "AdaptiveWindowStrategy",
+    "ClientStateStore",
+    "Clock",
+    "MonotonicClock",
+    "WallClock",
+    "CachedClock",
+    "VirtualClock",
+    "AsyncAdaptiveShield",
+    "RateLimitMiddleware",
+    "LatencyHistogram",
+    "RouteMatcher",
+    "RouteNormalizer",
 ] 
\ No newline at end of file
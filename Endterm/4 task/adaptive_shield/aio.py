@@ -0,0 +1,284 @@
+"""
+Asyncio Support for AdaptiveShield
+
+This module provides an asyncio front end for AdaptiveShield and a pure ASGI
+middleware that rate limits every request passing through an application.
+
+`AdaptiveShield` runs its monitoring in a background thread, which takes the
+metrics lock while it cleans up and aggregates metrics. Request handlers on an
+event loop that hit that lock stall the whole loop. `AsyncAdaptiveShield`
+instead runs maintenance as a task on the event loop itself, so all shield
+state is only ever touched from the loop thread: the strategy and metrics
+locks are always uncontended and a request check never waits.
+"""
+
+import asyncio
+import json
+import math
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Callable, Awaitable
+
+from .shield import AdaptiveShield, RateLimitStrategy
+
+logger = logging.getLogger("AdaptiveShield")
+
+
+class AsyncAdaptiveShield:
+    """
+    Asyncio-native adaptive rate limiter.
+    
+    Wraps an in-memory AdaptiveShield without a monitor thread. Request checks
+    are awaitable and run inline on the event loop (a check is a few dict and
+    array operations, far cheaper than a thread hop), and monitoring and
+    adaptation run as an asyncio task started by `start()`.
+    
+    Example:
+        shield = AsyncAdaptiveShield(default_limit=100, default_window=60)
+        await shield.start()
+        allowed = await shield.check_request("client", "/api/users")
+        await shield.close()
+    """
+    
+    def __init__(self, monitor_interval: int = 30, **shield_kwargs: Any):
+        """
+        Initialize the async rate limiter.
+        
+        Args:
+            monitor_interval: How often to run monitoring and adaptation (seconds,
+                              0 disables the maintenance task)
+            **shield_kwargs: Any other AdaptiveShield constructor argument
+        """
+        self.shield = AdaptiveShield(monitor_interval=0, **shield_kwargs)
+        self._monitor_interval = monitor_interval
+        self._monitor_task: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Start the maintenance task on the running event loop."""
+        if self._monitor_interval > 0 and self._monitor_task is None:
+            self._monitor_task = asyncio.get_running_loop().create_task(self._monitor_loop())
+    
+    async def close(self) -> None:
+        """Stop the maintenance task."""
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+    
+    async def __aenter__(self) -> "AsyncAdaptiveShield":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+    
+    async def _monitor_loop(self) -> None:
+        """Maintenance task for monitoring and adaptation."""
+        while True:
+            await asyncio.sleep(self._monitor_interval)
+            try:
+                await self._clean_old_metrics()
+                self.shield._update_metrics()
+                self.shield._adapt_limits()
+            except Exception as e:
+                logger.error(f"Error in monitoring task: {e}")
+    
+    async def _clean_old_metrics(self) -> None:
+        """Expire old metrics in slices, yielding to request handlers in between."""
+        shield = self.shield
+        current_time = shield._now()
+        threshold = current_time - shield._metrics_retention
+        while not shield._metrics.expire(threshold, current_time, shield.metrics_cleanup_slice):
+            await asyncio.sleep(0)
+    
+    async def check_request(
+        self,
+        client_id: str,
+        route: str = None,
+        metadata: Dict[str, Any] = None
+    ) -> bool:
+        """
+        Check if a request should be allowed based on rate limits.
+        
+        Args:
+            client_id: Identifier for the client making the request
+            route: Optional API route being accessed
+            metadata: Optional additional metadata about the request
+        
+        Returns:
+            bool: True if the request should be allowed, False if it should be rejected
+        """
+        return self.shield.check_request(client_id, route, metadata)
+    
+    async def check_requests_batch(
+        self,
+        requests: Sequence[Tuple[str, Optional[str]]]
+    ) -> List[bool]:
+        """
+        Check a batch of requests at once.
+        
+        Args:
+            requests: Sequence of (client_id, route) pairs
+        
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        return self.shield.check_requests_batch(requests)
+    
+    async def get_retry_after(self, client_id: str, route: str = None) -> Optional[float]:
+        """
+        Get how long a client has to wait before its next request is allowed.
+        
+        Args:
+            client_id: Identifier for the client
+            route: Optional API route being accessed
+        
+        Returns:
+            Optional[float]: Seconds to wait, or None if the strategy cannot tell
+        """
+        return self.shield.get_retry_after(client_id, route)
+    
+    def set_client_limit(
+        self,
+        client_id: str,
+        limit: int,
+        window: Optional[int] = None,
+        strategy: Optional[RateLimitStrategy] = None
+    ) -> None:
+        """Set a custom rate limit for a specific client."""
+        self.shield.set_client_limit(client_id, limit, window, strategy)
+    
+    def set_route_limit(
+        self,
+        route: str,
+        limit: int,
+        window: Optional[int] = None,
+        strategy: RateLimitStrategy = None
+    ) -> None:
+        """Set a custom rate limit for a specific route."""
+        self.shield.set_route_limit(route, limit, window, strategy)
+    
+    def set_client_route_limit(
+        self,
+        client_id: str,
+        route: str,
+        limit: int,
+        window: Optional[int] = None,
+        strategy: Optional[RateLimitStrategy] = None
+    ) -> None:
+        """Set a custom rate limit for a specific client on a specific route."""
+        self.shield.set_client_route_limit(client_id, route, limit, window, strategy)
+    
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Get detailed statistics for a specific client."""
+        return self.shield.get_client_stats(client_id)
+    
+    def get_route_stats(self, route: str) -> Dict[str, Any]:
+        """Get detailed statistics for a specific route."""
+        return self.shield.get_route_stats(route)
+    
+    def get_global_stats(self) -> Dict[str, Any]:
+        """Get global statistics for the rate limiter."""
+        return self.shield.get_global_stats()
+
+
+def default_client_id(scope: Dict[str, Any]) -> str:
+    """
+    Identify the client of an ASGI request.
+    
+    Uses the X-API-Key header when present and the peer address otherwise.
+    
+    Args:
+        scope: ASGI connection scope
+    
+    Returns:
+        str: Client identifier
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"x-api-key":
+            return value.decode("latin-1")
+    
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware that rate limits HTTP requests.
+    
+    Works with any shield exposing `async check_request(client_id, route)`,
+    such as AsyncAdaptiveShield or an async distributed shield. Rejected
+    requests get a 429 JSON response with a Retry-After header, taken from
+    the shield's `get_retry_after` when it can compute one.
+    
+    Example:
+        app.add_middleware(RateLimitMiddleware, shield=shield, path_prefixes=["/api/"])
+    """
+    
+    def __init__(
+        self,
+        app: Callable[..., Awaitable[None]],
+        shield: Any,
+        client_id_func: Callable[[Dict[str, Any]], str] = default_client_id,
+        path_prefixes: Optional[Sequence[str]] = None,
+        default_retry_after: int = 60
+    ):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The ASGI application to wrap
+            shield: Rate limiter with an awaitable `check_request`
+            client_id_func: Function mapping an ASGI scope to a client id
+            path_prefixes: Only paths starting with one of these are rate limited
+                           (None limits every path)
+            default_retry_after: Retry-After value when the shield cannot compute one
+        """
+        self.app = app
+        self.shield = shield
+        self.client_id_func = client_id_func
+        self.path_prefixes = tuple(path_prefixes) if path_prefixes is not None else None
+        self.default_retry_after = default_retry_after
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        route = scope["path"]
+        if self.path_prefixes is not None and not route.startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        client_id = self.client_id_func(scope)
+        
+        if await self.shield.check_request(client_id, route):
+            await self.app(scope, receive, send)
+            return
+        
+        retry_after = None
+        get_retry_after = getattr(self.shield, "get_retry_after", None)
+        if get_retry_after is not None:
+            retry_after = await get_retry_after(client_id, route)
+        if retry_after is None:
+            retry_after = self.default_retry_after
+        
+        body = json.dumps({
+            "error": "Too Many Requests",
+            "message": "Rate limit exceeded. Please slow down your requests.",
+            "client_id": client_id,
+            "route": route
+        }).encode("utf-8")
+        
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1"))
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,135 @@
+"""
+Time Sources for AdaptiveShield
+
+This module contains the clocks used by the rate limiting strategies and the
+shield. Rate limiting only needs elapsed time, so the default clock is
+monotonic and unaffected by NTP adjustments to the wall clock. A cached clock
+trades resolution for a cheaper read on the hot path, and a virtual clock lets
+simulations and benchmarks fast-forward time deterministically.
+"""
+
+import time
+import threading
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """Base class for all time sources."""
+    
+    @abstractmethod
+    def now(self) -> float:
+        """
+        Get the current time.
+        
+        Returns:
+            float: Current time in seconds. Only differences between readings
+                   of the same clock are meaningful.
+        """
+        pass
+
+
+class MonotonicClock(Clock):
+    """Clock backed by `time.monotonic_ns`, immune to wall clock slews."""
+    
+    def now(self) -> float:
+        return time.monotonic_ns() * 1e-9
+
+
+class WallClock(Clock):
+    """
+    Clock backed by `time.time`.
+    
+    Use this only when timestamps have to be compared across processes or
+    hosts, for example state shared through Redis.
+    """
+    
+    def now(self) -> float:
+        return time.time()
+
+
+class CachedClock(Clock):
+    """
+    Monotonic clock that is read from a cached value.
+    
+    A background ticker thread refreshes the value every `resolution` seconds,
+    so reading the clock is a plain attribute load instead of a system call.
+    Readings are at most one tick behind the real time.
+    """
+    
+    def __init__(self, resolution: float = 0.001):
+        """
+        Initialize the cached clock and start its ticker thread.
+        
+        Args:
+            resolution: How often the cached time is refreshed, in seconds
+        """
+        self.resolution = resolution
+        self._now = time.monotonic_ns() * 1e-9
+        self._running = True
+        self._ticker = threading.Thread(target=self._tick, daemon=True)
+        self._ticker.start()
+    
+    def _tick(self) -> None:
+        """Background loop refreshing the cached time."""
+        while self._running:
+            self._now = time.monotonic_ns() * 1e-9
+            time.sleep(self.resolution)
+    
+    def now(self) -> float:
+        return self._now
+    
+    def stop(self) -> None:
+        """Stop the ticker thread; the clock stops advancing."""
+        self._running = False
+        self._ticker.join(timeout=1.0)
+
+
+class VirtualClock(Clock):
+    """
+    Manually driven clock for deterministic simulations.
+    
+    Time only moves when `advance` or `set` is called, so a simulation can
+    replay minutes of traffic in milliseconds and get the same result every run.
+    """
+    
+    def __init__(self, start: float = 0.0):
+        """
+        Initialize the virtual clock.
+        
+        Args:
+            start: Initial time in seconds
+        """
+        self._now = start
+    
+    def now(self) -> float:
+        return self._now
+    
+    def advance(self, seconds: float) -> float:
+        """
+        Move the clock forward.
+        
+        Args:
+            seconds: Amount of time to advance by (must not be negative)
+        
+        Returns:
+            float: The new current time
+        """
+        if seconds < 0:
+            raise ValueError("A virtual clock cannot go backwards")
+        self._now += seconds
+        return self._now
+    
+    def set(self, timestamp: float) -> None:
+        """
+        Jump the clock to an absolute time.
+        
+        Args:
+            timestamp: New current time (must not be earlier than the current time)
+        """
+        if timestamp < self._now:
+            raise ValueError("A virtual clock cannot go backwards")
+        self._now = timestamp
+
+
+# Shared default time source
+default_clock = MonotonicClock()
@@ -4,6 +4,7 @@ from typing import Dict, Optional, List, Tuple, Any, Set
 from collections import defaultdict
 import threading
 
+from .routing import RouteMatcher
 from .strategies import (
     BaseRateLimiter,
     TokenBucketRateLimiter, 
@@ -52,6 +53,7 @@ class AdaptiveShield:
         self._lock = threading.RLock()
         
         self._route_limiters: Dict[str, Tuple[int, int, str, BaseRateLimiter]] = {}
+        self._route_matcher = RouteMatcher()
         
         self._stats = defaultdict(lambda: defaultdict(lambda: {"allowed": 0, "blocked": 0}))
         
@@ -74,9 +76,9 @@ class AdaptiveShield:
         if route in self._route_limiters:
             return self._route_limiters[route]
         
-        for pattern, limiter_info in self._route_limiters.items():
-            if pattern.endswith('*') and route.startswith(pattern[:-1]):
-                return limiter_info
+        pattern = self._route_matcher.match(route)
+        if pattern is not None:
+            return self._route_limiters[pattern]
         
         limit = self.default_limit
         window = self.default_window
@@ -104,7 +106,9 @@ class AdaptiveShield:
             limiter_class = self.STRATEGIES[strategy_name]
             limiter = limiter_class(limit, window)
             
+            RouteMatcher.validate(route)
             self._route_limiters[route] = (limit, window, strategy_name, limiter)
+            self._route_matcher.add(route)
             
             logger.info(f"Configured rate limit for route {route}: "
                        f"{limit} requests per {window}s using {strategy_name}")
@@ -0,0 +1,796 @@
+"""
+Request Metrics for AdaptiveShield
+
+This module keeps the per-request counters of the shield off the decision
+path's critical section. Every thread records into its own `MetricsCell`, so
+recording a request is a few integer increments on thread-owned objects under
+the cell's own lock, which only metrics expiry ever contends. Readers
+aggregate all cells lazily when statistics are requested.
+
+Decision latencies go into log-bucketed histograms with a fixed maximum
+size, so latency accounting is O(1) per request, uses constant memory and
+histograms from different threads and scopes can simply be added together.
+
+In tiered mode each cell keeps full per-pair detail only for its top-K
+clients (found with a Space-Saving summary) and counts every client in a
+Count-Min sketch, so memory stays bounded no matter how many distinct
+clients are seen. Client statistics then say whether they are exact or
+estimated, and by how much an estimate may over-count.
+
+Cells of threads that have exited are folded into a single retired cell, so
+servers that spawn a thread per request do not accumulate cells.
+
+Retention works on time buckets instead of scanning every pair. Each new
+pair is filed under the bucket of its creation time; when a bucket falls out
+of the retention period, only its pairs are examined, and the ones that saw
+traffic since are moved to the bucket of their last request. Expiry thus
+costs O(expired) and can be run in bounded slices.
+"""
+
+import math
+import threading
+import weakref
+from array import array
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .sketches import CountMinSketch, SpaceSaving, estimate_distinct
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies.
+    
+    Latencies are counted in whole microseconds. Values below 32us get one
+    bucket each; above that every power of two is split into 16 buckets, so
+    any recorded value is reported within about 6%. Values are clamped to
+    `max_value_us` (about 268 seconds), which bounds the histogram to 400
+    counters. The counts array only grows as far as the largest value seen.
+    """
+    
+    __slots__ = ("counts", "count", "total", "max")
+    
+    # Largest trackable latency in microseconds
+    max_value_us = (1 << 28) - 1
+    
+    def __init__(self):
+        self.counts = array('Q')
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    @staticmethod
+    def _index(value_us: int) -> int:
+        """Get the bucket index for a latency in microseconds."""
+        shift = value_us.bit_length() - 5
+        if shift <= 0:
+            return value_us
+        return (shift << 4) + (value_us >> shift)
+    
+    @staticmethod
+    def _upper_bound(index: int) -> int:
+        """Get the exclusive upper bound of a bucket in microseconds."""
+        if index < 32:
+            return index + 1
+        shift = (index >> 4) - 1
+        return ((index - (shift << 4)) + 1) << shift
+    
+    def record(self, value: float) -> None:
+        """
+        Record one latency.
+        
+        Args:
+            value: Latency in milliseconds
+        """
+        value_us = min(int(value * 1000), self.max_value_us)
+        index = self._index(value_us)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend(array('Q', [0]) * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's counts into this one."""
+        counts = self.counts
+        other_counts = other.counts
+        if len(other_counts) > len(counts):
+            counts.extend(array('Q', [0]) * (len(other_counts) - len(counts)))
+        for index, count in enumerate(other_counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+    
+    def percentile(self, percent: float) -> float:
+        """
+        Get the latency below which a given percentage of requests fall.
+        
+        Args:
+            percent: Percentile between 0 and 100
+        
+        Returns:
+            float: Latency in milliseconds (upper bound of the bucket, capped
+                   at the recorded maximum), or 0 if nothing was recorded
+        """
+        if self.count == 0:
+            return 0.0
+        
+        target = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._upper_bound(index) / 1000, self.max)
+        return self.max
+    
+    def mean(self) -> float:
+        """Get the mean latency in milliseconds."""
+        return self.total / self.count if self.count else 0.0
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the histogram.
+        
+        Returns:
+            Dict with the request count and the mean, p50, p90, p99, p999 and
+            max latencies in milliseconds
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max
+        }
+
+
+class PairCounters:
+    """Counters for one (client, route) pair within one cell."""
+    
+    __slots__ = ("total", "allowed", "rejected", "first_request", "last_request", "latency")
+    
+    def __init__(self, now: float):
+        self.total = 0
+        self.allowed = 0
+        self.rejected = 0
+        self.first_request = now
+        self.last_request = now
+        self.latency = LatencyHistogram()
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the counters in the shield's statistics format."""
+        return {
+            "total_requests": self.total,
+            "allowed_requests": self.allowed,
+            "rejected_requests": self.rejected,
+            "last_request": self.last_request,
+            "first_request": self.first_request,
+            "latency": self.latency.summary()
+        }
+    
+    def merge(self, other: "PairCounters") -> None:
+        """Add another cell's counters for the same pair into this one."""
+        self.total += other.total
+        self.allowed += other.allowed
+        self.rejected += other.rejected
+        self.first_request = min(self.first_request, other.first_request)
+        self.last_request = max(self.last_request, other.last_request)
+        self.latency.merge(other.latency)
+
+
+class MetricsCell:
+    """
+    Counters written by a single thread.
+    
+    The owner thread holds `lock` while recording. Expiry runs on another
+    thread and takes the same lock before changing the cell's structures.
+    """
+    
+    # Pair keys examined per acquisition of the cell lock during expiry
+    EXPIRE_CHUNK = 256
+    
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        sketch_width: int = 2048,
+        sketch_depth: int = 4,
+        now: float = 0.0,
+        bucket_width: float = 60.0
+    ):
+        self.lock = threading.Lock()
+        self.total = 0
+        self.allowed = 0
+        self.rejected = 0
+        self.latency = LatencyHistogram()
+        self.pairs: Dict[Tuple[str, Optional[str]], PairCounters] = {}
+        
+        # Expiry wheel: bucket index -> pair keys filed under it. Keys may be
+        # stale (pair already gone) or duplicated; expire skips those.
+        self.bucket_width = bucket_width
+        self.buckets: Dict[int, List[Tuple[str, Optional[str]]]] = {}
+        # Keys of a due bucket still to be examined by expire
+        self._expiring: List[Tuple[str, Optional[str]]] = []
+        
+        # Tiered mode only: heavy hitters with full detail, a sketch for
+        # everyone, per-route counters and the routes of each tracked client
+        self.heavy: Optional[SpaceSaving] = None
+        if top_k is not None:
+            self.heavy = SpaceSaving(top_k)
+            self.sketch = CountMinSketch(sketch_width, sketch_depth, started=now)
+            self.previous_sketch: Optional[CountMinSketch] = None
+            self.routes: Dict[Optional[str], PairCounters] = {}
+            self.client_routes: Dict[str, List[Optional[str]]] = {}
+    
+    def record(
+        self,
+        client_id: str,
+        route: Optional[str],
+        allowed: bool,
+        processing_time: float,
+        now: float
+    ) -> None:
+        """Record the outcome of one request."""
+        with self.lock:
+            self.total += 1
+            self.latency.record(processing_time)
+        
+            heavy = self.heavy
+            if heavy is not None:
+                self.sketch.add(client_id, allowed)
+                evicted = heavy.offer(client_id)
+                if evicted is not None:
+                    self._drop_client(evicted)
+            
+                route_counters = self.routes.get(route)
+                if route_counters is None:
+                    route_counters = self.routes[route] = PairCounters(now)
+                route_counters.total += 1
+                route_counters.last_request = now
+                route_counters.latency.record(processing_time)
+                if allowed:
+                    route_counters.allowed += 1
+                else:
+                    route_counters.rejected += 1
+            
+            key = (client_id, route)
+            pair = self.pairs.get(key)
+            if pair is None:
+                pair = self.pairs[key] = PairCounters(now)
+                self.buckets.setdefault(int(now // self.bucket_width), []).append(key)
+                if heavy is not None:
+                    self.client_routes.setdefault(client_id, []).append(route)
+            pair.total += 1
+            pair.last_request = now
+            pair.latency.record(processing_time)
+            
+            if allowed:
+                self.allowed += 1
+                pair.allowed += 1
+            else:
+                self.rejected += 1
+                pair.rejected += 1
+    
+    def _drop_client(self, client_id: str) -> None:
+        """Forget the detailed counters of a client that left the top-K."""
+        for route in self.client_routes.pop(client_id, ()):
+            self.pairs.pop((client_id, route), None)
+    
+    def _drop_route(self, client_id: str, route: Optional[str]) -> None:
+        """Untrack an expired pair, and its client once it has no pairs left."""
+        routes = self.client_routes.get(client_id)
+        if routes is None:
+            return
+        if route in routes:
+            routes.remove(route)
+        if not routes:
+            del self.client_routes[client_id]
+            self.heavy.remove(client_id)
+    
+    def sketches(self) -> List[CountMinSketch]:
+        """Get the sketches currently answering estimates."""
+        if self.previous_sketch is None:
+            return [self.sketch]
+        return [self.sketch, self.previous_sketch]
+    
+    def merge(self, other: "MetricsCell") -> None:
+        """Fold another cell into this one."""
+        self.total += other.total
+        self.allowed += other.allowed
+        self.rejected += other.rejected
+        self.latency.merge(other.latency)
+        
+        # Pairs keep their place in the wheel; keys of pairs that are not
+        # carried over are skipped when their bucket expires
+        for index, keys in list(other.buckets.items()):
+            self.buckets.setdefault(index, []).extend(keys)
+        self._expiring.extend(other._expiring)
+        
+        if self.heavy is None:
+            for key, counters in list(other.pairs.items()):
+                pair = self.pairs.get(key)
+                if pair is None:
+                    self.pairs[key] = counters
+                else:
+                    pair.merge(counters)
+            return
+        
+        self.sketch.merge(other.sketch)
+        if other.previous_sketch is not None:
+            if self.previous_sketch is None:
+                self.previous_sketch = other.previous_sketch
+            else:
+                self.previous_sketch.merge(other.previous_sketch)
+        
+        for route, counters in list(other.routes.items()):
+            route_counters = self.routes.get(route)
+            if route_counters is None:
+                self.routes[route] = counters
+            else:
+                route_counters.merge(counters)
+        
+        for client_id, (count, error) in list(other.heavy.entries.items()):
+            evicted = self.heavy.offer(client_id, count, error)
+            if evicted is not None:
+                self._drop_client(evicted)
+            if client_id not in self.heavy:
+                continue
+            for route in other.client_routes.get(client_id, ()):
+                counters = other.pairs.get((client_id, route))
+                if counters is None:
+                    continue
+                pair = self.pairs.get((client_id, route))
+                if pair is None:
+                    self.pairs[(client_id, route)] = counters
+                    self.client_routes.setdefault(client_id, []).append(route)
+                else:
+                    pair.merge(counters)
+    
+    def expire(self, threshold: float, now: float, budget: Optional[int] = None) -> int:
+        """
+        Forget counters whose last request is older than a threshold.
+        
+        Pairs are examined one expired bucket at a time, so a pair may outlive
+        the threshold by up to one bucket width. In tiered mode this also starts
+        a new sketch once the current one is older than the threshold, keeping
+        the previous one for estimates. The cell lock is taken for at most
+        `EXPIRE_CHUNK` keys at a time, so the owner thread waits briefly.
+        
+        Args:
+            threshold: Counters last updated before this time are removed
+            now: Current time
+            budget: Maximum number of pair keys to examine (None for no limit)
+        
+        Returns:
+            int: Number of pair keys examined; less than the budget means
+                 every expired bucket has been processed
+        """
+        heavy = self.heavy
+        if heavy is not None:
+            with self.lock:
+                for route, counters in list(self.routes.items()):
+                    if counters.last_request < threshold:
+                        self.routes.pop(route, None)
+            
+                if self.sketch.started < threshold:
+                    self.previous_sketch = self.sketch
+                    self.sketch = CountMinSketch(self.sketch.width, self.sketch.depth, started=now)
+        
+        # Buckets below this index end before the threshold
+        due = int(threshold // self.bucket_width)
+        examined = 0
+        
+        while budget is None or examined < budget:
+            step = self.EXPIRE_CHUNK
+            if budget is not None:
+                step = min(step, budget - examined)
+            # Release the lock between chunks so the owner is never stalled
+            # for longer than one chunk, even on an unbounded pass
+            with self.lock:
+                count, finished = self._expire_chunk(threshold, due, step)
+            examined += count
+            if finished:
+                break
+        
+        return examined
+    
+    def _expire_chunk(self, threshold: float, due: int, limit: int) -> Tuple[int, bool]:
+        """
+        Examine up to `limit` pair keys from the expired buckets.
+        
+        The caller must hold `lock`.
+        
+        Returns:
+            Tuple[int, bool]: Keys examined, and whether no expired bucket is left
+        """
+        pairs = self.pairs
+        buckets = self.buckets
+        width = self.bucket_width
+        heavy = self.heavy
+        examined = 0
+        
+        while examined < limit:
+            expiring = self._expiring
+            if not expiring:
+                if not buckets:
+                    return examined, True
+                oldest = min(buckets)
+                if oldest >= due:
+                    return examined, True
+                self._expiring = buckets.pop(oldest)
+                continue
+            
+            key = expiring.pop()
+            examined += 1
+            counters = pairs.get(key)
+            if counters is None:
+                continue
+            if counters.last_request < threshold:
+                del pairs[key]
+                if heavy is not None:
+                    self._drop_route(*key)
+            else:
+                buckets.setdefault(int(counters.last_request // width), []).append(key)
+        
+        return examined, False
+
+
+class _CellOwner:
+    """Thread-local handle whose collection signals that its thread has exited."""
+    
+    __slots__ = ("cell", "__weakref__")
+    
+    def __init__(self, cell: MetricsCell):
+        self.cell = cell
+
+
+class RequestMetrics:
+    """
+    Per-thread request counters with lazy aggregation.
+    
+    `record` only touches the calling thread's cell, under a lock that only
+    expiry contends. The aggregation methods combine all cells on demand;
+    they may miss requests recorded concurrently with the read, which is the
+    price of keeping writers off any shared lock.
+    """
+    
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        sketch_width: int = 2048,
+        sketch_depth: int = 4,
+        bucket_width: float = 60.0
+    ):
+        """
+        Initialize the metrics.
+        
+        Args:
+            top_k: Clients per thread kept with full detail (None keeps every client)
+            sketch_width: Counters per Count-Min sketch row in tiered mode
+            sketch_depth: Count-Min sketch rows in tiered mode
+            bucket_width: Width of the retention time buckets (seconds)
+        """
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        
+        self.top_k = top_k
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.bucket_width = bucket_width
+        self._local = threading.local()
+        # Guards the cell registry and serializes retirement with expiry; never
+        # taken on the recording path once a thread has its cell
+        self._registry_lock = threading.RLock()
+        self._cells: List[MetricsCell] = []
+        self._retired = self._make_cell(0.0)
+        self._cells.append(self._retired)
+    
+    def _make_cell(self, now: float) -> MetricsCell:
+        """Create an empty cell in the configured mode."""
+        return MetricsCell(self.top_k, self.sketch_width, self.sketch_depth, now, self.bucket_width)
+    
+    def _new_cell(self, now: float) -> MetricsCell:
+        """Create and register the calling thread's cell."""
+        cell = self._make_cell(now)
+        owner = _CellOwner(cell)
+        finalizer = weakref.finalize(owner, self._retire, cell)
+        finalizer.atexit = False
+        with self._registry_lock:
+            self._cells.append(cell)
+        self._local.owner = owner
+        return cell
+    
+    def _retire(self, cell: MetricsCell) -> None:
+        """Fold the cell of an exited thread into the retired cell."""
+        with self._registry_lock:
+            self._retired.merge(cell)
+            self._cells.remove(cell)
+    
+    def record(
+        self,
+        client_id: str,
+        route: Optional[str],
+        allowed: bool,
+        processing_time: float,
+        now: float
+    ) -> None:
+        """
+        Record the outcome of one request.
+        
+        Args:
+            client_id: Identifier for the client making the request
+            route: Optional API route being accessed
+            allowed: Whether the request was allowed
+            processing_time: Decision latency in milliseconds
+            now: Time the decision was made
+        """
+        try:
+            cell = self._local.owner.cell
+        except AttributeError:
+            cell = self._new_cell(now)
+        cell.record(client_id, route, allowed, processing_time, now)
+    
+    def _snapshot(self) -> List[MetricsCell]:
+        """Get the currently registered cells."""
+        with self._registry_lock:
+            return list(self._cells)
+    
+    def totals(self) -> Tuple[int, int, int]:
+        """
+        Get global request counts.
+        
+        Returns:
+            Tuple of total, allowed and rejected request counts
+        """
+        total = allowed = rejected = 0
+        for cell in self._snapshot():
+            total += cell.total
+            allowed += cell.allowed
+            rejected += cell.rejected
+        return total, allowed, rejected
+    
+    def distinct_counts(self) -> Tuple[int, int]:
+        """
+        Count the distinct clients and routes with recorded requests.
+        
+        Returns:
+            Tuple of client and route counts
+        """
+        clients: Set[str] = set()
+        routes: Set[str] = set()
+        
+        if self.top_k is not None:
+            # Only the top-K clients are known by id; estimate the rest from
+            # the occupancy of the sketches' first rows
+            occupied = bytearray(self.sketch_width)
+            for cell in self._snapshot():
+                routes.update(route for route in list(cell.routes) if route)
+                for sketch in cell.sketches():
+                    for index, flag in enumerate(sketch.occupied()):
+                        if flag:
+                            occupied[index] = 1
+            return estimate_distinct(occupied), len(routes)
+        
+        for cell in self._snapshot():
+            for client_id, route in list(cell.pairs):
+                clients.add(client_id)
+                if route:
+                    routes.add(route)
+        return len(clients), len(routes)
+    
+    def totals_by(self, field: str) -> Dict[Any, Tuple[int, int]]:
+        """
+        Sum request counts per client or per route.
+        
+        Args:
+            field: "client" or "route"
+        
+        Returns:
+            Dict mapping each client id or route to (total, rejected) counts
+        """
+        index = 0 if field == "client" else 1
+        sums: Dict[Any, List[int]] = {}
+        for cell in self._snapshot():
+            if field == "route" and cell.heavy is not None:
+                items = list(cell.routes.items())
+            else:
+                items = [(key[index], counters) for key, counters in list(cell.pairs.items())]
+            for key, counters in items:
+                entry = sums.get(key)
+                if entry is None:
+                    entry = sums[key] = [0, 0]
+                entry[0] += counters.total
+                entry[1] += counters.rejected
+        return {key: (total, rejected) for key, (total, rejected) in sums.items()}
+    
+    def latency(self) -> LatencyHistogram:
+        """Get a merged snapshot of all decision latencies."""
+        merged = LatencyHistogram()
+        for cell in self._snapshot():
+            merged.merge(cell.latency)
+        return merged
+    
+    def pairs(self) -> Dict[Tuple[str, Optional[str]], PairCounters]:
+        """
+        Aggregate the counters of every (client, route) pair.
+        
+        Returns:
+            Dict mapping (client_id, route) to merged counters
+        """
+        merged: Dict[Tuple[str, Optional[str]], PairCounters] = {}
+        for cell in self._snapshot():
+            for key, counters in list(cell.pairs.items()):
+                pair = merged.get(key)
+                if pair is None:
+                    pair = merged[key] = PairCounters(counters.first_request)
+                pair.merge(counters)
+        return merged
+    
+    def client_pairs(self, client_id: str) -> Dict[Optional[str], PairCounters]:
+        """
+        Aggregate the counters of one client.
+        
+        Args:
+            client_id: Identifier for the client
+        
+        Returns:
+            Dict mapping each route the client used to merged counters
+        """
+        merged: Dict[Optional[str], PairCounters] = {}
+        for cell in self._snapshot():
+            for (pair_client, route), counters in list(cell.pairs.items()):
+                if pair_client != client_id:
+                    continue
+                pair = merged.get(route)
+                if pair is None:
+                    pair = merged[route] = PairCounters(counters.first_request)
+                pair.merge(counters)
+        return merged
+    
+    def client_summary(self, client_id: str) -> Dict[str, Any]:
+        """
+        Get the request counts of one client and how reliable they are.
+        
+        Without tiering the counts are always exact. In tiered mode they are
+        exact when every thread that saw the client has tracked it in full
+        detail since its first request. Otherwise each thread's share is
+        estimated (from the client's Space-Saving count or its Count-Min
+        estimate, whichever is tighter) and `error_bound` caps how far the
+        total may over-count. Estimates can cover up to twice the retention
+        period, since the previous sketch is kept for one period.
+        
+        Args:
+            client_id: Identifier for the client
+        
+        Returns:
+            Dict with total, allowed and rejected counts, the merged per-route
+            counters, an `exact` flag and the `error_bound`
+        """
+        routes = self.client_pairs(client_id)
+        total = sum(counters.total for counters in routes.values())
+        rejected = sum(counters.rejected for counters in routes.values())
+        exact = True
+        error_bound = 0
+        
+        if self.top_k is not None:
+            total = rejected = 0
+            for cell in self._snapshot():
+                detail_total = detail_rejected = 0
+                for route in list(cell.client_routes.get(client_id, ())):
+                    counters = cell.pairs.get((client_id, route))
+                    if counters is not None:
+                        detail_total += counters.total
+                        detail_rejected += counters.rejected
+                
+                tracked = cell.heavy.get(client_id)
+                if tracked is not None and tracked[1] == 0:
+                    total += detail_total
+                    rejected += detail_rejected
+                    continue
+                
+                sketch_total = sketch_rejected = sketch_bound = 0
+                for sketch in cell.sketches():
+                    estimated_total, estimated_rejected = sketch.estimate(client_id)
+                    sketch_total += estimated_total
+                    sketch_rejected += estimated_rejected
+                    sketch_bound += sketch.error_bound()
+                if sketch_total == 0:
+                    continue
+                
+                exact = False
+                if tracked is not None and detail_total + tracked[1] < sketch_total:
+                    total += detail_total + tracked[1]
+                    error_bound += tracked[1]
+                else:
+                    total += sketch_total
+                    error_bound += sketch_bound
+                rejected += sketch_rejected
+            
+            rejected = min(rejected, total)
+        
+        return {
+            "total_requests": total,
+            "allowed_requests": total - rejected,
+            "rejected_requests": rejected,
+            "routes": routes,
+            "exact": exact,
+            "error_bound": error_bound
+        }
+    
+    def route_summary(self, route: str) -> Optional[Dict[str, Any]]:
+        """
+        Aggregate the counters of one route over all clients.
+        
+        Args:
+            route: API route
+        
+        In tiered mode the counts cover every client, but `clients` only
+        holds the clients tracked in full detail.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Route totals, clients and latencies,
+                                      or None if the route has no requests
+        """
+        summary = None
+        clients: Set[str] = set()
+        for cell in self._snapshot():
+            for (client_id, pair_route), counters in list(cell.pairs.items()):
+                if pair_route != route:
+                    continue
+                if cell.heavy is None:
+                    if summary is None:
+                        summary = PairCounters(counters.first_request)
+                    summary.merge(counters)
+                clients.add(client_id)
+            
+            if cell.heavy is not None:
+                counters = cell.routes.get(route)
+                if counters is not None:
+                    if summary is None:
+                        summary = PairCounters(counters.first_request)
+                    summary.merge(counters)
+        
+        if summary is None:
+            return None
+        
+        return {
+            "total_requests": summary.total,
+            "allowed_requests": summary.allowed,
+            "rejected_requests": summary.rejected,
+            "first_request": summary.first_request,
+            "last_request": summary.last_request,
+            "clients": clients,
+            "latency": summary.latency
+        }
+    
+    def expire(self, threshold: float, now: float, budget: Optional[int] = None) -> bool:
+        """
+        Forget pairs whose last request is older than a threshold.
+        
+        With a budget, one call does a bounded slice of work and the caller
+        repeats it until it returns True. A request racing with the expiry of
+        its own pair may go uncounted; pairs are only expired after the
+        retention period without traffic.
+        
+        Args:
+            threshold: Pairs last seen before this time are removed
+            now: Current time
+            budget: Maximum number of pair keys to examine (None for no limit)
+        
+        Returns:
+            bool: True if expiry is complete, False if the budget ran out first
+        """
+        remaining = budget
+        for cell in self._snapshot():
+            with self._registry_lock:
+                examined = cell.expire(threshold, now, remaining)
+            if remaining is not None:
+                remaining -= examined
+                if remaining <= 0:
+                    return False
+        return True
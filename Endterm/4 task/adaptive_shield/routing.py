@@ -0,0 +1,288 @@
+"""
+Route Pattern Matching for AdaptiveShield
+
+This module provides the matcher used to find which configured route pattern
+applies to a request path. Patterns are compiled into a trie keyed by path
+segment (a radix tree over segments), so a lookup walks the path once instead
+of testing every configured pattern.
+
+Supported patterns:
+    /api/users          exact path
+    /api/users/{id}     `{name}` matches any single non-empty segment
+    /api/*              a final `*` matches one or more remaining segments
+
+When several patterns match, the most specific one wins: at every segment a
+literal match is preferred over a `{param}`, and a `{param}` over a `*`.
+
+The module also provides `RouteNormalizer`, which collapses high-cardinality
+request paths (numeric ids, UUIDs, hashes) into templates and caps the number
+of distinct routes, so per-route state stays bounded.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+
+class _Node:
+    """One path segment position in the trie."""
+    
+    __slots__ = ("children", "param", "exact", "wildcard")
+    
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        # Pattern ending at this node, and pattern ending in `*` below it
+        self.exact: Optional[str] = None
+        self.wildcard: Optional[str] = None
+
+
+class RouteMatcher:
+    """
+    Segment trie mapping request paths to configured route patterns.
+    
+    Adding a pattern costs O(segments) and leaves existing nodes in place, so
+    lookups running concurrently with an update see either the old or the new
+    pattern set. Lookups cost O(path segments), plus backtracking when a
+    literal branch dead-ends and a `{param}` or `*` branch has to be tried.
+    
+    Example:
+        matcher = RouteMatcher()
+        matcher.add("/api/users/{id}")
+        matcher.match("/api/users/42")  # "/api/users/{id}"
+    """
+    
+    def __init__(self):
+        self._root = _Node()
+        # Insertion-ordered set of added patterns
+        self._patterns: Dict[str, None] = {}
+    
+    def __len__(self) -> int:
+        return len(self._patterns)
+    
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._patterns
+    
+    @staticmethod
+    def validate(pattern: str) -> None:
+        """
+        Check that a route pattern uses `*` and `{param}` correctly.
+        
+        Args:
+            pattern: Route pattern to check
+        
+        Raises:
+            ValueError: If the pattern is malformed
+        """
+        segments = pattern.split("/")
+        for index, segment in enumerate(segments):
+            if "*" in segment and (segment != "*" or index != len(segments) - 1):
+                raise ValueError(f"'*' must be the whole last segment of a route pattern: {pattern!r}")
+            if segment.startswith("{") != segment.endswith("}") or segment == "{}":
+                raise ValueError(f"Malformed route parameter in pattern: {pattern!r}")
+    
+    def add(self, pattern: str) -> None:
+        """
+        Add a route pattern.
+        
+        Args:
+            pattern: Exact path, `{param}` template or path ending in `/*`
+        
+        Raises:
+            ValueError: If the pattern uses `*` or `{param}` incorrectly
+        """
+        self.validate(pattern)
+        segments = pattern.split("/")
+        wildcard = segments[-1] == "*"
+        if wildcard:
+            segments = segments[:-1]
+        
+        node = self._root
+        for segment in segments:
+            if segment.startswith("{"):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _Node()
+                node = child
+        
+        if wildcard:
+            node.wildcard = pattern
+        else:
+            node.exact = pattern
+        
+        self._patterns[pattern] = None
+    
+    def match(self, path: str) -> Optional[str]:
+        """
+        Find the most specific pattern matching a request path.
+        
+        Args:
+            path: Request path
+        
+        Returns:
+            Optional[str]: The matching pattern, or None if no pattern matches
+        """
+        return self._match(self._root, path.split("/"), 0)
+    
+    def _match(self, node: _Node, segments: List[str], index: int) -> Optional[str]:
+        """Match the remaining segments below a node."""
+        if index == len(segments):
+            return node.exact
+        
+        segment = segments[index]
+        child = node.children.get(segment)
+        if child is not None:
+            found = self._match(child, segments, index + 1)
+            if found is not None:
+                return found
+        
+        if node.param is not None and segment:
+            found = self._match(node.param, segments, index + 1)
+            if found is not None:
+                return found
+        
+        return node.wildcard
+    
+    def patterns(self) -> List[str]:
+        """Get all patterns in the order they were added."""
+        return list(self._patterns)
+
+
+class RouteNormalizer:
+    """
+    Maps request paths onto a bounded set of route templates.
+    
+    A path matching one of the configured templates becomes that template.
+    Otherwise, segments that look like identifiers are replaced: decimal
+    numbers by `{id}`, UUIDs by `{uuid}` and long hex strings by `{hex}`, so
+    `/api/users/42/orders` becomes `/api/users/{id}/orders`. Once `max_routes`
+    distinct routes have been produced, any new route is reported as the
+    overflow route instead.
+    
+    The normalized routes are valid route patterns, so limits can be set on
+    them directly with `set_route_limit`.
+    
+    Example:
+        normalizer = RouteNormalizer(templates=["/api/files/*"])
+        normalizer.normalize("/api/users/42")     # "/api/users/{id}"
+        normalizer.normalize("/api/files/a/b.txt")  # "/api/files/*"
+    """
+    
+    # Maximum number of normalized paths remembered
+    cache_size = 65536
+    
+    _UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+    _HEX = re.compile(r"[0-9a-fA-F]{16,}")
+    
+    def __init__(
+        self,
+        templates: Optional[Sequence[str]] = None,
+        detect_ids: bool = True,
+        max_routes: Optional[int] = 10000,
+        overflow_route: str = "/__overflow__"
+    ):
+        """
+        Initialize the normalizer.
+        
+        Args:
+            templates: Route patterns that matching paths are collapsed into
+                       (exact, `{param}` or trailing `*`, see `RouteMatcher`)
+            detect_ids: Whether to replace numeric, UUID and hex segments of
+                        paths that match no template
+            max_routes: Maximum number of distinct routes produced (None for
+                        unbounded)
+            overflow_route: Route reported for new paths once the cap is reached
+        """
+        if max_routes is not None and max_routes < 1:
+            raise ValueError("max_routes must be at least 1")
+        
+        self.detect_ids = detect_ids
+        self.max_routes = max_routes
+        self.overflow_route = overflow_route
+        self._matcher = RouteMatcher()
+        for template in templates or ():
+            self._matcher.add(template)
+        
+        self._routes: Dict[str, None] = {}
+        self._cache: Dict[str, str] = {}
+        self.overflowed = 0
+    
+    def add_template(self, template: str) -> None:
+        """
+        Add a route template.
+        
+        Args:
+            template: Route pattern that matching paths are collapsed into
+        """
+        self._matcher.add(template)
+        self._cache = {}
+    
+    def _template(self, path: str) -> str:
+        """Get the template of a path, before the route cap is applied."""
+        if len(self._matcher):
+            template = self._matcher.match(path)
+            if template is not None:
+                return template
+        
+        if not self.detect_ids:
+            return path
+        
+        segments = path.split("/")
+        for index, segment in enumerate(segments):
+            if not segment:
+                continue
+            if segment.isdecimal():
+                segments[index] = "{id}"
+            elif len(segment) == 36 and self._UUID.fullmatch(segment):
+                segments[index] = "{uuid}"
+            elif len(segment) >= 16 and self._HEX.fullmatch(segment):
+                segments[index] = "{hex}"
+        return "/".join(segments)
+    
+    def normalize(self, path: str) -> str:
+        """
+        Normalize a request path.
+        
+        Args:
+            path: Request path
+        
+        Returns:
+            str: The route template for the path, or the overflow route if the
+                 template is new and the route cap has been reached
+        """
+        cache = self._cache
+        route = cache.get(path)
+        if route is not None:
+            return route
+        
+        route = self._template(path)
+        routes = self._routes
+        if route not in routes:
+            if self.max_routes is not None and len(routes) >= self.max_routes:
+                # Not cached, so a flood of distinct paths cannot fill the cache
+                self.overflowed += 1
+                return self.overflow_route
+            routes[route] = None
+        
+        if len(cache) >= self.cache_size:
+            # Start over rather than evicting one by one
+            cache = self._cache = {}
+        cache[path] = route
+        return route
+    
+    def stats(self) -> Dict[str, Optional[int]]:
+        """
+        Get route counts for monitoring.
+        
+        Returns:
+            Dict[str, Optional[int]]: Distinct routes, the cap and the number
+                                      of paths sent to the overflow route
+        """
+        return {
+            "routes": len(self._routes),
+            "max_routes": self.max_routes,
+            "overflowed": self.overflowed
+        }
@@ -5,19 +5,25 @@ This module provides a comprehensive rate limiting solution for APIs and microse
 with support for multiple strategies, dynamic adaptation, and detailed metrics.
 """
 
+import sys
 import time
 import threading
 import logging
 from enum import Enum
-from typing import Dict, Any, List, Optional, Tuple, Callable, Union
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Callable, Union
 from collections import defaultdict
 
+from .clock import Clock, default_clock
+from .metrics import RequestMetrics, LatencyHistogram
+from .routing import RouteMatcher, RouteNormalizer
 from .strategies import (
     RateLimitStrategy as BaseLimitStrategy,
     TokenBucketStrategy,
+    GCRAStrategy,
     SlidingWindowCounterStrategy,
     LeakyBucketStrategy,
-    AdaptiveWindowStrategy
+    AdaptiveWindowStrategy,
+    ShardedStrategy
 )
 
 # Configure logging
@@ -31,6 +37,7 @@ logger = logging.getLogger("AdaptiveShield")
 class RateLimitStrategy(Enum):
     """Enumeration of available rate limiting strategies."""
     TOKEN_BUCKET = "token_bucket"
+    GCRA = "gcra"
     SLIDING_WINDOW = "sliding_window"
     LEAKY_BUCKET = "leaky_bucket"
     ADAPTIVE_WINDOW = "adaptive_window"
@@ -48,6 +55,14 @@ class AdaptiveShield:
     - Detailed metrics and monitoring
     """
     
+    # Maximum number of (client, route) pairs kept in the resolved rule cache
+    rule_cache_size = 65536
+    
+    # Metrics pairs examined per cleanup slice, and the width of the retention
+    # time buckets (seconds)
+    metrics_cleanup_slice = 1024
+    metrics_bucket_width = 60.0
+    
     def __init__(
         self,
         default_limit: int = 100,
@@ -55,7 +70,13 @@ class AdaptiveShield:
         default_strategy: RateLimitStrategy = RateLimitStrategy.TOKEN_BUCKET,
         monitor_interval: int = 30,
         metrics_retention: int = 3600,
-        auto_adapt: bool = True
+        auto_adapt: bool = True,
+        max_clients_per_strategy: Optional[int] = None,
+        shards: int = 1,
+        adaptive_approximate_above: Optional[int] = None,
+        metrics_top_k: Optional[int] = None,
+        route_normalizer: Optional[RouteNormalizer] = None,
+        clock: Optional[Clock] = None
     ):
         """
         Initialize the AdaptiveShield rate limiter.
@@ -67,30 +88,62 @@ class AdaptiveShield:
             monitor_interval: How often to run monitoring and adaptation (seconds)
             metrics_retention: How long to keep metrics data (seconds)
             auto_adapt: Whether to automatically adapt limits based on traffic
+            max_clients_per_strategy: Maximum number of clients each strategy
+                                      instance tracks before evicting (None for unbounded)
+            shards: Number of lock stripes client state is partitioned across
+                    (1 keeps a single lock per strategy instance)
+            adaptive_approximate_above: Effective limit above which adaptive window
+                                        clients switch to approximate sliced counters
+                                        (None keeps exact request logs)
+            metrics_top_k: Number of heaviest clients per thread kept with full
+                           metrics; the others are only counted in a sketch
+                           (None keeps full metrics for every client)
+            route_normalizer: Maps request paths to route templates before
+                              limits are looked up and metrics are recorded
+                              (None uses paths as given)
+            clock: Time source shared by the shield and its strategies
+                   (defaults to a monotonic clock)
         """
         self.default_limit = default_limit
         self.default_window = default_window
         self.default_strategy = default_strategy
+        self.max_clients_per_strategy = max_clients_per_strategy
+        self.shards = shards
+        self.adaptive_approximate_above = adaptive_approximate_above
+        self.route_normalizer = route_normalizer
+        self.clock = clock or default_clock
+        self._now = self.clock.now
         
+        # Guards configuration writes only; the request path reads the
+        # configuration dicts without locking, since every write replaces a
+        # whole (limit, window, strategy) tuple.
         self._lock = threading.RLock()
         
         self._route_limits: Dict[str, Tuple[int, int, RateLimitStrategy]] = {}
         self._client_limits: Dict[str, Tuple[int, int, Optional[RateLimitStrategy]]] = {}
         self._client_route_limits: Dict[str, Dict[str, Tuple[int, int, Optional[RateLimitStrategy]]]] = defaultdict(dict)
         
+        # Compiled route patterns (exact, {param} and trailing *) of the
+        # limit dicts above, mapping a request path to its configured pattern
+        self._route_matcher = RouteMatcher()
+        self._client_route_matchers: Dict[str, RouteMatcher] = {}
+        
         self._strategy_instances: Dict[str, Dict[str, BaseLimitStrategy]] = defaultdict(dict)
         
+        # Resolved rules by (client_id, route), stamped with the configuration
+        # generation they were resolved under. Every configuration write bumps
+        # the generation, so stale entries are never served even if a request
+        # that raced with the write stores one after the cache was cleared.
+        self._config_generation = 0
+        self._rule_cache: Dict[Tuple[str, Optional[str]], Tuple[int, BaseLimitStrategy, str]] = {}
+        
+        # Requests are recorded into per-thread cells under a lock that only
+        # metrics expiry contends; the metrics lock only serializes readers
+        # aggregating those cells.
+        self._metrics = RequestMetrics(top_k=metrics_top_k, bucket_width=self.metrics_bucket_width)
         self._metrics_lock = threading.RLock()
-        self._request_metrics: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(lambda: defaultdict(dict))
-        self._route_metrics: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self._global_metrics = {
-            "total_requests": 0,
-            "allowed_requests": 0,
-            "rejected_requests": 0,
-            "start_time": time.time(),
-            "routes": set(),
-            "clients": set(),
-            "processing_times": []
+            "start_time": self._now()
         }
         
         self._metrics_retention = metrics_retention
@@ -106,7 +159,7 @@ class AdaptiveShield:
     def __del__(self):
         """Clean up resources when the object is destroyed."""
         self._stop_monitoring = True
-        if hasattr(self, '_monitor_thread') and self._monitor_thread.is_alive():
+        if getattr(self, '_monitor_thread', None) is not None and self._monitor_thread.is_alive():
             self._monitor_thread.join(timeout=1.0)
     
     def _get_strategy_instance(
@@ -122,29 +175,147 @@ class AdaptiveShield:
             strategy_type: Type of rate limiting strategy to use
             limit: Request limit for this strategy
             window: Time window in seconds for this strategy
-            
+        
         Returns:
             An instance of the requested strategy
         """
         strategy_key = f"{strategy_type.value}:{limit}:{window}"
         
+        instance = self._strategy_instances.get(strategy_key)
+        if instance is not None:
+            return instance
+        
         with self._lock:
             if strategy_key not in self._strategy_instances:
                 if strategy_type == RateLimitStrategy.TOKEN_BUCKET:
-                    instance = TokenBucketStrategy(limit, window)
+                    strategy_class = TokenBucketStrategy
+                elif strategy_type == RateLimitStrategy.GCRA:
+                    strategy_class = GCRAStrategy
                 elif strategy_type == RateLimitStrategy.SLIDING_WINDOW:
-                    instance = SlidingWindowCounterStrategy(limit, window)
+                    strategy_class = SlidingWindowCounterStrategy
                 elif strategy_type == RateLimitStrategy.LEAKY_BUCKET:
-                    instance = LeakyBucketStrategy(limit, window)
+                    strategy_class = LeakyBucketStrategy
                 elif strategy_type == RateLimitStrategy.ADAPTIVE_WINDOW:
-                    instance = AdaptiveWindowStrategy(limit, window)
+                    strategy_class = AdaptiveWindowStrategy
                 else:
                     raise ValueError(f"Unknown strategy type: {strategy_type}")
                 
+                strategy_kwargs = {
+                    "max_clients": self.max_clients_per_strategy,
+                    "clock": self.clock
+                }
+                if strategy_class is AdaptiveWindowStrategy:
+                    strategy_kwargs["approximate_above"] = self.adaptive_approximate_above
+                
+                if self.shards > 1:
+                    instance = ShardedStrategy(
+                        strategy_class, limit, window,
+                        shards=self.shards,
+                        **strategy_kwargs
+                    )
+                else:
+                    instance = strategy_class(limit, window, **strategy_kwargs)
+                
                 self._strategy_instances[strategy_key] = instance
             
             return self._strategy_instances[strategy_key]
     
+    def _invalidate_rules(self) -> None:
+        """Drop all resolved rules after a configuration change."""
+        self._config_generation += 1
+        self._rule_cache = {}
+    
+    def _resolve_strategy(
+        self,
+        client_id: str,
+        route: Optional[str]
+    ) -> Tuple[BaseLimitStrategy, str]:
+        """
+        Resolve the most specific rule for a request.
+        
+        Repeat requests are served from the resolved rule cache; the full
+        precedence walk only runs for a pair's first request after a
+        configuration change.
+        
+        Args:
+            client_id: Identifier for the client making the request
+            route: Optional API route being accessed
+        
+        Returns:
+            Tuple of the strategy instance enforcing the rule and the key the
+            request is tracked under within that instance
+        """
+        generation = self._config_generation
+        rule_cache = self._rule_cache
+        cached = rule_cache.get((client_id, route))
+        if cached is not None and cached[0] == generation:
+            return cached[1], cached[2]
+        
+        strategy, request_key = self._lookup_rule(client_id, route)
+        
+        if len(rule_cache) >= self.rule_cache_size:
+            # Start over rather than evicting one by one; a full cache only
+            # happens with very many distinct pairs, which mostly miss anyway
+            rule_cache = self._rule_cache = {}
+        rule_cache[(client_id, route)] = (generation, strategy, request_key)
+        
+        return strategy, request_key
+    
+    def _lookup_rule(
+        self,
+        client_id: str,
+        route: Optional[str]
+    ) -> Tuple[BaseLimitStrategy, str]:
+        """
+        Walk the limit precedence for a request without using the cache.
+        
+        Args:
+            client_id: Identifier for the client making the request
+            route: Optional API route being accessed
+        
+        Returns:
+            Tuple of the strategy instance enforcing the rule and the key the
+            request is tracked under within that instance
+        """
+        client_route_matcher = self._client_route_matchers.get(client_id)
+        client_route_pattern = None
+        if route and client_route_matcher is not None:
+            client_route_pattern = client_route_matcher.match(route)
+        
+        route_pattern = None
+        if route and client_route_pattern is None and client_id not in self._client_limits:
+            route_pattern = self._route_matcher.match(route)
+        
+        # Requests matched by a route pattern share the pattern's state, so a
+        # limit on /api/users/{id} covers every user id together
+        tracked_route = route
+        
+        if client_route_pattern is not None:
+            limit_info = self._client_route_limits[client_id][client_route_pattern]
+            limit, window, strategy_type = limit_info
+            strategy_type = strategy_type or self.default_strategy
+            tracked_route = client_route_pattern
+        
+        elif client_id in self._client_limits:
+            limit_info = self._client_limits[client_id]
+            limit, window, strategy_type = limit_info
+            strategy_type = strategy_type or self.default_strategy
+        
+        elif route_pattern is not None:
+            limit_info = self._route_limits[route_pattern]
+            limit, window, strategy_type = limit_info
+            tracked_route = route_pattern
+        
+        else:
+            limit = self.default_limit
+            window = self.default_window
+            strategy_type = self.default_strategy
+        
+        strategy = self._get_strategy_instance(strategy_type, limit, window)
+        request_key = sys.intern(f"{client_id}:{tracked_route}") if route else client_id
+        
+        return strategy, request_key
+    
     def check_request(
         self, 
         client_id: str, 
@@ -164,87 +335,110 @@ class AdaptiveShield:
             client_id: Identifier for the client making the request
             route: Optional API route being accessed
             metadata: Optional additional metadata about the request
-            
+        
         Returns:
             bool: True if the request should be allowed, False if it should be rejected
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         allowed = False
         
         try:
-            with self._lock:
-                if route and client_id and route in self._client_route_limits.get(client_id, {}):
-                    limit_info = self._client_route_limits[client_id][route]
-                    limit, window, strategy_type = limit_info
-                    strategy_type = strategy_type or self.default_strategy
-                    
-                elif client_id in self._client_limits:
-                    limit_info = self._client_limits[client_id]
-                    limit, window, strategy_type = limit_info
-                    strategy_type = strategy_type or self.default_strategy
-                    
-                elif route and route in self._route_limits:
-                    limit_info = self._route_limits[route]
-                    limit, window, strategy_type = limit_info
-                    
-                else:
-                    limit = self.default_limit
-                    window = self.default_window
-                    strategy_type = self.default_strategy
-                
-                strategy = self._get_strategy_instance(strategy_type, limit, window)
-                request_key = f"{client_id}:{route}" if route else client_id
-                
-                allowed = strategy.allow_request(request_key)
-                
-                end_time = time.time()
-                processing_time = (end_time - start_time) * 1000  # Convert to ms
-                
-                with self._metrics_lock:
-                    self._global_metrics["total_requests"] += 1
-                    if allowed:
-                        self._global_metrics["allowed_requests"] += 1
-                    else:
-                        self._global_metrics["rejected_requests"] += 1
-                    
-                    self._global_metrics["processing_times"].append(processing_time)
-                    if len(self._global_metrics["processing_times"]) > 1000:
-                        self._global_metrics["processing_times"] = self._global_metrics["processing_times"][-1000:]
-                    
-                    self._global_metrics["clients"].add(client_id)
-                    if route:
-                        self._global_metrics["routes"].add(route)
-                    
-                    client_metrics = self._request_metrics[client_id]
-                    if route not in client_metrics:
-                        client_metrics[route] = {
-                            "total_requests": 0,
-                            "allowed_requests": 0,
-                            "rejected_requests": 0,
-                            "last_request": end_time,
-                            "first_request": end_time,
-                            "processing_times": []
-                        }
-                    
-                    route_metrics = client_metrics[route]
-                    route_metrics["total_requests"] += 1
-                    route_metrics["last_request"] = end_time
-                    
-                    if allowed:
-                        route_metrics["allowed_requests"] += 1
-                    else:
-                        route_metrics["rejected_requests"] += 1
-                    
-                    route_metrics["processing_times"].append(processing_time)
-                    if len(route_metrics["processing_times"]) > 100:
-                        route_metrics["processing_times"] = route_metrics["processing_times"][-100:]
-                
-                return allowed
-                
+            if route and self.route_normalizer is not None:
+                route = self.route_normalizer.normalize(route)
+            
+            strategy, request_key = self._resolve_strategy(client_id, route)
+            
+            allowed = strategy.allow_request(request_key)
+            
+            processing_time = (time.perf_counter() - start_time) * 1000  # Convert to ms
+            
+            self._metrics.record(client_id, route, allowed, processing_time, self._now())
+            
+            return allowed
+        
         except Exception as e:
             logger.error(f"Error in check_request: {e}")
             return True
     
+    def check_requests_batch(
+        self,
+        requests: Sequence[Tuple[str, Optional[str]]]
+    ) -> List[bool]:
+        """
+        Check a batch of requests at once.
+        
+        Rules are resolved once per distinct (client, route) pair, requests are
+        grouped by the strategy instance enforcing them, and each group is
+        decided with a single vectorized strategy call. Decisions are the same
+        as calling `check_request` for each request in order at one instant.
+        
+        Args:
+            requests: Sequence of (client_id, route) pairs
+        
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        start_time = time.perf_counter()
+        
+        try:
+            if self.route_normalizer is not None:
+                normalize = self.route_normalizer.normalize
+                requests = [(client_id, normalize(route) if route else route) for client_id, route in requests]
+            
+            resolved: Dict[Tuple[str, Optional[str]], Tuple[BaseLimitStrategy, str]] = {}
+            groups: Dict[int, Tuple[BaseLimitStrategy, List[int], List[str]]] = {}
+            
+            for position, (client_id, route) in enumerate(requests):
+                rule = resolved.get((client_id, route))
+                if rule is None:
+                    rule = self._resolve_strategy(client_id, route)
+                    resolved[(client_id, route)] = rule
+                
+                strategy, request_key = rule
+                group = groups.get(id(strategy))
+                if group is None:
+                    group = groups[id(strategy)] = (strategy, [], [])
+                group[1].append(position)
+                group[2].append(request_key)
+            
+            results = [True] * len(requests)
+            for strategy, positions, request_keys in groups.values():
+                for position, allowed in zip(positions, strategy.allow_requests(request_keys)):
+                    results[position] = allowed
+            
+            processing_time = (time.perf_counter() - start_time) * 1000 / max(1, len(requests))
+            end_time = self._now()
+            
+            record = self._metrics.record
+            for (client_id, route), allowed in zip(requests, results):
+                record(client_id, route, allowed, processing_time, end_time)
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Error in check_requests_batch: {e}")
+            return [True] * len(requests)
+    
+    def get_retry_after(self, client_id: str, route: str = None) -> Optional[float]:
+        """
+        Get how long a client has to wait before its next request is allowed.
+        
+        Only some strategies (such as GCRA) can compute this exactly; for the
+        others None is returned and callers should fall back to the window.
+        
+        Args:
+            client_id: Identifier for the client
+            route: Optional API route being accessed
+        
+        Returns:
+            Optional[float]: Seconds to wait, or None if the strategy cannot tell
+        """
+        if route and self.route_normalizer is not None:
+            route = self.route_normalizer.normalize(route)
+        
+        strategy, request_key = self._resolve_strategy(client_id, route)
+        return strategy.retry_after(request_key)
+    
     def set_client_limit(
         self, 
         client_id: str, 
@@ -266,6 +460,7 @@ class AdaptiveShield:
                 window = self.default_window
             
             self._client_limits[client_id] = (limit, window, strategy)
+            self._invalidate_rules()
             
             logger.info(f"Set client limit for '{client_id}': {limit} requests per {window}s"
                       f" using {strategy.name if strategy else 'default'} strategy")
@@ -281,10 +476,14 @@ class AdaptiveShield:
         Set a custom rate limit for a specific route.
         
         Args:
-            route: API route pattern
+            route: API route pattern: an exact path, a template with `{param}`
+                   segments or a prefix ending in `/*`
             limit: Request limit for this route
             window: Time window in seconds (defaults to global default)
             strategy: Rate limiting strategy to use (defaults to global default)
+        
+        Raises:
+            ValueError: If the route pattern is malformed
         """
         with self._lock:
             if window is None:
@@ -293,7 +492,11 @@ class AdaptiveShield:
             if strategy is None:
                 strategy = self.default_strategy
             
+            # The limit has to be in place before the matcher can return it
+            RouteMatcher.validate(route)
             self._route_limits[route] = (limit, window, strategy)
+            self._route_matcher.add(route)
+            self._invalidate_rules()
             
             logger.info(f"Set route limit for '{route}': {limit} requests per {window}s"
                       f" using {strategy.name} strategy")
@@ -311,73 +514,64 @@ class AdaptiveShield:
         
         Args:
             client_id: Identifier for the client
-            route: API route pattern
+            route: API route pattern (see `set_route_limit`)
             limit: Request limit for this client+route
             window: Time window in seconds (defaults to global default)
             strategy: Rate limiting strategy to use (defaults to global default)
+        
+        Raises:
+            ValueError: If the route pattern is malformed
         """
         with self._lock:
             if window is None:
                 window = self.default_window
-                
+            
+            RouteMatcher.validate(route)
             self._client_route_limits[client_id][route] = (limit, window, strategy)
             
+            client_route_matcher = self._client_route_matchers.get(client_id)
+            if client_route_matcher is None:
+                client_route_matcher = self._client_route_matchers[client_id] = RouteMatcher()
+            client_route_matcher.add(route)
+            self._invalidate_rules()
+            
             logger.info(f"Set client-route limit for '{client_id}' on '{route}': "
                       f"{limit} requests per {window}s"
                       f" using {strategy.name if strategy else 'default'} strategy")
     
     def _clean_old_metrics(self) -> None:
         """Remove metrics older than the retention period."""
-        with self._metrics_lock:
-            current_time = time.time()
-            retention_threshold = current_time - self._metrics_retention
-            
-            clients_to_remove = []
-            for client_id, routes in self._request_metrics.items():
-                routes_to_remove = []
-                
-                for route, metrics in routes.items():
-                    if metrics.get("last_request", 0) < retention_threshold:
-                        routes_to_remove.append(route)
-                
-                for route in routes_to_remove:
-                    del routes[route]
-                
-                if not routes:
-                    clients_to_remove.append(client_id)
-            
-            for client_id in clients_to_remove:
-                del self._request_metrics[client_id]
-            
-            routes_to_remove = []
-            for route, metrics in self._route_metrics.items():
-                if metrics.get("last_request", 0) < retention_threshold:
-                    routes_to_remove.append(route)
-            
-            for route in routes_to_remove:
-                del self._route_metrics[route]
+        current_time = self._now()
+        threshold = current_time - self._metrics_retention
+        while not self._metrics.expire(threshold, current_time, self.metrics_cleanup_slice):
+            # Yield between slices so request threads never wait on a long sweep
+            time.sleep(0)
     
     def _update_metrics(self) -> None:
         """Update rate metrics based on current data."""
         with self._metrics_lock:
-            current_time = time.time()
+            current_time = self._now()
             elapsed = current_time - self._global_metrics["start_time"]
             
+            total, allowed, rejected = self._metrics.totals()
+            client_count, route_count = self._metrics.distinct_counts()
+            latency = self._metrics.latency()
+            
+            self._global_metrics["total_requests"] = total
+            self._global_metrics["allowed_requests"] = allowed
+            self._global_metrics["rejected_requests"] = rejected
+            self._global_metrics["latency"] = latency.summary()
+            
             if elapsed > 0:
-                total = self._global_metrics["total_requests"]
-                allowed = self._global_metrics["allowed_requests"]
-                rejected = self._global_metrics["rejected_requests"]
-                
                 self._global_metrics["requests_per_second"] = total / elapsed
                 self._global_metrics["rejection_rate"] = rejected / total if total > 0 else 0
                 
                 self._global_metrics["uptime"] = elapsed
-                self._global_metrics["client_count"] = len(self._global_metrics["clients"])
-                self._global_metrics["route_count"] = len(self._global_metrics["routes"])
+                self._global_metrics["client_count"] = client_count
+                self._global_metrics["route_count"] = route_count
                 
-                if len(self._global_metrics["processing_times"]) > 0:
-                    times = self._global_metrics["processing_times"]
-                    self._global_metrics["avg_processing_time"] = sum(times) / len(times)
+                if latency.count > 0:
+                    self._global_metrics["avg_processing_time"] = latency.mean()
     
     def _adapt_limits(self) -> None:
         """
@@ -390,18 +584,31 @@ class AdaptiveShield:
         if not self._auto_adapt:
             return
         
-        with self._lock, self._metrics_lock:
-            for route, metrics in self._route_metrics.items():
+        client_totals = self._metrics.totals_by("client")
+        
+        # Metrics are kept per request path; roll them up to the configured
+        # route pattern each path falls under
+        route_totals: Dict[str, List[int]] = {}
+        for path, (total, rejected) in self._metrics.totals_by("route").items():
+            route = self._route_matcher.match(path) if path else None
+            if route is None:
+                continue
+            totals = route_totals.setdefault(route, [0, 0])
+            totals[0] += total
+            totals[1] += rejected
+        
+        with self._lock:
+            adapted = False
+            
+            for route, (total, rejected) in route_totals.items():
                 if route not in self._route_limits:
                     continue
-                    
-                total = metrics.get("total_requests", 0)
+                
                 if total < 100:
                     continue
                 
                 limit, window, strategy = self._route_limits[route]
                 
-                rejected = metrics.get("rejected_requests", 0)
                 rejection_rate = rejected / total if total > 0 else 0
                 
                 if strategy == RateLimitStrategy.ADAPTIVE_WINDOW:
@@ -410,20 +617,21 @@ class AdaptiveShield:
                 if rejection_rate > 0.2 and rejection_rate < 0.4:
                     new_limit = int(limit * 1.1)
                     self._route_limits[route] = (new_limit, window, strategy)
+                    adapted = True
                     
                     logger.info(f"Adaptive increase: Route '{route}' limit adjusted from {limit} to {new_limit}")
                 
                 elif rejection_rate < 0.05 and limit > self.default_limit:
                     new_limit = max(self.default_limit, int(limit * 0.95))
                     self._route_limits[route] = (new_limit, window, strategy)
+                    adapted = True
                     
                     logger.info(f"Adaptive decrease: Route '{route}' limit adjusted from {limit} to {new_limit}")
             
-            for client_id, routes in self._request_metrics.items():
+            for client_id, (total_client_requests, total_rejected) in client_totals.items():
                 if client_id not in self._client_limits:
                     continue
                 
-                total_client_requests = sum(m.get("total_requests", 0) for m in routes.values())
                 if total_client_requests < 100:
                     continue
                 
@@ -431,32 +639,41 @@ class AdaptiveShield:
                 if strategy == RateLimitStrategy.ADAPTIVE_WINDOW:
                     continue
                 
-                total_rejected = sum(m.get("rejected_requests", 0) for m in routes.values())
                 rejection_rate = total_rejected / total_client_requests
                 
                 if rejection_rate > 0.2 and rejection_rate < 0.4:
                     new_limit = int(limit * 1.1)
                     self._client_limits[client_id] = (new_limit, window, strategy)
+                    adapted = True
                     
                     logger.info(f"Adaptive increase: Client '{client_id}' limit adjusted from {limit} to {new_limit}")
                 
                 elif rejection_rate < 0.05 and limit > self.default_limit:
                     new_limit = max(self.default_limit, int(limit * 0.95))
                     self._client_limits[client_id] = (new_limit, window, strategy)
+                    adapted = True
                     
                     logger.info(f"Adaptive decrease: Client '{client_id}' limit adjusted from {limit} to {new_limit}")
+            
+            if adapted:
+                self._invalidate_rules()
+    
+    def _run_maintenance(self) -> None:
+        """Run one round of metrics cleanup, aggregation and adaptation."""
+        self._clean_old_metrics()
+        self._update_metrics()
+        self._adapt_limits()
     
     def _monitor_loop(self) -> None:
         """Background thread for monitoring and adaptation."""
-        try:
-            while not getattr(self, '_stop_monitoring', False):
-                self._clean_old_metrics()
-                self._update_metrics()
-                self._adapt_limits()
+        while not getattr(self, '_stop_monitoring', False):
+            try:
+                self._run_maintenance()
+            except Exception as e:
+                # One failed round must not stop cleanup and adaptation for good
+                logger.error(f"Error in monitoring thread: {e}")
                 
-                time.sleep(self._monitor_interval)
-        except Exception as e:
-            logger.error(f"Error in monitoring thread: {e}")
+            time.sleep(self._monitor_interval)
     
     def get_client_stats(self, client_id: str) -> Dict[str, Any]:
         """
@@ -464,14 +681,18 @@ class AdaptiveShield:
         
         Args:
             client_id: Client identifier
-            
+        
         Returns:
             Dict containing client statistics
         """
+        summary = self._metrics.client_summary(client_id)
+        client_pairs = summary["routes"]
+        routes_metrics = {route: counters.as_dict() for route, counters in client_pairs.items()}
+        
         with self._metrics_lock:
             stats = {
                 "client_id": client_id,
-                "exists": client_id in self._request_metrics or client_id in self._client_limits,
+                "exists": summary["total_requests"] > 0 or client_id in self._client_limits,
                 "limits": {}
             }
             
@@ -492,28 +713,29 @@ class AdaptiveShield:
                         "strategy": strategy.name if strategy else "default"
                     }
             
-            if client_id in self._request_metrics:
-                routes_metrics = self._request_metrics[client_id]
-                
-                total_requests = sum(r.get("total_requests", 0) for r in routes_metrics.values())
-                allowed_requests = sum(r.get("allowed_requests", 0) for r in routes_metrics.values())
-                rejected_requests = sum(r.get("rejected_requests", 0) for r in routes_metrics.values())
+            if summary["total_requests"] > 0:
+                total_requests = summary["total_requests"]
+                rejected_requests = summary["rejected_requests"]
                 
+                # Counts are estimates for clients outside the top-K in tiered
+                # metrics mode; error_bound caps how far they may over-count
                 stats.update({
                     "total_requests": total_requests,
-                    "allowed_requests": allowed_requests,
+                    "allowed_requests": summary["allowed_requests"],
                     "rejected_requests": rejected_requests,
                     "rejection_rate": rejected_requests / total_requests if total_requests > 0 else 0,
+                    "exact": summary["exact"],
+                    "error_bound": summary["error_bound"],
                     "routes": {route: metrics for route, metrics in routes_metrics.items()}
                 })
                 
-                all_times = []
-                for route_metrics in routes_metrics.values():
-                    all_times.extend(route_metrics.get("processing_times", []))
+                latency = LatencyHistogram()
+                for counters in client_pairs.values():
+                    latency.merge(counters.latency)
                 
-                if all_times:
-                    stats["avg_processing_time"] = sum(all_times) / len(all_times)
-                    stats["processing_times"] = all_times[-100:]
+                if latency.count > 0:
+                    stats["avg_processing_time"] = latency.mean()
+                    stats["latency"] = latency.summary()
             
             return stats
     
@@ -523,14 +745,16 @@ class AdaptiveShield:
         
         Args:
             route: API route
-            
+        
         Returns:
             Dict containing route statistics
         """
+        metrics = self._metrics.route_summary(route)
+        
         with self._metrics_lock:
             stats = {
                 "route": route,
-                "exists": route in self._route_metrics or route in self._route_limits,
+                "exists": metrics is not None or route in self._route_limits,
                 "limits": {}
             }
             
@@ -555,9 +779,7 @@ class AdaptiveShield:
             if route_specific_client_limits:
                 stats["limits"]["clients"] = route_specific_client_limits
             
-            if route in self._route_metrics:
-                metrics = self._route_metrics[route]
-                
+            if metrics is not None:
                 stats.update({
                     "total_requests": metrics.get("total_requests", 0),
                     "allowed_requests": metrics.get("allowed_requests", 0),
@@ -571,9 +793,10 @@ class AdaptiveShield:
                     "last_request": metrics.get("last_request", 0)
                 })
                 
-                if "processing_times" in metrics and metrics["processing_times"]:
-                    stats["avg_processing_time"] = sum(metrics["processing_times"]) / len(metrics["processing_times"])
-                    stats["processing_times"] = metrics["processing_times"][-100:]
+                latency = metrics["latency"]
+                if latency.count > 0:
+                    stats["avg_processing_time"] = latency.mean()
+                    stats["latency"] = latency.summary()
             
             return stats
     
@@ -601,10 +824,71 @@ class AdaptiveShield:
             if "avg_processing_time" in self._global_metrics:
                 stats["avg_processing_time"] = self._global_metrics["avg_processing_time"]
             
-            if self._global_metrics["processing_times"]:
-                stats["processing_times"] = self._global_metrics["processing_times"][-100:]
-            
-            return stats
+            if self._global_metrics["latency"]["count"] > 0:
+                stats["latency"] = self._global_metrics["latency"]
+        
+        stats["strategy_state"] = self.get_strategy_state_stats()
+        if self.route_normalizer is not None:
+            stats["route_normalizer"] = self.route_normalizer.stats()
+        
+        return stats
+    
+    def get_latency_histogram(
+        self,
+        client_id: Optional[str] = None,
+        route: Optional[str] = None
+    ) -> LatencyHistogram:
+        """
+        Get a snapshot of the decision latency histogram for a scope.
+        
+        Snapshots are independent copies and can be merged, for example to
+        combine several clients or several shields.
+        
+        Args:
+            client_id: Restrict to one client (None for all clients)
+            route: Restrict to one route (None for all routes)
+        
+        Returns:
+            LatencyHistogram: Merged histogram of the scope
+        """
+        if client_id is None and route is None:
+            return self._metrics.latency()
+        
+        latency = LatencyHistogram()
+        if client_id is not None:
+            for pair_route, counters in self._metrics.client_pairs(client_id).items():
+                if route is None or pair_route == route:
+                    latency.merge(counters.latency)
+        else:
+            metrics = self._metrics.route_summary(route)
+            if metrics is not None:
+                latency.merge(metrics["latency"])
+        return latency
+    
+    def get_strategy_state_stats(self) -> Dict[str, int]:
+        """
+        Get client-state occupancy and eviction counters across all strategy instances.
+        
+        Returns:
+            Dict containing tracked client and eviction totals
+        """
+        with self._lock:
+            instances = list(self._strategy_instances.values())
+        
+        totals = {
+            "strategy_instances": len(instances),
+            "tracked_clients": 0,
+            "evicted_idle": 0,
+            "evicted_capacity": 0
+        }
+        
+        for instance in instances:
+            state_stats = instance.get_state_stats()
+            totals["tracked_clients"] += state_stats["clients"]
+            totals["evicted_idle"] += state_stats["evicted_idle"]
+            totals["evicted_capacity"] += state_stats["evicted_capacity"]
+        
+        return totals
 
 
 # Default shield instance for simple usage
@@ -0,0 +1,202 @@
+"""
+Streaming Summaries for AdaptiveShield Metrics
+
+This module provides the fixed-memory structures behind the tiered metrics
+mode. `SpaceSaving` finds the heaviest clients of a stream with at most `k`
+counters, and `CountMinSketch` estimates request counts for any client with a
+bounded over-count, so millions of distinct clients can be summarized in a
+constant amount of memory.
+"""
+
+import math
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch of total and rejected requests per client.
+    
+    Estimates never under-count. With `depth` rows of `width` counters, an
+    estimate exceeds the true count by more than `e / width` times the number
+    of recorded requests with probability at most `exp(-depth)`.
+    """
+    
+    def __init__(self, width: int = 2048, depth: int = 4, started: float = 0.0):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            width: Counters per row (controls the error bound)
+            depth: Number of rows (controls the failure probability)
+            started: Time the sketch started counting
+        """
+        self.width = width
+        self.depth = depth
+        self.started = started
+        self.count = 0
+        self.totals = array('Q', [0]) * (width * depth)
+        self.rejected = array('Q', [0]) * (width * depth)
+    
+    def _positions(self, key: str) -> List[int]:
+        """Get the counter position of a key in every row."""
+        width = self.width
+        h1 = hash(key)
+        h2 = (h1 >> 32) | 1
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+    
+    def add(self, key: str, allowed: bool) -> None:
+        """
+        Count one request.
+        
+        Args:
+            key: Client identifier
+            allowed: Whether the request was allowed
+        """
+        self.count += 1
+        totals = self.totals
+        rejected = self.rejected
+        width = self.width
+        h1 = hash(key)
+        h2 = (h1 >> 32) | 1
+        # Same positions as _positions, inlined for the hot path
+        for offset in range(0, width * self.depth, width):
+            position = offset + h1 % width
+            totals[position] += 1
+            if not allowed:
+                rejected[position] += 1
+            h1 += h2
+    
+    def estimate(self, key: str) -> Tuple[int, int]:
+        """
+        Estimate the requests counted for a key.
+        
+        Args:
+            key: Client identifier
+        
+        Returns:
+            Tuple of estimated total and rejected requests
+        """
+        positions = self._positions(key)
+        total = min(self.totals[position] for position in positions)
+        rejected = min(self.rejected[position] for position in positions)
+        return total, min(rejected, total)
+    
+    def error_bound(self) -> int:
+        """Get the over-count bound that holds with probability 1 - exp(-depth)."""
+        return math.ceil(math.e / self.width * self.count)
+    
+    def merge(self, other: "CountMinSketch") -> None:
+        """Add another sketch with the same dimensions into this one."""
+        self.count += other.count
+        self.started = min(self.started, other.started)
+        self.totals = array('Q', map(int.__add__, self.totals, other.totals))
+        self.rejected = array('Q', map(int.__add__, self.rejected, other.rejected))
+    
+    def occupied(self) -> bytearray:
+        """Get a 0/1 flag per counter of the first row, for distinct counting."""
+        return bytearray(1 if count else 0 for count in self.totals[:self.width])
+
+
+def estimate_distinct(occupied: bytearray) -> int:
+    """
+    Estimate how many distinct keys hashed into a row (linear counting).
+    
+    Args:
+        occupied: 0/1 flag per counter of a sketch row
+    
+    Returns:
+        int: Estimated number of distinct keys
+    """
+    width = len(occupied)
+    empty = width - sum(occupied)
+    if empty == 0:
+        return round(width * math.log(width))
+    return round(-width * math.log(empty / width))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitter summary.
+    
+    Tracks at most `k` clients. A client that is not tracked replaces the
+    tracked client with the smallest count and inherits that count as its
+    error, so a tracked count over-counts by at most its error and any client
+    with more than `n / k` requests is guaranteed to be tracked.
+    """
+    
+    def __init__(self, k: int):
+        """
+        Initialize an empty summary.
+        
+        Args:
+            k: Maximum number of tracked clients
+        """
+        self.k = k
+        # client_id -> [count, error]
+        self.entries: Dict[str, List[int]] = {}
+        # Min-heap of (count, client_id); counts may be stale and are fixed lazily
+        self._heap: List[Tuple[int, str]] = []
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+    
+    def get(self, key: str) -> Optional[Tuple[int, int]]:
+        """Get the (count, error) of a tracked client, or None if untracked."""
+        entry = self.entries.get(key)
+        return (entry[0], entry[1]) if entry is not None else None
+    
+    def _pop_min(self) -> Optional[Tuple[str, int]]:
+        """Remove the tracked client with the smallest count."""
+        heap = self._heap
+        entries = self.entries
+        while heap:
+            count, key = heap[0]
+            entry = entries.get(key)
+            if entry is None:
+                heapq.heappop(heap)
+            elif entry[0] != count:
+                heapq.heapreplace(heap, (entry[0], key))
+            else:
+                heapq.heappop(heap)
+                entries.pop(key, None)
+                return key, count
+        return None
+    
+    def offer(self, key: str, count: int = 1, error: int = 0) -> Optional[str]:
+        """
+        Count requests for a client.
+        
+        Args:
+            key: Client identifier
+            count: Number of requests to add
+            error: Known over-count already included in `count` (for merging)
+        
+        Returns:
+            Optional[str]: The client evicted to make room, if any
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[0] += count
+            entry[1] += error
+            return None
+        
+        evicted = None
+        if len(self.entries) >= self.k:
+            smallest = self._pop_min()
+            if smallest is not None:
+                evicted, floor = smallest
+                count += floor
+                error += floor
+        
+        self.entries[key] = [count, error]
+        heapq.heappush(self._heap, (count, key))
+        if len(self._heap) > 2 * self.k:
+            self._heap = [(entry[0], key) for key, entry in self.entries.items()]
+            heapq.heapify(self._heap)
+        return evicted
+    
+    def remove(self, key: str) -> None:
+        """Stop tracking a client."""
+        self.entries.pop(key, None)
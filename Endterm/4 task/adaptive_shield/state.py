@@ -0,0 +1,321 @@
+"""
+Compact Client State Storage for AdaptiveShield
+
+This module provides a struct-of-arrays store shared by the rate limiting
+strategies. Instead of keeping one dict per field (each holding a boxed float
+per client), every client id is mapped to an integer slot and numeric state is
+kept in typed `array('d')` columns indexed by that slot. Slots freed by
+`release` are recycled by the next client that is allocated.
+
+The store can also forget clients on its own: an idle TTL evicts clients
+whose activity timestamp is older than the TTL, and a hard `max_clients` cap
+evicts with the CLOCK (second chance) algorithm when a new client arrives.
+Both run incrementally on the hot path, so there is never a full sweep.
+"""
+
+import sys
+from array import array
+from typing import Dict, Any, List, Iterator, Optional, Sequence, Tuple
+
+
+class ClientStateStore:
+    """
+    Struct-of-arrays storage for per-client strategy state.
+    
+    A tracked client costs one dict entry (client_id -> slot) plus 8 bytes per
+    numeric field. Strategies that need a fixed number of values per client
+    (for example a ring of counters) can declare block columns, where slot `i`
+    owns elements `[i * width, (i + 1) * width)` of one flat typed array.
+    Strategies that need a variable-sized structure per client (for example a
+    request log) can enable the `objects` column, a plain list indexed by the
+    same slot.
+    """
+    
+    # Number of slots examined for idle expiry on every lookup
+    sweep_step = 2
+    
+    def __init__(
+        self,
+        fields: Sequence[str],
+        objects: bool = False,
+        blocks: Optional[Dict[str, Tuple[str, int]]] = None,
+        activity_field: Optional[str] = None,
+        idle_ttl: Optional[float] = None,
+        max_clients: Optional[int] = None
+    ):
+        """
+        Initialize the state store.
+        
+        Args:
+            fields: Names of the float64 columns to allocate
+            objects: Whether to keep an additional per-slot Python object column
+            blocks: Block columns as {name: (array typecode, width)}
+            activity_field: Column holding each client's last activity time
+                            (required for idle eviction)
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+                      (None disables idle eviction)
+            max_clients: Maximum number of tracked clients (None for unbounded)
+        """
+        if max_clients is not None and max_clients < 1:
+            raise ValueError("max_clients must be at least 1")
+        
+        self.fields = tuple(fields)
+        self._slots: Dict[str, int] = {}
+        self._columns: Dict[str, array] = {name: array('d') for name in self.fields}
+        self._objects: Optional[List[Any]] = [] if objects else None
+        self._blocks: Dict[str, array] = {}
+        self._block_zeros: Dict[str, array] = {}
+        for name, (typecode, width) in (blocks or {}).items():
+            self._blocks[name] = array(typecode)
+            self._block_zeros[name] = array(typecode, [0]) * width
+        self._owners: List[Optional[str]] = []
+        self._free: List[int] = []
+        
+        self.idle_ttl = idle_ttl if activity_field is not None else None
+        self.max_clients = max_clients
+        self._activity = self._columns[activity_field] if activity_field is not None else None
+        self._referenced = bytearray()
+        self._clock_hand = 0
+        self._sweep_hand = 0
+        
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def __contains__(self, client_id: str) -> bool:
+        return client_id in self._slots
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+    
+    @property
+    def capacity(self) -> int:
+        """Number of allocated slots, including free ones awaiting reuse."""
+        return len(self._owners)
+    
+    def column(self, name: str) -> array:
+        """
+        Get the float64 column for a field.
+        
+        The returned array is stable for the lifetime of the store, so callers
+        may keep a reference to it and index it by slot directly.
+        """
+        return self._columns[name]
+    
+    def block(self, name: str) -> array:
+        """
+        Get the flat typed array backing a block column.
+        
+        Like numeric columns, the returned array is stable for the lifetime of
+        the store.
+        """
+        return self._blocks[name]
+    
+    @property
+    def objects(self) -> List[Any]:
+        """Per-slot Python object column (only available if enabled)."""
+        if self._objects is None:
+            raise AttributeError("This store was created without an objects column")
+        return self._objects
+    
+    def slot(self, client_id: str) -> Optional[int]:
+        """Get the slot index for a client, or None if it is not tracked."""
+        return self._slots.get(client_id)
+    
+    def lookup(self, client_id: str, now: float) -> Optional[int]:
+        """
+        Get the slot for a client on the request path.
+        
+        Unlike `slot`, this advances the incremental idle sweep and marks the
+        client as recently used for CLOCK eviction. The sweep runs before the
+        lookup, so an idle client is returned as untracked rather than with
+        stale state.
+        
+        Args:
+            client_id: Unique identifier for the client
+            now: Current time, comparable with the activity column
+        
+        Returns:
+            Optional[int]: The slot index, or None if the client is not tracked
+        """
+        if self.idle_ttl is not None:
+            self.sweep(now, self.sweep_step)
+        
+        slot = self._slots.get(client_id)
+        if slot is not None:
+            self._referenced[slot] = 1
+        return slot
+    
+    def touch(self, slot: int) -> None:
+        """Mark a slot as recently used for CLOCK eviction."""
+        self._referenced[slot] = 1
+    
+    def needs_eviction(self, new_clients: int) -> bool:
+        """Check whether allocating this many new clients would evict anyone."""
+        return self.max_clients is not None and len(self._slots) + new_clients > self.max_clients
+    
+    def owner(self, slot: int) -> Optional[str]:
+        """Get the client id that currently owns a slot."""
+        return self._owners[slot]
+    
+    def allocate(self, client_id: str, obj: Any = None, **values: float) -> int:
+        """
+        Allocate a slot for a new client, reusing a freed slot when possible.
+        
+        Args:
+            client_id: Unique identifier for the client
+            obj: Initial value of the objects column (if enabled)
+            **values: Initial values for numeric fields (missing ones are 0.0)
+        
+        Returns:
+            int: The slot index assigned to the client
+        """
+        if self.max_clients is not None and len(self._slots) >= self.max_clients:
+            self._evict_one()
+        
+        if self._free:
+            slot = self._free.pop()
+            for name, column in self._columns.items():
+                column[slot] = values.get(name, 0.0)
+            for name, block in self._blocks.items():
+                zeros = self._block_zeros[name]
+                start = slot * len(zeros)
+                block[start:start + len(zeros)] = zeros
+            if self._objects is not None:
+                self._objects[slot] = obj
+            self._owners[slot] = client_id
+            self._referenced[slot] = 0
+        else:
+            slot = len(self._owners)
+            for name, column in self._columns.items():
+                column.append(values.get(name, 0.0))
+            for name, block in self._blocks.items():
+                block.extend(self._block_zeros[name])
+            if self._objects is not None:
+                self._objects.append(obj)
+            self._owners.append(client_id)
+            self._referenced.append(0)
+        
+        self._slots[client_id] = slot
+        return slot
+    
+    def release(self, client_id: str) -> bool:
+        """
+        Forget a client and make its slot available for reuse.
+        
+        Args:
+            client_id: Unique identifier for the client
+        
+        Returns:
+            bool: True if the client was tracked, False otherwise
+        """
+        slot = self._slots.pop(client_id, None)
+        if slot is None:
+            return False
+        
+        if self._objects is not None:
+            self._objects[slot] = None
+        self._owners[slot] = None
+        self._free.append(slot)
+        return True
+    
+    def sweep(self, now: float, steps: int) -> None:
+        """
+        Examine the next slots and release clients idle past the TTL.
+        
+        Args:
+            now: Current time, comparable with the activity column
+            steps: Number of slots to examine
+        """
+        capacity = len(self._owners)
+        if not capacity or self.idle_ttl is None:
+            return
+        
+        threshold = now - self.idle_ttl
+        owners = self._owners
+        activity = self._activity
+        hand = self._sweep_hand
+        
+        for _ in range(min(steps, capacity)):
+            if hand >= capacity:
+                hand = 0
+            owner = owners[hand]
+            if owner is not None and activity[hand] < threshold:
+                self.release(owner)
+                self.evicted_idle += 1
+            hand += 1
+        
+        self._sweep_hand = hand
+    
+    def _evict_one(self) -> None:
+        """
+        Release one client using the CLOCK algorithm.
+        
+        New clients start with their reference bit cleared, so one-off clients
+        (such as scanner IPs) are evicted before clients seen more than once.
+        """
+        owners = self._owners
+        referenced = self._referenced
+        hand = self._clock_hand
+        
+        while True:
+            if hand >= len(owners):
+                hand = 0
+            owner = owners[hand]
+            if owner is not None:
+                if referenced[hand]:
+                    referenced[hand] = 0
+                else:
+                    self.release(owner)
+                    self.evicted_capacity += 1
+                    self._clock_hand = hand + 1
+                    return
+            hand += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get occupancy and eviction counters for the store.
+        
+        Returns:
+            Dict[str, Any]: Tracked clients, slot capacity and eviction counts
+        """
+        return {
+            "clients": len(self._slots),
+            "capacity": len(self._owners),
+            "max_clients": self.max_clients,
+            "idle_ttl": self.idle_ttl,
+            "evicted_idle": self.evicted_idle,
+            "evicted_capacity": self.evicted_capacity
+        }
+    
+    def clear(self) -> None:
+        """Forget all clients and release the underlying storage."""
+        self._slots.clear()
+        for column in self._columns.values():
+            del column[:]
+        for block in self._blocks.values():
+            del block[:]
+        if self._objects is not None:
+            del self._objects[:]
+        del self._owners[:]
+        del self._free[:]
+        del self._referenced[:]
+        self._clock_hand = 0
+        self._sweep_hand = 0
+    
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory held by the store's own containers in bytes.
+        
+        Client id strings are shared with the caller and per-slot objects are
+        owned by the strategy, so neither is included.
+        """
+        total = sys.getsizeof(self._slots) + sys.getsizeof(self._owners) + sys.getsizeof(self._free)
+        total += sys.getsizeof(self._referenced)
+        total += sum(sys.getsizeof(column) for column in self._columns.values())
+        total += sum(sys.getsizeof(block) for block in self._blocks.values())
+        if self._objects is not None:
+            total += sys.getsizeof(self._objects)
+        return total
@@ -6,29 +6,93 @@ to control request rates to an API. Each strategy has different characteristics
 and trade-offs in terms of memory usage, accuracy, and adaptability.
 """
 
-import time
+import sys
 import threading
 import math
+from array import array
 from abc import ABC, abstractmethod
-from collections import defaultdict, deque
-from typing import Dict, Any, List, Tuple, Optional
+from collections import deque
+from typing import Dict, Any, List, Tuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .clock import Clock, default_clock
+from .state import ClientStateStore
 
 
 class RateLimitStrategy(ABC):
-    """Base class for all rate limiting strategies."""
+    """
+    Base class for all rate limiting strategies.
+    
+    Per-client state lives in a shared `ClientStateStore`. Subclasses list the
+    numeric fields they need in `state_fields` and set `state_objects` if they
+    also keep a variable-sized structure per client. The field named by
+    `state_activity_field` holds the client's last activity time and drives
+    idle eviction.
+    """
     
-    def __init__(self, limit: int, window: int):
+    state_fields: Tuple[str, ...] = ()
+    state_objects: bool = False
+    state_activity_field: Optional[str] = None
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None
+    ):
         """
         Initialize the rate limiting strategy.
         
         Args:
             limit: Maximum number of requests allowed in the time window
             window: Time window in seconds
+            max_clients: Maximum number of tracked clients (None for unbounded)
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+                      (None derives it from the window, 0 disables idle eviction)
+            clock: Time source (defaults to a monotonic clock)
         """
         self.limit = limit
         self.window = window
+        self.clock = clock or default_clock
+        self._now = self.clock.now
         self._lock = threading.RLock()
-        self._clients = {}
+        
+        if idle_ttl is None:
+            idle_ttl = self.default_idle_ttl()
+        
+        self._state = ClientStateStore(
+            self.state_fields,
+            objects=self.state_objects,
+            blocks=self.state_blocks(),
+            activity_field=self.state_activity_field,
+            idle_ttl=idle_ttl if idle_ttl > 0 else None,
+            max_clients=max_clients
+        )
+    
+    def state_blocks(self) -> Dict[str, Tuple[str, int]]:
+        """
+        Get the fixed-width block columns this strategy keeps per client.
+        
+        Returns:
+            Dict[str, Tuple[str, int]]: Mapping of block name to (typecode, width)
+        """
+        return {}
+    
+    def default_idle_ttl(self) -> float:
+        """
+        Get the idle time after which a client's state is indistinguishable
+        from a new client's, and can therefore be forgotten.
+        
+        Returns:
+            float: Idle TTL in seconds
+        """
+        return self.window
     
     @abstractmethod
     def allow_request(self, client_id: str) -> bool:
@@ -43,6 +107,75 @@ class RateLimitStrategy(ABC):
         """
         pass
     
+    def allow_requests(self, client_ids: Sequence[str]) -> List[bool]:
+        """
+        Check a batch of requests, in order.
+        
+        The result is the same as calling `allow_request` for each client id in
+        sequence. This default implementation does exactly that under a single
+        lock acquisition; strategies with vectorizable state override it.
+        
+        Args:
+            client_ids: Client identifiers, one per request
+            
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        with self._lock:
+            return [self.allow_request(client_id) for client_id in client_ids]
+    
+    def _batch_rounds(
+        self,
+        client_ids: Sequence[str],
+        initial: Dict[str, float]
+    ) -> Optional[Tuple[List[bool], List[Tuple[List[int], List[int]]]]]:
+        """
+        Resolve slots for a vectorized batch evaluation.
+        
+        The first request of a new client is decided here by allocating its
+        state. All other requests are split into rounds, where round k holds
+        each client's k-th remaining request, so slots are unique within a
+        round and rounds can be evaluated one after another with NumPy.
+        Must be called with the lock held.
+        
+        Args:
+            client_ids: Client identifiers, one per request
+            initial: State of a new client after its first request
+            
+        Returns:
+            Tuple of prefilled results and rounds of (positions, slots), or None
+            if the batch has to be evaluated sequentially (NumPy is unavailable,
+            or allocating the new clients would evict tracked ones)
+        """
+        if np is None:
+            return None
+        
+        state = self._state
+        new_clients = {client_id for client_id in client_ids if client_id not in state}
+        if state.needs_eviction(len(new_clients)):
+            return None
+        
+        results = [False] * len(client_ids)
+        rounds: List[Tuple[List[int], List[int]]] = []
+        occurrences: Dict[int, int] = {}
+        
+        for position, client_id in enumerate(client_ids):
+            slot = state.slot(client_id)
+            if slot is None:
+                state.allocate(client_id, **initial)
+                results[position] = True
+                continue
+            
+            state.touch(slot)
+            round_index = occurrences.get(slot, 0)
+            occurrences[slot] = round_index + 1
+            if round_index == len(rounds):
+                rounds.append(([], []))
+            rounds[round_index][0].append(position)
+            rounds[round_index][1].append(slot)
+        
+        return results, rounds
+    
     def get_stats(self, client_id: str) -> Dict[str, Any]:
         """
         Get statistics for the client.
@@ -54,7 +187,7 @@ class RateLimitStrategy(ABC):
             Dict[str, Any]: Statistics for the client
         """
         with self._lock:
-            if client_id not in self._clients:
+            if client_id not in self._state:
                 return {
                     "client_id": client_id,
                     "exists": False
@@ -67,6 +200,19 @@ class RateLimitStrategy(ABC):
                 "window": self.window
             }
     
+    def retry_after(self, client_id: str) -> Optional[float]:
+        """
+        Get how long the client has to wait before its next request is allowed.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Optional[float]: Seconds to wait (0 if a request would be allowed now),
+                             or None if the strategy cannot compute it
+        """
+        return None
+    
     def reset(self, client_id: str) -> None:
         """
         Reset the client's statistics.
@@ -75,8 +221,27 @@ class RateLimitStrategy(ABC):
             client_id: Unique identifier for the client
         """
         with self._lock:
-            if client_id in self._clients:
-                del self._clients[client_id]
+            self._state.release(client_id)
+    
+    def client_count(self) -> int:
+        """
+        Get the number of clients currently tracked by this strategy.
+        
+        Returns:
+            int: Number of tracked clients
+        """
+        with self._lock:
+            return len(self._state)
+    
+    def get_state_stats(self) -> Dict[str, Any]:
+        """
+        Get occupancy and eviction counters for this strategy's client state.
+        
+        Returns:
+            Dict[str, Any]: Tracked clients, capacity and eviction counts
+        """
+        with self._lock:
+            return self._state.stats()
 
 
 class TokenBucketStrategy(RateLimitStrategy):
@@ -90,20 +255,33 @@ class TokenBucketStrategy(RateLimitStrategy):
     This approach handles bursts well while maintaining a consistent average rate.
     """
     
-    def __init__(self, limit: int, window: int):
+    state_fields = ("tokens", "last_updated")
+    state_activity_field = "last_updated"
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None
+    ):
         """
         Initialize the token bucket strategy.
         
         Args:
             limit: Maximum number of tokens in the bucket
             window: Time window in seconds to refill the bucket
+            max_clients: Maximum number of tracked clients (None for unbounded)
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+            clock: Time source (defaults to a monotonic clock)
         """
-        super().__init__(limit, window)
+        super().__init__(limit, window, max_clients=max_clients, idle_ttl=idle_ttl, clock=clock)
         # Rate at which tokens are added to the bucket (tokens per second)
         self.refill_rate = limit / window
-        # Client state tracking
-        self._client_buckets = {}
-        self._client_last_updated = {}
+        # Client state columns, indexed by slot
+        self._tokens = self._state.column("tokens")
+        self._last_updated = self._state.column("last_updated")
     
     def allow_request(self, client_id: str) -> bool:
         """
@@ -116,30 +294,68 @@ class TokenBucketStrategy(RateLimitStrategy):
             bool: True if the request should be allowed, False otherwise
         """
         with self._lock:
-            current_time = time.time()
+            current_time = self._now()
+            slot = self._state.lookup(client_id, current_time)
             
-            if client_id not in self._client_buckets:
-                self._client_buckets[client_id] = self.limit
-                self._client_last_updated[client_id] = current_time
-                self._clients[client_id] = True
+            if slot is None:
+                # A new client starts with a full bucket and this request consumes one token
+                self._state.allocate(client_id, tokens=self.limit - 1, last_updated=current_time)
                 return True
             
-            tokens = self._client_buckets[client_id]
-            last_updated = self._client_last_updated[client_id]
-            
-            elapsed = current_time - last_updated
-            tokens = min(self.limit, tokens + elapsed * self.refill_rate)
+            elapsed = current_time - self._last_updated[slot]
+            tokens = min(self.limit, self._tokens[slot] + elapsed * self.refill_rate)
+            self._last_updated[slot] = current_time
             
             if tokens < 1:
-                self._client_buckets[client_id] = tokens
-                self._client_last_updated[client_id] = current_time
+                self._tokens[slot] = tokens
                 return False
             
-            self._client_buckets[client_id] = tokens - 1
-            self._client_last_updated[client_id] = current_time
+            self._tokens[slot] = tokens - 1
             
             return True
     
+    def allow_requests(self, client_ids: Sequence[str]) -> List[bool]:
+        """
+        Check a batch of requests, refilling and consuming tokens with NumPy.
+        
+        All requests in the batch are evaluated at the same instant.
+        
+        Args:
+            client_ids: Client identifiers, one per request
+            
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        with self._lock:
+            current_time = self._now()
+            batch = self._batch_rounds(
+                client_ids, {"tokens": self.limit - 1, "last_updated": current_time}
+            )
+            if batch is None:
+                return [self.allow_request(client_id) for client_id in client_ids]
+            
+            results, rounds = batch
+            if rounds:
+                tokens_column = np.frombuffer(self._tokens, dtype=np.float64)
+                last_updated_column = np.frombuffer(self._last_updated, dtype=np.float64)
+                
+                for positions, slots in rounds:
+                    index = np.array(slots, dtype=np.intp)
+                    elapsed = current_time - last_updated_column[index]
+                    tokens = np.minimum(self.limit, tokens_column[index] + elapsed * self.refill_rate)
+                    allowed = tokens >= 1
+                    tokens_column[index] = np.where(allowed, tokens - 1, tokens)
+                    last_updated_column[index] = current_time
+                    
+                    for position, decision in zip(positions, allowed.tolist()):
+                        results[position] = decision
+                
+                # Release the buffer views so the columns can grow again
+                del tokens_column, last_updated_column
+            
+            self._state.sweep(current_time, self._state.sweep_step * len(client_ids))
+            return results
+    
     def get_stats(self, client_id: str) -> Dict[str, Any]:
         """
         Get statistics for the client including token bucket specifics.
@@ -156,12 +372,11 @@ class TokenBucketStrategy(RateLimitStrategy):
             if not stats["exists"]:
                 return stats
             
-            current_time = time.time()
-            tokens = self._client_buckets[client_id]
-            last_updated = self._client_last_updated[client_id]
+            current_time = self._now()
+            slot = self._state.slot(client_id)
             
-            elapsed = current_time - last_updated
-            tokens = min(self.limit, tokens + elapsed * self.refill_rate)
+            elapsed = current_time - self._last_updated[slot]
+            tokens = min(self.limit, self._tokens[slot] + elapsed * self.refill_rate)
             
             stats.update({
                 "tokens": tokens,
@@ -173,6 +388,198 @@ class TokenBucketStrategy(RateLimitStrategy):
             return stats
 
 
+class GCRAStrategy(RateLimitStrategy):
+    """
+    Generic Cell Rate Algorithm implementation.
+    
+    This strategy gives the same burst and average-rate behaviour as a token
+    bucket of `limit` tokens refilled over `window` seconds, but stores a single
+    float per client: the theoretical arrival time (TAT) of the next request.
+    A request is allowed if, after being scheduled one emission interval past
+    the TAT, it is no more than one window ahead of the current time.
+    
+    Because the state is a timestamp, the exact time until the next request
+    would be allowed falls out of the same arithmetic.
+    """
+    
+    state_fields = ("tat",)
+    state_activity_field = "tat"
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None
+    ):
+        """
+        Initialize the GCRA strategy.
+        
+        Args:
+            limit: Maximum burst size (equivalent to the bucket capacity)
+            window: Time window in seconds over which `limit` requests are allowed
+            max_clients: Maximum number of tracked clients (None for unbounded)
+            idle_ttl: Seconds past its TAT after which a client is forgotten
+            clock: Time source (defaults to a monotonic clock)
+        """
+        super().__init__(limit, window, max_clients=max_clients, idle_ttl=idle_ttl, clock=clock)
+        # Time between requests at the sustained rate
+        self.emission_interval = window / limit
+        # Client state column, indexed by slot
+        self._tat = self._state.column("tat")
+    
+    def default_idle_ttl(self) -> float:
+        """
+        Get the idle TTL for GCRA clients.
+        
+        The activity column is the TAT itself, and a client whose TAT has
+        passed has its full burst available, exactly like a new client.
+        
+        Returns:
+            float: Idle TTL in seconds
+        """
+        return self.window / self.limit
+    
+    def _slack(self, current_time: float) -> float:
+        """
+        Get the rounding error allowed when comparing a TAT against the window.
+        
+        A TAT is built by adding the emission interval up to `limit` times, so
+        it can drift a few ULPs of the time values past the exact result; without
+        slack the last request of a full burst is rejected for many limit/window
+        pairs. The slack never exceeds half an emission interval.
+        
+        Args:
+            current_time: Time of the comparison
+        
+        Returns:
+            float: Seconds by which a TAT may exceed the window
+        """
+        error = (self.limit + 2) * (abs(current_time) + self.window) * sys.float_info.epsilon
+        return min(error, self.emission_interval / 2)
+    
+    def allow_request(self, client_id: str) -> bool:
+        """
+        Check if a request should be allowed based on the theoretical arrival time.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            bool: True if the request should be allowed, False otherwise
+        """
+        with self._lock:
+            current_time = self._now()
+            slot = self._state.lookup(client_id, current_time)
+            
+            if slot is None:
+                self._state.allocate(client_id, tat=current_time + self.emission_interval)
+                return True
+            
+            new_tat = max(self._tat[slot], current_time) + self.emission_interval
+            
+            if new_tat - current_time > self.window + self._slack(current_time):
+                return False
+            
+            self._tat[slot] = new_tat
+            
+            return True
+    
+    def allow_requests(self, client_ids: Sequence[str]) -> List[bool]:
+        """
+        Check a batch of requests, advancing theoretical arrival times with NumPy.
+        
+        All requests in the batch are evaluated at the same instant.
+        
+        Args:
+            client_ids: Client identifiers, one per request
+            
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        with self._lock:
+            current_time = self._now()
+            batch = self._batch_rounds(
+                client_ids, {"tat": current_time + self.emission_interval}
+            )
+            if batch is None:
+                return [self.allow_request(client_id) for client_id in client_ids]
+            
+            results, rounds = batch
+            if rounds:
+                tat_column = np.frombuffer(self._tat, dtype=np.float64)
+                horizon = self.window + self._slack(current_time)
+                
+                for positions, slots in rounds:
+                    index = np.array(slots, dtype=np.intp)
+                    new_tat = np.maximum(tat_column[index], current_time) + self.emission_interval
+                    allowed = new_tat - current_time <= horizon
+                    tat_column[index] = np.where(allowed, new_tat, tat_column[index])
+                    
+                    for position, decision in zip(positions, allowed.tolist()):
+                        results[position] = decision
+                
+                # Release the buffer view so the column can grow again
+                del tat_column
+            
+            self._state.sweep(current_time, self._state.sweep_step * len(client_ids))
+            return results
+    
+    def retry_after(self, client_id: str) -> Optional[float]:
+        """
+        Get the exact time until the client's next request would be allowed.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Optional[float]: Seconds to wait (0 if a request would be allowed now)
+        """
+        with self._lock:
+            slot = self._state.slot(client_id)
+            if slot is None:
+                return 0.0
+            
+            current_time = self._now()
+            new_tat = max(self._tat[slot], current_time) + self.emission_interval
+            wait = new_tat - self.window - current_time
+            return wait if wait > self._slack(current_time) else 0.0
+    
+    def get_stats(self, client_id: str) -> Dict[str, Any]:
+        """
+        Get statistics for the client including GCRA specifics.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Dict[str, Any]: Statistics for the client
+        """
+        with self._lock:
+            stats = super().get_stats(client_id)
+            
+            if not stats["exists"]:
+                return stats
+            
+            current_time = self._now()
+            tat = max(self._tat[self._state.slot(client_id)], current_time)
+            slack = self._slack(current_time)
+            remaining = int((self.window + slack - (tat - current_time)) / self.emission_interval)
+            wait = tat + self.emission_interval - self.window - current_time
+            
+            stats.update({
+                "tat": tat,
+                "emission_interval": self.emission_interval,
+                "remaining": remaining,
+                "retry_after": wait if wait > slack else 0.0,
+                "time_to_full": tat - current_time,
+                "strategy": "gcra"
+            })
+            
+            return stats
+
+
 class SlidingWindowCounterStrategy(RateLimitStrategy):
     """
     Sliding Window Counter implementation.
@@ -182,23 +589,53 @@ class SlidingWindowCounterStrategy(RateLimitStrategy):
     
     This approach provides a more accurate count than fixed windows while using less memory
     than a true sliding log.
+    
+    Each client keeps a fixed ring of per-slice counters plus a running total,
+    so a check only clears the slices that expired since the client's last
+    request instead of re-summing the whole window.
     """
     
-    def __init__(self, limit: int, window: int):
+    state_fields = ("last_request", "count", "head")
+    state_activity_field = "last_request"
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None
+    ):
         """
         Initialize the sliding window counter strategy.
         
         Args:
             limit: Maximum number of requests allowed in the time window
             window: Time window in seconds
+            max_clients: Maximum number of tracked clients (None for unbounded)
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+            clock: Time source (defaults to a monotonic clock)
         """
-        super().__init__(limit, window)
+        super().__init__(limit, window, max_clients=max_clients, idle_ttl=idle_ttl, clock=clock)
         # Client state tracking
-        self.precision = min(window, 60)
         self.slice_duration = window / self.precision
         
-        self._client_windows = {}
-        self._client_last_request = {}
+        # Client state columns, indexed by slot. Slot i owns ring elements
+        # [i * precision, (i + 1) * precision) of the slices block.
+        self._slices = self._state.block("slices")
+        self._counts = self._state.column("count")
+        self._heads = self._state.column("head")
+        self._client_last_request = self._state.column("last_request")
+        self._empty_ring = array('I', [0]) * self.precision
+    
+    @property
+    def precision(self) -> int:
+        """Number of slices the window is divided into."""
+        return max(1, int(min(self.window, 60)))
+    
+    def state_blocks(self) -> Dict[str, Tuple[str, int]]:
+        """Per-client ring of slice counters."""
+        return {"slices": ('I', self.precision)}
     
     def allow_request(self, client_id: str) -> bool:
         """
@@ -211,28 +648,39 @@ class SlidingWindowCounterStrategy(RateLimitStrategy):
             bool: True if the request should be allowed, False otherwise
         """
         with self._lock:
-            current_time = time.time()
+            current_time = self._now()
             current_minute = int(current_time / self.slice_duration)
+            precision = self.precision
             
-            if client_id not in self._client_windows:
-                self._client_windows[client_id] = defaultdict(int)
-                self._client_last_request[client_id] = current_time
-                self._clients[client_id] = True
+            slot = self._state.lookup(client_id, current_time)
+            if slot is None:
+                slot = self._state.allocate(
+                    client_id, last_request=current_time, head=current_minute
+                )
             
-            window_start = current_minute - self.precision + 1
+            base = slot * precision
+            head = int(self._heads[slot])
             
-            counter = 0
-            for minute, count in list(self._client_windows[client_id].items()):
-                if minute < window_start:
-                    del self._client_windows[client_id][minute]
+            if current_minute > head:
+                if current_minute - head >= precision:
+                    self._slices[base:base + precision] = self._empty_ring
+                    self._counts[slot] = 0
                 else:
-                    counter += count
+                    slices = self._slices
+                    expired = 0
+                    for minute in range(head + 1, current_minute + 1):
+                        index = base + minute % precision
+                        expired += slices[index]
+                        slices[index] = 0
+                    self._counts[slot] -= expired
+                self._heads[slot] = current_minute
             
-            if counter >= self.limit:
+            if self._counts[slot] >= self.limit:
                 return False
             
-            self._client_windows[client_id][current_minute] += 1
-            self._client_last_request[client_id] = current_time
+            self._slices[base + current_minute % precision] += 1
+            self._counts[slot] += 1
+            self._client_last_request[slot] = current_time
             
             return True
     
@@ -252,20 +700,22 @@ class SlidingWindowCounterStrategy(RateLimitStrategy):
             if not stats["exists"]:
                 return stats
             
-            current_time = time.time()
+            current_time = self._now()
             current_minute = int(current_time / self.slice_duration)
-            window_start = current_minute - self.precision + 1
+            precision = self.precision
+            window_start = current_minute - precision + 1
             
-            counter = 0
-            for minute, count in list(self._client_windows[client_id].items()):
-                if minute >= window_start:
-                    counter += count
+            slot = self._state.slot(client_id)
+            base = slot * precision
+            head = int(self._heads[slot])
             
-            minutes_distribution = {
-                minute: count 
-                for minute, count in self._client_windows[client_id].items()
-                if minute >= window_start
-            }
+            minutes_distribution = {}
+            for minute in range(max(window_start, head - precision + 1), head + 1):
+                count = self._slices[base + minute % precision]
+                if count:
+                    minutes_distribution[minute] = count
+            
+            counter = sum(minutes_distribution.values())
             
             stats.update({
                 "current_count": counter,
@@ -290,7 +740,17 @@ class LeakyBucketStrategy(RateLimitStrategy):
     This approach smooths out bursts and enforces a constant outflow rate.
     """
     
-    def __init__(self, limit: int, window: int):
+    state_fields = ("level", "last_leak")
+    state_activity_field = "last_leak"
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None
+    ):
         """
         Initialize the leaky bucket strategy.
         
@@ -298,13 +758,28 @@ class LeakyBucketStrategy(RateLimitStrategy):
             limit: Bucket depth (maximum level/burst capacity)
             window: Time window used to calculate leak rate
                    (bucket will empty completely in 'window' seconds)
+            max_clients: Maximum number of tracked clients (None for unbounded)
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+            clock: Time source (defaults to a monotonic clock)
         """
-        super().__init__(limit, window)
+        super().__init__(limit, window, max_clients=max_clients, idle_ttl=idle_ttl, clock=clock)
         # Leak rate in units per second
         self.leak_rate = limit / window
-        # Client state tracking
-        self._client_buckets = {}
-        self._client_last_leak = {}
+        # Client state columns, indexed by slot
+        self._levels = self._state.column("level")
+        self._last_leak = self._state.column("last_leak")
+    
+    def default_idle_ttl(self) -> float:
+        """
+        Get the idle TTL for leaky bucket clients.
+        
+        An allowed request can lift the level just below `limit + 1`, so the
+        bucket is only guaranteed to be empty after leaking that much.
+        
+        Returns:
+            float: Idle TTL in seconds
+        """
+        return self.window * (self.limit + 1) / self.limit
     
     def allow_request(self, client_id: str) -> bool:
         """
@@ -317,31 +792,69 @@ class LeakyBucketStrategy(RateLimitStrategy):
             bool: True if the request should be allowed, False otherwise
         """
         with self._lock:
-            current_time = time.time()
+            current_time = self._now()
+            slot = self._state.lookup(client_id, current_time)
             
-            if client_id not in self._client_buckets:
-                self._client_buckets[client_id] = 0
-                self._client_last_leak[client_id] = current_time
-                self._clients[client_id] = True
+            if slot is None:
+                # A new client starts with an empty bucket and this request adds one unit
+                self._state.allocate(client_id, level=1, last_leak=current_time)
                 return True
             
-            last_leak = self._client_last_leak[client_id]
-            level = self._client_buckets[client_id]
-            
-            elapsed = current_time - last_leak
+            elapsed = current_time - self._last_leak[slot]
             leaked = elapsed * self.leak_rate
-            level = max(0, level - leaked)
+            level = max(0, self._levels[slot] - leaked)
+            self._last_leak[slot] = current_time
             
             if level >= self.limit:
-                self._client_buckets[client_id] = level
-                self._client_last_leak[client_id] = current_time
+                self._levels[slot] = level
                 return False
             
-            self._client_buckets[client_id] = level + 1
-            self._client_last_leak[client_id] = current_time
+            self._levels[slot] = level + 1
             
             return True
     
+    def allow_requests(self, client_ids: Sequence[str]) -> List[bool]:
+        """
+        Check a batch of requests, leaking and filling buckets with NumPy.
+        
+        All requests in the batch are evaluated at the same instant.
+        
+        Args:
+            client_ids: Client identifiers, one per request
+            
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        with self._lock:
+            current_time = self._now()
+            batch = self._batch_rounds(
+                client_ids, {"level": 1, "last_leak": current_time}
+            )
+            if batch is None:
+                return [self.allow_request(client_id) for client_id in client_ids]
+            
+            results, rounds = batch
+            if rounds:
+                levels_column = np.frombuffer(self._levels, dtype=np.float64)
+                last_leak_column = np.frombuffer(self._last_leak, dtype=np.float64)
+                
+                for positions, slots in rounds:
+                    index = np.array(slots, dtype=np.intp)
+                    elapsed = current_time - last_leak_column[index]
+                    levels = np.maximum(0, levels_column[index] - elapsed * self.leak_rate)
+                    allowed = levels < self.limit
+                    levels_column[index] = np.where(allowed, levels + 1, levels)
+                    last_leak_column[index] = current_time
+                    
+                    for position, decision in zip(positions, allowed.tolist()):
+                        results[position] = decision
+                
+                # Release the buffer views so the columns can grow again
+                del levels_column, last_leak_column
+            
+            self._state.sweep(current_time, self._state.sweep_step * len(client_ids))
+            return results
+    
     def get_stats(self, client_id: str) -> Dict[str, Any]:
         """
         Get statistics for the client including leaky bucket specifics.
@@ -358,11 +871,11 @@ class LeakyBucketStrategy(RateLimitStrategy):
             if not stats["exists"]:
                 return stats
             
-            current_time = time.time()
-            last_leak = self._client_last_leak[client_id]
-            level = self._client_buckets[client_id]
+            current_time = self._now()
+            slot = self._state.slot(client_id)
+            level = self._levels[slot]
             
-            elapsed = current_time - last_leak
+            elapsed = current_time - self._last_leak[slot]
             leaked = elapsed * self.leak_rate
             level = max(0, level - leaked)
             
@@ -377,6 +890,61 @@ class LeakyBucketStrategy(RateLimitStrategy):
             return stats
 
 
+class _SlicedRequestLog:
+    """
+    Fixed-memory approximation of a request timestamp log.
+    
+    Requests are counted in a ring of equal time slices covering the widest
+    window the log will be asked about. Counting a window includes the whole
+    oldest overlapping slice, so the approximation errs towards rejecting.
+    """
+    
+    __slots__ = ("slice_duration", "counts", "head")
+    
+    def __init__(self, span: float, slices: int, timestamps: Optional[deque] = None):
+        """
+        Initialize the sliced log.
+        
+        Args:
+            span: Widest time window the log must cover, in seconds
+            slices: Number of slices in the ring
+            timestamps: Optional exact log to convert
+        """
+        self.slice_duration = span / slices
+        self.counts = array('I', [0]) * slices
+        self.head = 0
+        
+        for timestamp in timestamps or ():
+            self.append(timestamp)
+    
+    def _advance(self, current_slice: int) -> None:
+        """Clear the slices that fell out of the ring since the last update."""
+        slices = len(self.counts)
+        if current_slice - self.head >= slices:
+            self.counts[:] = array('I', [0]) * slices
+        else:
+            for index in range(self.head + 1, current_slice + 1):
+                self.counts[index % slices] = 0
+        self.head = current_slice
+    
+    def append(self, timestamp: float) -> None:
+        """Record a request at the given time."""
+        current_slice = int(timestamp / self.slice_duration)
+        if current_slice > self.head:
+            self._advance(current_slice)
+        self.counts[current_slice % len(self.counts)] += 1
+    
+    def count_since(self, window_start: float, current_time: float) -> int:
+        """Count requests recorded after window_start (to slice granularity)."""
+        current_slice = int(current_time / self.slice_duration)
+        if current_slice > self.head:
+            self._advance(current_slice)
+        
+        slices = len(self.counts)
+        first_slice = max(int(window_start / self.slice_duration), current_slice - slices + 1)
+        return sum(self.counts[index % slices] for index in range(first_slice, current_slice + 1))
+
+
 class AdaptiveWindowStrategy(RateLimitStrategy):
     """
     Adaptive Window strategy implementation.
@@ -386,17 +954,45 @@ class AdaptiveWindowStrategy(RateLimitStrategy):
     approaches, with additional intelligence to adapt to changing conditions.
     
     This approach is best for handling variable traffic with unknown patterns.
+    
+    Each client's request log is a deque whose expired timestamps are popped
+    from the left. When `approximate_above` is set, clients whose effective
+    limit exceeds it switch to a fixed ring of slice counters instead, so heavy
+    clients cost a constant amount of memory.
     """
     
-    def __init__(self, limit: int, window: int):
+    # Number of slices used by the approximate request log
+    approximate_slices = 30
+    
+    state_fields = (
+        "effective_limit", "effective_window", "requests", "allowed", "last_adapt", "last_seen"
+    )
+    state_objects = True
+    state_activity_field = "last_seen"
+    
+    def __init__(
+        self,
+        limit: int,
+        window: int,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None,
+        approximate_above: Optional[int] = None
+    ):
         """
         Initialize the adaptive window strategy.
         
         Args:
             limit: Initial maximum requests per window
             window: Initial time window in seconds
+            max_clients: Maximum number of tracked clients (None for unbounded)
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+            clock: Time source (defaults to a monotonic clock)
+            approximate_above: Effective limit above which a client's exact
+                               request log is replaced by sliced counters
+                               (None keeps exact logs for every client)
         """
-        super().__init__(limit, window)
+        super().__init__(limit, window, max_clients=max_clients, idle_ttl=idle_ttl, clock=clock)
         
         # Client state tracking
         self.min_limit = max(1, limit // 10)
@@ -404,16 +1000,32 @@ class AdaptiveWindowStrategy(RateLimitStrategy):
         self.min_window = max(1, window // 4)
         self.max_window = window * 2
         
+        self.approximate_above = approximate_above
+        
         self.adaptation_rate = 0.1
         self.threshold_high = 0.8
         self.threshold_low = 0.2
         
-        self._effective_limits = {}
-        self._effective_windows = {}
-        self._client_requests = {}
-        self._client_allowed = {}
-        self._client_last_adapt = {}
-        self._client_last_request = {}
+        # Client state columns, indexed by slot; request logs live in the objects column
+        self._effective_limits = self._state.column("effective_limit")
+        self._effective_windows = self._state.column("effective_window")
+        self._client_requests = self._state.column("requests")
+        self._client_allowed = self._state.column("allowed")
+        self._client_last_adapt = self._state.column("last_adapt")
+        self._last_seen = self._state.column("last_seen")
+        self._client_last_request = self._state.objects
+    
+    def default_idle_ttl(self) -> float:
+        """
+        Get the idle TTL for adaptive clients.
+        
+        The effective window can grow up to twice the base window, so a client
+        is only forgotten once even the widest window has fully expired.
+        
+        Returns:
+            float: Idle TTL in seconds
+        """
+        return self.window * 2
     
     def allow_request(self, client_id: str) -> bool:
         """
@@ -426,61 +1038,72 @@ class AdaptiveWindowStrategy(RateLimitStrategy):
             bool: True if the request should be allowed, False otherwise
         """
         with self._lock:
-            current_time = time.time()
+            current_time = self._now()
             
-            if client_id not in self._effective_limits:
-                self._effective_limits[client_id] = self.limit
-                self._effective_windows[client_id] = self.window
-                self._client_requests[client_id] = 0
-                self._client_allowed[client_id] = 0
-                self._client_last_adapt[client_id] = current_time
-                self._client_last_request[client_id] = []
-                self._clients[client_id] = True
+            slot = self._state.lookup(client_id, current_time)
+            if slot is None:
+                slot = self._state.allocate(
+                    client_id,
+                    obj=deque(maxlen=self.max_limit),
+                    effective_limit=self.limit,
+                    effective_window=self.window,
+                    last_adapt=current_time
+                )
             
-            self._adjust_parameters(client_id)
+            self._last_seen[slot] = current_time
+            self._adjust_parameters(slot, current_time)
             
-            effective_limit = self._effective_limits[client_id]
-            effective_window = self._effective_windows[client_id]
+            effective_limit = self._effective_limits[slot]
+            effective_window = self._effective_windows[slot]
             
             window_start = current_time - effective_window
             
-            self._client_requests[client_id] += 1
+            self._client_requests[slot] += 1
+            
+            request_log = self._client_last_request[slot]
             
-            requests_in_window = 0
-            self._client_last_request[client_id] = [
-                t for t in self._client_last_request[client_id] if t > window_start
-            ]
-            requests_in_window = len(self._client_last_request[client_id])
+            if type(request_log) is deque:
+                while request_log and request_log[0] <= window_start:
+                    request_log.popleft()
+                requests_in_window = len(request_log)
+                
+                if self.approximate_above is not None and effective_limit > self.approximate_above:
+                    request_log = _SlicedRequestLog(
+                        self.max_window, self.approximate_slices, request_log
+                    )
+                    self._client_last_request[slot] = request_log
+            else:
+                requests_in_window = request_log.count_since(window_start, current_time)
             
             if requests_in_window >= effective_limit:
                 return False
             
-            self._client_last_request[client_id].append(current_time)
-            self._client_allowed[client_id] += 1
+            request_log.append(current_time)
+            self._client_allowed[slot] += 1
             
             return True
     
-    def _adjust_parameters(self, client_id: str) -> None:
+    def _adjust_parameters(self, slot: int, current_time: float) -> None:
         """
         Adjust rate limiting parameters based on observed request patterns.
         
         Args:
-            client_id: Unique identifier for the client
+            slot: State slot of the client
+            current_time: Current time on the strategy's clock
         """
-        current_time = time.time()
-        last_adapt = self._client_last_adapt[client_id]
+        last_adapt = self._client_last_adapt[slot]
         
         if current_time - last_adapt < self.window / 4:
             return
         
-        total_requests = self._client_requests[client_id]
+        total_requests = self._client_requests[slot]
         if total_requests < 10:
             return
         
-        allowed = self._client_allowed[client_id]
+        allowed = self._client_allowed[slot]
         
-        effective_limit = self._effective_limits[client_id]
-        effective_window = self._effective_windows[client_id]
+        effective_limit = self._effective_limits[slot]
+        effective_window = self._effective_windows[slot]
         
         allow_ratio = allowed / total_requests
         
@@ -491,12 +1114,12 @@ class AdaptiveWindowStrategy(RateLimitStrategy):
             effective_limit = max(self.min_limit, effective_limit * (1 - self.adaptation_rate))
             effective_window = max(self.min_window, effective_window * (1 - self.adaptation_rate))
         
-        self._effective_limits[client_id] = effective_limit
-        self._effective_windows[client_id] = effective_window
-        self._client_last_adapt[client_id] = current_time
+        self._effective_limits[slot] = effective_limit
+        self._effective_windows[slot] = effective_window
+        self._client_last_adapt[slot] = current_time
         
-        self._client_requests[client_id] = 0
-        self._client_allowed[client_id] = 0
+        self._client_requests[slot] = 0
+        self._client_allowed[slot] = 0
     
     def get_stats(self, client_id: str) -> Dict[str, Any]:
         """
@@ -514,17 +1137,20 @@ class AdaptiveWindowStrategy(RateLimitStrategy):
             if not stats["exists"]:
                 return stats
             
-            current_time = time.time()
-            effective_limit = self._effective_limits[client_id]
-            effective_window = self._effective_windows[client_id]
+            current_time = self._now()
+            slot = self._state.slot(client_id)
+            effective_limit = self._effective_limits[slot]
+            effective_window = self._effective_windows[slot]
             window_start = current_time - effective_window
             
-            requests_in_window = len([
-                t for t in self._client_last_request[client_id] if t > window_start
-            ])
+            request_log = self._client_last_request[slot]
+            if type(request_log) is deque:
+                requests_in_window = sum(1 for t in request_log if t > window_start)
+            else:
+                requests_in_window = request_log.count_since(window_start, current_time)
             
-            total_requests = self._client_requests[client_id]
-            allowed = self._client_allowed[client_id]
+            total_requests = int(self._client_requests[slot])
+            allowed = int(self._client_allowed[slot])
             allow_ratio = allowed / total_requests if total_requests > 0 else 1.0
             
             stats.update({
@@ -541,4 +1167,171 @@ class AdaptiveWindowStrategy(RateLimitStrategy):
                 "strategy": "adaptive_window"
             })
             
-            return stats 
\ No newline at end of file
+            return stats
+
+
+class ShardedStrategy(RateLimitStrategy):
+    """
+    Lock-striped wrapper around another strategy.
+    
+    Client state is partitioned across several independent instances of the
+    wrapped strategy by hashing the client id, so requests from different
+    clients only contend when they land on the same stripe. Each client always
+    maps to the same stripe, so per-client semantics are unchanged.
+    """
+    
+    def __init__(
+        self,
+        strategy_class: type,
+        limit: int,
+        window: int,
+        shards: int = 16,
+        max_clients: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Optional[Clock] = None,
+        **strategy_kwargs: Any
+    ):
+        """
+        Initialize the sharded strategy.
+        
+        Args:
+            strategy_class: Strategy class to instantiate for every stripe
+            limit: Maximum number of requests allowed in the time window
+            window: Time window in seconds
+            shards: Number of independent stripes
+            max_clients: Maximum number of tracked clients across all stripes
+            idle_ttl: Seconds of inactivity after which a client is forgotten
+            clock: Time source (defaults to a monotonic clock)
+            **strategy_kwargs: Extra keyword arguments for the wrapped strategy
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        
+        # Client state and locking live in the stripes; the base initializer
+        # would only allocate a store this wrapper never touches
+        self.limit = limit
+        self.window = window
+        self.clock = clock or default_clock
+        self._now = self.clock.now
+        
+        shard_max_clients = None
+        if max_clients is not None:
+            shard_max_clients = max(1, math.ceil(max_clients / shards))
+        
+        self.strategy_class = strategy_class
+        self.shards = [
+            strategy_class(
+                limit, window,
+                max_clients=shard_max_clients,
+                idle_ttl=idle_ttl,
+                clock=clock,
+                **strategy_kwargs
+            )
+            for _ in range(shards)
+        ]
+    
+    def _shard(self, client_id: str) -> RateLimitStrategy:
+        """Get the stripe responsible for a client."""
+        return self.shards[hash(client_id) % len(self.shards)]
+    
+    def allow_request(self, client_id: str) -> bool:
+        """
+        Check if a request should be allowed by the client's stripe.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            bool: True if the request should be allowed, False otherwise
+        """
+        return self._shard(client_id).allow_request(client_id)
+    
+    def allow_requests(self, client_ids: Sequence[str]) -> List[bool]:
+        """
+        Check a batch of requests, evaluating each stripe's share as one batch.
+        
+        Args:
+            client_ids: Client identifiers, one per request
+            
+        Returns:
+            List[bool]: Decision for each request, in the same order
+        """
+        groups: Dict[int, Tuple[List[int], List[str]]] = {}
+        for position, client_id in enumerate(client_ids):
+            positions, shard_client_ids = groups.setdefault(
+                hash(client_id) % len(self.shards), ([], [])
+            )
+            positions.append(position)
+            shard_client_ids.append(client_id)
+        
+        results = [False] * len(client_ids)
+        for shard_index, (positions, shard_client_ids) in groups.items():
+            decisions = self.shards[shard_index].allow_requests(shard_client_ids)
+            for position, decision in zip(positions, decisions):
+                results[position] = decision
+        
+        return results
+    
+    def get_stats(self, client_id: str) -> Dict[str, Any]:
+        """
+        Get statistics for the client from its stripe.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Dict[str, Any]: Statistics for the client
+        """
+        return self._shard(client_id).get_stats(client_id)
+    
+    def reset(self, client_id: str) -> None:
+        """
+        Reset the client's statistics in its stripe.
+        
+        Args:
+            client_id: Unique identifier for the client
+        """
+        self._shard(client_id).reset(client_id)
+    
+    def retry_after(self, client_id: str) -> Optional[float]:
+        """
+        Get the retry-after time for the client from its stripe.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Optional[float]: Seconds to wait, or None if unknown
+        """
+        return self._shard(client_id).retry_after(client_id)
+    
+    def client_count(self) -> int:
+        """
+        Get the number of clients tracked across all stripes.
+        
+        Returns:
+            int: Number of tracked clients
+        """
+        return sum(shard.client_count() for shard in self.shards)
+    
+    def get_state_stats(self) -> Dict[str, Any]:
+        """
+        Get occupancy and eviction counters summed across all stripes.
+        
+        Returns:
+            Dict[str, Any]: Tracked clients, capacity and eviction counts
+        """
+        totals = {
+            "clients": 0,
+            "capacity": 0,
+            "evicted_idle": 0,
+            "evicted_capacity": 0
+        }
+        
+        for shard in self.shards:
+            shard_stats = shard.get_state_stats()
+            for key in totals:
+                totals[key] += shard_stats[key]
+        
+        totals["shards"] = len(self.shards)
+        return totals
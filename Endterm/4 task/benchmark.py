@@ -4,12 +4,26 @@ import random
 import argparse
 import json
 import statistics
+import tracemalloc
+import threading
+import logging
 from typing import Dict, List, Any, Callable, Tuple
 import matplotlib.pyplot as plt
 import numpy as np
 from tqdm import tqdm
 
-from adaptive_shield import AdaptiveShield, RateLimitStrategy
+from adaptive_shield import (
+    AdaptiveShield,
+    RateLimitStrategy,
+    TokenBucketStrategy,
+    GCRAStrategy,
+    SlidingWindowCounterStrategy,
+    LeakyBucketStrategy,
+    AdaptiveWindowStrategy,
+    LatencyHistogram,
+    RouteMatcher
+)
+from adaptive_shield.clock import VirtualClock
 
 
 class Benchmark:
@@ -114,14 +128,13 @@ class Benchmark:
         allowed_requests = sum(r["allowed_requests"] for r in client_results)
         rejected_requests = sum(r["rejected_requests"] for r in client_results)
         
-        all_response_times = []
+        latency = LatencyHistogram()
         for result in client_results:
-            if "processing_times" in result["shield_stats"]:
-                all_response_times.extend(result["shield_stats"]["processing_times"])
+            latency.merge(self.shields[strategy_name].get_latency_histogram(client_id=result["client_id"]))
         
-        avg_response_time = statistics.mean(all_response_times) if all_response_times else 0
-        p95_response_time = np.percentile(all_response_times, 95) if all_response_times else 0
-        p99_response_time = np.percentile(all_response_times, 99) if all_response_times else 0
+        avg_response_time = latency.mean()
+        p95_response_time = latency.percentile(95)
+        p99_response_time = latency.percentile(99)
         
         return {
             "strategy": strategy_name,
@@ -228,6 +241,63 @@ class Benchmark:
             "client_stats": client_stats
         }
     
+    def run_virtual_load_test(
+        self,
+        strategy_name: str,
+        load_pattern: Callable[[int], float],
+        duration_seconds: int = 60,
+        num_clients: int = 5
+    ) -> Dict[str, Any]:
+        clock = VirtualClock()
+        shield = AdaptiveShield(
+            default_limit=100,
+            default_window=5,
+            default_strategy=RateLimitStrategy[strategy_name],
+            monitor_interval=0,
+            auto_adapt=False,
+            clock=clock
+        )
+        
+        time_points = []
+        request_rates = []
+        acceptance_rates = []
+        
+        client_ids = [f"load_test_client_{i}" for i in range(num_clients)]
+        
+        elapsed = 0.0
+        while elapsed < duration_seconds:
+            target_rps = load_pattern(elapsed)
+            
+            time_points.append(elapsed)
+            request_rates.append(target_rps)
+            
+            allowed = 0
+            total = 0
+            
+            for client_id in client_ids:
+                result = shield.check_request(client_id, "/api/load_test")
+                if result:
+                    allowed += 1
+                total += 1
+            
+            acceptance_rates.append(allowed / total if total > 0 else 0)
+            
+            delay = 1.0 / (target_rps * num_clients) if target_rps > 0 else 0.1
+            clock.advance(delay)
+            elapsed += delay
+        
+        client_stats = {client_id: shield.get_client_stats(client_id) for client_id in client_ids}
+        
+        return {
+            "strategy": strategy_name,
+            "duration_seconds": duration_seconds,
+            "num_clients": num_clients,
+            "time_points": time_points,
+            "request_rates": request_rates,
+            "acceptance_rates": acceptance_rates,
+            "client_stats": client_stats
+        }
+    
     def plot_results(self, results: Dict[str, Dict[str, Any]]) -> None:
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
         
@@ -287,6 +357,623 @@ class Benchmark:
         plt.close()
 
 
+def measure_memory_per_client(
+    strategy_class: type,
+    num_clients: int,
+    limit: int = 100,
+    window: int = 60
+) -> float:
+    client_ids = [f"memory_client_{i}" for i in range(num_clients)]
+    strategy = strategy_class(limit, window)
+    
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for client_id in client_ids:
+        strategy.allow_request(client_id)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return allocated / num_clients
+
+
+def measure_dict_layout_per_client(num_clients: int, fields: int = 2) -> float:
+    client_ids = [f"memory_client_{i}" for i in range(num_clients)]
+    
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    clients = {}
+    columns = [{} for _ in range(fields)]
+    for client_id in client_ids:
+        clients[client_id] = True
+        for column in columns:
+            column[client_id] = time.time()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return allocated / num_clients
+
+
+def run_memory_benchmark(num_clients: int) -> Dict[str, float]:
+    results = {
+        "dict_layout_baseline": measure_dict_layout_per_client(num_clients)
+    }
+    
+    for strategy_class in [
+        TokenBucketStrategy,
+        GCRAStrategy,
+        LeakyBucketStrategy,
+        SlidingWindowCounterStrategy,
+        AdaptiveWindowStrategy
+    ]:
+        results[strategy_class.__name__] = measure_memory_per_client(strategy_class, num_clients)
+    
+    print(f"Memory per tracked client ({num_clients} clients):")
+    for name, per_client in results.items():
+        print(f"  {name}: {per_client:.1f} bytes")
+    
+    return results
+
+
+def measure_throughput(
+    shield: AdaptiveShield,
+    num_threads: int,
+    requests_per_thread: int,
+    clients_per_thread: int = 100
+) -> float:
+    barrier = threading.Barrier(num_threads + 1)
+    
+    def worker(thread_index: int) -> None:
+        client_ids = [f"thread_{thread_index}_client_{i}" for i in range(clients_per_thread)]
+        barrier.wait()
+        for i in range(requests_per_thread):
+            shield.check_request(client_ids[i % clients_per_thread], "/api/test")
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    
+    barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+    
+    return num_threads * requests_per_thread / elapsed
+
+
+def run_thread_scaling_benchmark(
+    thread_counts: List[int],
+    requests_per_thread: int = 20000,
+    shards: int = 16
+) -> Dict[str, Dict[int, float]]:
+    results = {}
+    
+    for mode, shard_count in [("single_lock", 1), (f"sharded_{shards}", shards)]:
+        results[mode] = {}
+        for num_threads in thread_counts:
+            shield = AdaptiveShield(
+                default_limit=1000,
+                default_window=60,
+                monitor_interval=0,
+                auto_adapt=False,
+                shards=shard_count
+            )
+            ops_per_second = measure_throughput(shield, num_threads, requests_per_thread)
+            results[mode][num_threads] = ops_per_second
+            print(f"  {mode:>12} | {num_threads:>3} threads | {ops_per_second:>12,.0f} checks/s")
+    
+    return results
+
+
+def run_batch_benchmark(
+    batch_size: int,
+    num_batches: int = 200,
+    num_clients: int = 10000
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    
+    for strategy in [
+        RateLimitStrategy.TOKEN_BUCKET,
+        RateLimitStrategy.GCRA,
+        RateLimitStrategy.LEAKY_BUCKET,
+        RateLimitStrategy.SLIDING_WINDOW
+    ]:
+        random.seed(42)
+        batches = [
+            [(f"client_{random.randrange(num_clients)}", "/api/test") for _ in range(batch_size)]
+            for _ in range(num_batches)
+        ]
+        total_requests = batch_size * num_batches
+        results[strategy.value] = {}
+        
+        for mode in ["scalar", "batch"]:
+            shield = AdaptiveShield(
+                default_limit=100,
+                default_window=60,
+                default_strategy=strategy,
+                monitor_interval=0,
+                auto_adapt=False
+            )
+            start_time = time.perf_counter()
+            if mode == "scalar":
+                for batch in batches:
+                    for client_id, route in batch:
+                        shield.check_request(client_id, route)
+            else:
+                for batch in batches:
+                    shield.check_requests_batch(batch)
+            elapsed = time.perf_counter() - start_time
+            results[strategy.value][mode] = total_requests / elapsed
+        
+        speedup = results[strategy.value]["batch"] / results[strategy.value]["scalar"]
+        print(f"  {strategy.value:>14} | scalar {results[strategy.value]['scalar']:>12,.0f} checks/s"
+              f" | batch {results[strategy.value]['batch']:>12,.0f} checks/s | {speedup:.2f}x")
+    
+    return results
+
+
+def run_latency_benchmark(
+    num_requests: int = 200000,
+    num_clients: int = 1000,
+    num_routes: int = 20
+) -> Dict[str, float]:
+    shield = AdaptiveShield(
+        default_limit=10**9,
+        default_window=60,
+        monitor_interval=0,
+        auto_adapt=False
+    )
+    for i in range(num_routes // 2):
+        shield.set_route_limit(f"/api/route_{i}", 10**9, 60)
+    for i in range(num_clients // 20):
+        shield.set_client_limit(f"client_{i}", 10**9, 60)
+    
+    random.seed(42)
+    requests = [
+        (f"client_{random.randrange(num_clients)}", f"/api/route_{random.randrange(num_routes)}")
+        for _ in range(num_requests)
+    ]
+    for client_id, route in requests:
+        shield.check_request(client_id, route)
+    
+    start_time = time.perf_counter()
+    for client_id, route in requests:
+        shield._resolve_strategy(client_id, route)
+    resolve_time = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    for client_id, route in requests:
+        shield.check_request(client_id, route)
+    check_time = time.perf_counter() - start_time
+    
+    results = {
+        "resolve_ns": resolve_time * 1e9 / num_requests,
+        "check_request_ns": check_time * 1e9 / num_requests
+    }
+    
+    print(f"  Rule resolution: {results['resolve_ns']:.0f} ns/call")
+    print(f"  check_request:   {results['check_request_ns']:.0f} ns/call")
+    
+    return results
+
+
+def run_cleanup_benchmark(num_clients: int, hot_clients: int = 1000) -> Dict[str, float]:
+    clock = VirtualClock()
+    shield = AdaptiveShield(
+        default_limit=10**9,
+        default_window=60,
+        monitor_interval=0,
+        auto_adapt=False,
+        metrics_retention=3600,
+        max_clients_per_strategy=100000,
+        clock=clock
+    )
+    
+    # Half of the clients fall out of retention, the other half are kept
+    for i in tqdm(range(num_clients), desc="Populating metrics"):
+        if i == num_clients // 2:
+            clock.advance(1800)
+        shield.check_request(f"client_{i}", f"/api/route_{i % 20}")
+    clock.advance(1800 + 2 * shield.metrics_bucket_width)
+    
+    def measure(keep_going: Callable[[int], bool]) -> List[int]:
+        latencies = []
+        i = 0
+        while keep_going(i):
+            start = time.perf_counter_ns()
+            shield.check_request(f"hot_{i % hot_clients}", "/api/hot")
+            latencies.append(time.perf_counter_ns() - start)
+            i += 1
+        return latencies
+    
+    def summarize(latencies: List[int]) -> Tuple[float, float, float]:
+        latencies.sort()
+        return (
+            latencies[len(latencies) // 2] / 1000,
+            latencies[int(len(latencies) * 0.99)] / 1000,
+            latencies[-1] / 1000
+        )
+    
+    baseline = summarize(measure(lambda i: i < 100000))
+    
+    pairs_before = len(shield._metrics.pairs())
+    cleanup_time = [0.0]
+    
+    def cleanup() -> None:
+        start = time.perf_counter()
+        shield._clean_old_metrics()
+        cleanup_time[0] = time.perf_counter() - start
+    
+    cleaner = threading.Thread(target=cleanup)
+    cleaner.start()
+    during = summarize(measure(lambda i: cleaner.is_alive() or i < 1000))
+    cleaner.join()
+    pairs_after = len(shield._metrics.pairs())
+    
+    results = {
+        "pairs_before": pairs_before,
+        "pairs_expired": pairs_before - pairs_after,
+        "cleanup_seconds": cleanup_time[0],
+        "baseline_p50_us": baseline[0],
+        "baseline_p99_us": baseline[1],
+        "baseline_max_us": baseline[2],
+        "cleanup_p50_us": during[0],
+        "cleanup_p99_us": during[1],
+        "cleanup_max_us": during[2]
+    }
+    
+    print(f"  Expired {results['pairs_expired']} of {pairs_before} pairs in {cleanup_time[0]:.2f}s")
+    print(f"  {'':<16}{'p50 (us)':>10}{'p99 (us)':>10}{'max (us)':>10}")
+    print(f"  {'Baseline':<16}{baseline[0]:>10.1f}{baseline[1]:>10.1f}{baseline[2]:>10.1f}")
+    print(f"  {'During cleanup':<16}{during[0]:>10.1f}{during[1]:>10.1f}{during[2]:>10.1f}")
+    
+    return results
+
+
+def linear_route_match(patterns: List[str], path: str) -> str:
+    """Reference matcher testing every pattern in turn, as a baseline."""
+    best, best_score = None, None
+    segments = path.split("/")
+    for pattern in patterns:
+        pattern_segments = pattern.split("/")
+        if pattern_segments[-1] == "*":
+            prefix = pattern_segments[:-1]
+            if len(segments) <= len(prefix):
+                continue
+        elif len(pattern_segments) != len(segments):
+            continue
+        else:
+            prefix = pattern_segments
+        
+        score = []
+        for expected, segment in zip(prefix, segments):
+            if expected == segment:
+                score.append(2)
+            elif expected.startswith("{") and segment:
+                score.append(1)
+            else:
+                break
+        else:
+            score.append(2 if len(prefix) == len(segments) else 0)
+            if best_score is None or score > best_score:
+                best, best_score = pattern, score
+    return best
+
+
+def run_routing_benchmark(num_routes: int, num_lookups: int = 100000) -> Dict[str, float]:
+    patterns = []
+    for i in range(num_routes):
+        kind = i % 3
+        if kind == 0:
+            patterns.append(f"/api/v1/resource_{i}")
+        elif kind == 1:
+            patterns.append(f"/api/v1/resource_{i}/{{id}}")
+        else:
+            patterns.append(f"/static/bucket_{i}/*")
+    
+    start_time = time.perf_counter()
+    matcher = RouteMatcher()
+    for pattern in patterns:
+        matcher.add(pattern)
+    build_time = time.perf_counter() - start_time
+    
+    random.seed(42)
+    paths = []
+    for _ in range(num_lookups):
+        i = random.randrange(num_routes)
+        kind = i % 3
+        if kind == 0:
+            paths.append(f"/api/v1/resource_{i}")
+        elif kind == 1:
+            paths.append(f"/api/v1/resource_{i}/{random.randrange(10**6)}")
+        else:
+            paths.append(f"/static/bucket_{i}/css/{random.randrange(100)}.css")
+    
+    start_time = time.perf_counter()
+    for path in paths:
+        matcher.match(path)
+    match_time = time.perf_counter() - start_time
+    
+    linear_lookups = max(1, num_lookups // 100)
+    start_time = time.perf_counter()
+    for path in paths[:linear_lookups]:
+        linear_route_match(patterns, path)
+    linear_time = time.perf_counter() - start_time
+    
+    shield = AdaptiveShield(
+        default_limit=10**9,
+        default_window=60,
+        monitor_interval=0,
+        auto_adapt=False,
+        max_clients_per_strategy=100000
+    )
+    logging.disable(logging.INFO)
+    for pattern in patterns:
+        shield.set_route_limit(pattern, 10**9, 60)
+    logging.disable(logging.NOTSET)
+    
+    # Every path is new to the resolved rule cache, so each check resolves
+    # its rule through the matcher
+    start_time = time.perf_counter()
+    for path in paths:
+        shield.check_request("client", path)
+    check_time = time.perf_counter() - start_time
+    
+    results = {
+        "routes": num_routes,
+        "build_ms": build_time * 1000,
+        "match_ns": match_time * 1e9 / num_lookups,
+        "linear_scan_ns": linear_time * 1e9 / linear_lookups,
+        "check_request_ns": check_time * 1e9 / num_lookups
+    }
+    
+    print(f"  Compile {num_routes} patterns:     {results['build_ms']:.1f} ms")
+    print(f"  RouteMatcher.match:         {results['match_ns']:.0f} ns/call")
+    print(f"  Linear pattern scan:        {results['linear_scan_ns']:.0f} ns/call")
+    print(f"  check_request (cache miss): {results['check_request_ns']:.0f} ns/call")
+    
+    return results
+
+
+def run_burst_check(
+    limits: Tuple[int, ...] = tuple(range(1, 41)) + (50, 60, 99, 100, 1000),
+    windows: Tuple[int, ...] = (1, 2, 3, 7, 10, 30, 60, 3600),
+    start_times: Tuple[float, ...] = (0.0, 86400.5, 1.7e9)
+) -> Dict[str, Dict[str, int]]:
+    # A new client of a burst strategy must get exactly `limit` requests,
+    # whether checked one by one or in a batch, at any clock value
+    strategies = {"TokenBucket": TokenBucketStrategy, "GCRA": GCRAStrategy}
+    
+    results = {}
+    for name, strategy_class in strategies.items():
+        cases = 0
+        failures = 0
+        for start_time in start_times:
+            for limit in limits:
+                for window in windows:
+                    cases += 1
+                    single = strategy_class(limit, window, clock=VirtualClock(start_time))
+                    admitted = sum(single.allow_request("client") for _ in range(limit + 5))
+                    batched = strategy_class(limit, window, clock=VirtualClock(start_time))
+                    admitted_batch = sum(batched.allow_requests(["client"] * (limit + 5)))
+                    if admitted != limit or admitted_batch != limit:
+                        failures += 1
+                        if failures <= 5:
+                            print(f"  {name}: limit={limit} window={window} t={start_time} "
+                                  f"admitted {admitted} (batch {admitted_batch})")
+        results[name] = {"cases": cases, "failures": failures}
+    
+    for name, result in results.items():
+        print(f"  {name:<12} {result['cases'] - result['failures']}/{result['cases']} "
+              f"limit/window pairs admit exactly the limit")
+    
+    return results
+
+
+def run_redis_benchmark(
+    num_requests: int = 20000,
+    host: str = "localhost",
+    port: int = 6379,
+    batch_size: int = 64,
+    threads: int = 16
+) -> Dict[str, Dict[str, float]]:
+    # Needs a running Redis; the example module connects on import
+    from distributed_example import (
+        DistributedAdaptiveShield,
+        RateLimitStrategy as RedisStrategy,
+        CHECK_SCRIPTS
+    )
+    
+    namespace = "adaptive_shield_bench"
+    shield = DistributedAdaptiveShield(
+        redis_host=host,
+        redis_port=port,
+        namespace=namespace,
+        default_limit=10**9,
+        default_window=60
+    )
+    shield.set_route_limit("/bench", 10**9, 60, RedisStrategy.TOKEN_BUCKET)
+    shield.set_route_limit("/bench/fixed", 10**9, 60, RedisStrategy.FIXED_WINDOW)
+    
+    requests = [(f"client_{i % 100}", "/bench") for i in range(num_requests)]
+    fixed_requests = [(client_id, "/bench/fixed") for client_id, _ in requests]
+    
+    def eval_source():
+        # What every request cost before the scripts were registered
+        for client_id, route in requests:
+            keys, args = shield._check_call(client_id, route, shield.clock.now())
+            shield.redis.eval(CHECK_SCRIPTS["TOKEN_BUCKET"], len(keys), *keys, *args)
+    
+    def evalsha():
+        for client_id, route in requests:
+            shield.check_request(client_id, route)
+    
+    def pipelined():
+        for start in range(0, num_requests, batch_size):
+            shield.check_requests_batch(requests[start:start + batch_size])
+    
+    def micro_batched():
+        # Concurrent callers coalesced by the shield's micro-batcher
+        batched = DistributedAdaptiveShield(
+            redis_host=host,
+            redis_port=port,
+            namespace=namespace,
+            default_limit=10**9,
+            default_window=60,
+            micro_batch_window=0.001,
+            micro_batch_size=batch_size
+        )
+        per_thread = num_requests // threads
+        
+        def worker(offset: int):
+            for client_id, route in requests[offset:offset + per_thread]:
+                batched.check_request(client_id, route)
+        
+        workers = [threading.Thread(target=worker, args=(i * per_thread,)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    
+    def leased():
+        # Hot clients served from locally leased blocks of tokens
+        leasing = DistributedAdaptiveShield(
+            redis_host=host,
+            redis_port=port,
+            namespace=namespace,
+            default_limit=10**9,
+            default_window=60,
+            lease_fraction=0.1
+        )
+        for client_id, route in requests:
+            leasing.check_request(client_id, route)
+        leasing.release_leases()
+    
+    def fixed_window_script():
+        for client_id, route in fixed_requests:
+            shield.check_request(client_id, route)
+    
+    def fixed_window_fast_path():
+        # INCR and EXPIRE on a key per window, stats flushed in batches
+        fast = DistributedAdaptiveShield(
+            redis_host=host,
+            redis_port=port,
+            namespace=namespace,
+            default_limit=10**9,
+            default_window=60,
+            fixed_window_fast_path=True
+        )
+        for client_id, route in fixed_requests:
+            fast.check_request(client_id, route)
+        fast.flush_local_stats()
+    
+    modes = {
+        "EVAL (source per request)": eval_source,
+        "EVALSHA (registered)": evalsha,
+        f"Pipelined ({batch_size}/batch)": pipelined,
+        f"Micro-batched ({threads} threads)": micro_batched,
+        "Leased (10% of the limit)": leased,
+        "FIXED_WINDOW script": fixed_window_script,
+        "FIXED_WINDOW INCR fast path": fixed_window_fast_path
+    }
+    
+    results = {}
+    for name, run in modes.items():
+        stats_before = shield.redis.info("stats")
+        start_time = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start_time
+        stats_after = shield.redis.info("stats")
+        
+        results[name] = {
+            "ops_per_sec": num_requests / elapsed,
+            "bytes_in_per_request": (
+                stats_after["total_net_input_bytes"] - stats_before["total_net_input_bytes"]
+            ) / num_requests,
+            "bytes_out_per_request": (
+                stats_after["total_net_output_bytes"] - stats_before["total_net_output_bytes"]
+            ) / num_requests,
+            "commands_per_request": (
+                stats_after["total_commands_processed"] - stats_before["total_commands_processed"]
+            ) / num_requests
+        }
+    
+    for key in shield.redis.scan_iter(f"{namespace}:*"):
+        shield.redis.delete(key)
+    
+    print(f"  {'Mode':<32}{'ops/sec':>10}{'bytes in/req':>14}{'bytes out/req':>15}{'cmds/req':>10}")
+    for name, result in results.items():
+        print(f"  {name:<32}{result['ops_per_sec']:>10.0f}"
+              f"{result['bytes_in_per_request']:>14.0f}{result['bytes_out_per_request']:>15.0f}"
+              f"{result['commands_per_request']:>10.2f}")
+    
+    return results
+
+
+def run_redis_memory_benchmark(
+    num_clients: int = 10000,
+    host: str = "localhost",
+    port: int = 6379
+) -> Dict[str, Dict[str, float]]:
+    # Needs a running Redis 7.4+ (the route hash layout expires hash fields)
+    from distributed_example import DistributedAdaptiveShield, RateLimitStrategy as RedisStrategy
+    
+    layouts = {
+        "Key per client": {},
+        "Compact hashed keys": {"compact_keys": True},
+        "Compact + route hash": {"compact_keys": True, "route_hash": True}
+    }
+    # IPv6 clients, where long ids make key names a large part of the memory
+    requests = [(f"2001:db8:85a3::8a2e:370:{i:x}", "/api/v1/bench") for i in range(num_clients)]
+    
+    results = {}
+    for index, (name, options) in enumerate(layouts.items()):
+        namespace = f"adaptive_shield_mem_{index}"
+        shield = DistributedAdaptiveShield(
+            redis_host=host,
+            redis_port=port,
+            namespace=namespace,
+            default_limit=100,
+            default_window=60,
+            **options
+        )
+        shield.set_route_limit("/api/v1/bench", 100, 60, RedisStrategy.TOKEN_BUCKET)
+        
+        memory_before = shield.redis.info("memory")["used_memory"]
+        keys_before = shield.redis.dbsize()
+        for start in range(0, num_clients, 500):
+            shield.check_requests_batch(requests[start:start + 500])
+        memory_after = shield.redis.info("memory")["used_memory"]
+        keys_after = shield.redis.dbsize()
+        
+        # TTL of the first client's counter state (a hash field with route_hash)
+        client_id, route = requests[0]
+        counters_key = shield.keys.check_request_keys(client_id, route)[3]
+        field_prefix = shield.keys.counter_field_prefix(client_id)
+        if field_prefix:
+            counters_ttl = shield.redis.execute_command("HTTL", counters_key, "FIELDS", 1, f"{field_prefix}tokens")[0]
+        else:
+            counters_ttl = shield.redis.ttl(counters_key)
+        
+        results[name] = {
+            "bytes_per_client": (memory_after - memory_before) / num_clients,
+            "keys_per_client": (keys_after - keys_before) / num_clients,
+            "counters_ttl": counters_ttl
+        }
+        
+        for key in shield.redis.scan_iter(f"{namespace}:*"):
+            shield.redis.delete(key)
+    
+    print(f"  {'Layout':<24}{'bytes/client':>14}{'keys/client':>13}{'counter TTL':>13}")
+    for name, result in results.items():
+        print(f"  {name:<24}{result['bytes_per_client']:>14.0f}"
+              f"{result['keys_per_client']:>13.2f}{result['counters_ttl']:>13}")
+    
+    return results
+
+
 def sine_pattern(t: float) -> float:
     return 55 + 45 * np.sin(2 * np.pi * t / 20)
 
@@ -322,8 +1009,94 @@ def main():
     parser.add_argument('--load-test-duration', type=int, default=60, help='Duration of load test in seconds')
     parser.add_argument('--load-pattern', choices=['sine', 'spike', 'step'], default='sine', 
                        help='Load pattern for load test')
+    parser.add_argument('--memory-clients', type=int, default=0,
+                       help='Only measure memory per tracked client with this many clients')
+    parser.add_argument('--thread-scaling', action='store_true',
+                       help='Only measure check_request throughput as the thread count grows')
+    parser.add_argument('--shards', type=int, default=16,
+                       help='Number of lock stripes used by the sharded mode in --thread-scaling')
+    parser.add_argument('--virtual-time', action='store_true',
+                       help='Run load tests on a virtual clock instead of sleeping in real time')
+    parser.add_argument('--batch-size', type=int, default=0,
+                       help='Only compare check_requests_batch with per-request checks at this batch size')
+    parser.add_argument('--latency', action='store_true',
+                       help='Only measure per-call rule resolution and check_request latency')
+    parser.add_argument('--routes', type=int, default=0,
+                       help='Only measure route pattern matching with this many configured routes')
+    parser.add_argument('--redis', action='store_true',
+                       help='Only measure the distributed shield against a local Redis server')
+    parser.add_argument('--redis-memory', type=int, default=0,
+                       help='Only measure Redis memory per tracked client for each key layout with this many clients')
+    parser.add_argument('--cleanup-clients', type=int, default=0,
+                       help='Only measure check_request latency during metrics cleanup with this many clients')
+    parser.add_argument('--burst-check', action='store_true',
+                       help='Only check that new clients of burst strategies get exactly the limit')
     args = parser.parse_args()
     
+    if args.burst_check:
+        print("Burst size of a new client:")
+        results = run_burst_check()
+        with open('burst_check_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        if any(result["failures"] for result in results.values()):
+            raise SystemExit(1)
+        return
+    
+    if args.redis:
+        print("Distributed check_request against Redis at localhost:6379:")
+        results = run_redis_benchmark()
+        with open('redis_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.redis_memory > 0:
+        print(f"Redis memory per client with {args.redis_memory} clients at localhost:6379:")
+        results = run_redis_memory_benchmark(args.redis_memory)
+        with open('redis_memory_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.routes > 0:
+        print(f"Route pattern matching ({args.routes} configured routes):")
+        results = run_routing_benchmark(args.routes)
+        with open('routing_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.cleanup_clients > 0:
+        print(f"check_request latency during metrics cleanup ({args.cleanup_clients} clients):")
+        results = run_cleanup_benchmark(args.cleanup_clients)
+        with open('cleanup_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.latency:
+        print("Per-call latency (warm, 1000 clients x 20 routes):")
+        results = run_latency_benchmark()
+        with open('latency_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.batch_size > 0:
+        print(f"Batch vs scalar throughput (batch size {args.batch_size}):")
+        results = run_batch_benchmark(args.batch_size)
+        with open('batch_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.thread_scaling:
+        print("Multi-threaded check_request throughput:")
+        results = run_thread_scaling_benchmark([1, 2, 4, 8, 16, 32, 64], shards=args.shards)
+        with open('thread_scaling_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
+    if args.memory_clients > 0:
+        results = run_memory_benchmark(args.memory_clients)
+        with open('memory_benchmark_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    
     print("--- AdaptiveShield Benchmark Tool ---")
     print(f"Configuration:")
     print(f"  Clients: {args.clients}")
@@ -357,7 +1130,10 @@ def main():
     
     for strategy_name in benchmark.shields.keys():
         print(f"\nRunning load test with {args.load_pattern} pattern for {strategy_name}...")
-        load_results = benchmark.run_load_test(
+        run_load_test = (
+            benchmark.run_virtual_load_test if args.virtual_time else benchmark.run_load_test
+        )
+        load_results = run_load_test(
             strategy_name,
             pattern_func,
             duration_seconds=args.load_test_duration,
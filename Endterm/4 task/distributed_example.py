@@ -5,15 +5,20 @@ This example demonstrates how to use AdaptiveShield with Redis for distributed r
 across multiple application instances.
 """
 
+import math
 import time
 import uuid
+import hashlib
+import asyncio
 import redis
+import redis.asyncio as aioredis
+from redis.exceptions import NoScriptError
 import json
 import logging
 from flask import Flask, request, jsonify, g, Response
 from werkzeug.middleware.proxy_fix import ProxyFix
 from functools import wraps
-from typing import Dict, Any, Optional, Callable, List, Tuple
+from typing import Dict, Any, Optional, Callable, Iterable, List, Sequence, Set, Tuple
 from enum import Enum, auto
 import threading
 
@@ -24,6 +29,7 @@ logging.basicConfig(
 logger = logging.getLogger("DistributedShield")
 
 from adaptive_shield import AdaptiveShield, RateLimitStrategy
+from adaptive_shield.clock import Clock, WallClock
 
 redis_client = redis.Redis(
     host='localhost',
@@ -33,17 +39,80 @@ redis_client = redis.Redis(
 )
 
 class RedisKeys:
-    def __init__(self, namespace: str = "adaptive_shield"):
+    """
+    Key names of one shield namespace.
+    
+    With `compact`, key types get one or two letter tags and client ids are
+    replaced by a 64-bit hash in per-client key names, so keys for long ids
+    (IPv6 addresses, API keys, long routes) stay short. With `route_hash`,
+    the counters of all clients of a route are fields of one hash instead of
+    a key per client, which saves the per-key overhead; field expiry needs
+    Redis 7.4+.
+    """
+    
+    def __init__(self, namespace: str = "adaptive_shield", compact: bool = False, route_hash: bool = False):
         self.namespace = namespace
-        self.global_stats_key = f"{namespace}:global_stats"
-        self.routes_key = f"{namespace}:routes"
-        self.clients_key = f"{namespace}:clients"
-        self.route_stats_prefix = f"{namespace}:route_stats:"
-        self.client_stats_prefix = f"{namespace}:client_stats:"
-        self.route_counters_prefix = f"{namespace}:route_counters:"
-        self.client_counters_prefix = f"{namespace}:client_counters:"
-        self.route_config_prefix = f"{namespace}:route_config:"
-        self.auto_adapt_prefix = f"{namespace}:auto_adapt:"
+        self.compact = compact
+        self.route_hash = route_hash
+        if compact:
+            names = ("g", "r", "c", "rs", "cs", "rc", "cc", "cfg", "aa", "fw", "ss")
+        else:
+            names = (
+                "global_stats", "routes", "clients_by_activity", "route_stats", "client_stats",
+                "route_counters", "client_counters", "route_config", "auto_adapt", "fixed_windows",
+                "stats_shards"
+            )
+        self.global_stats_key = f"{namespace}:{names[0]}"
+        self.routes_key = f"{namespace}:{names[1]}"
+        self.clients_key = f"{namespace}:{names[2]}"
+        self.route_stats_prefix = f"{namespace}:{names[3]}:"
+        self.client_stats_prefix = f"{namespace}:{names[4]}:"
+        self.route_counters_prefix = f"{namespace}:{names[5]}:"
+        self.client_counters_prefix = f"{namespace}:{names[6]}:"
+        self.route_config_prefix = f"{namespace}:{names[7]}:"
+        self.auto_adapt_prefix = f"{namespace}:{names[8]}:"
+        self.fixed_windows_prefix = f"{namespace}:{names[9]}:"
+        self.stats_shards_key = f"{namespace}:{names[10]}"
+    
+    def _client_part(self, client_id: str) -> str:
+        """Client id as it appears in key and field names."""
+        if not self.compact:
+            return client_id
+        return hashlib.blake2b(client_id.encode(), digest_size=8).hexdigest()
+    
+    def client_stats_key(self, client_id: str) -> str:
+        return f"{self.client_stats_prefix}{self._client_part(client_id)}"
+    
+    def fixed_window_key(self, client_id: str, route: str, window_index: int) -> str:
+        """Counter of the fixed window fast path, one key per window."""
+        if self.compact:
+            return f"{self.fixed_windows_prefix}{self._client_part(route + chr(0) + client_id)}:{window_index}"
+        return f"{self.fixed_windows_prefix}{route}:{client_id}:{window_index}"
+    
+    def counter_field_prefix(self, client_id: str) -> str:
+        """Prefix of the client's fields in the route's counters hash ('' for a key per client)."""
+        if self.route_hash:
+            return f"{self._client_part(client_id)}:"
+        return ""
+    
+    def check_request_keys(self, client_id: str, route: str) -> List[str]:
+        """Keys passed to the check scripts, in the order they expect."""
+        if self.route_hash:
+            counters_key = f"{self.route_counters_prefix}{route}"
+        elif self.compact:
+            counters_key = f"{self.route_counters_prefix}{self._client_part(route + chr(0) + client_id)}"
+        else:
+            counters_key = f"{self.route_counters_prefix}{route}:{client_id}"
+        
+        return [
+            f"{self.route_stats_prefix}{route}",
+            self.client_stats_key(client_id),
+            f"{self.route_config_prefix}{route}",
+            counters_key,
+            f"{self.client_counters_prefix}{self._client_part(client_id)}:{route}",
+            self.routes_key,
+            self.clients_key
+        ]
 
 class RateLimitStrategy(Enum):
     TOKEN_BUCKET = auto()
@@ -52,6 +121,477 @@ class RateLimitStrategy(Enum):
     SLIDING_WINDOW = auto()
     ADAPTIVE_WINDOW = auto()
 
+# The check script is split per strategy, so every request only ships and
+# runs the code of its own strategy. All of them share the prelude (config
+# lookup) and the epilogue (counter expiry and the result).
+#
+# KEYS: route stats, client stats, route config, route counters, client
+#       counters, routes set, clients index
+# ARGV: current time, client_id, route, default strategy, default limit,
+#       default window, known flags (1: route already registered, as far as
+#       the caller knows), client TTL, counter field prefix
+#
+# A check is a single round trip: routes and clients seen for the first time
+# are registered and get zeroed stats inside the script. Request counts are
+# not written here; callers aggregate them and flush them in batches, so the
+# stats keys are off the per-request path.
+#
+# Nothing written per client lives forever. The counter state expires one
+# window after the client's last request (two for the sliding windows), when
+# it would be back to a full bucket or an empty window anyway. Client stats
+# expire after the client TTL and the clients index is a sorted set by last
+# activity, trimmed as new clients arrive. With a field prefix, the counters
+# of all clients of a route share one hash and expire per field (HEXPIRE,
+# Redis 7.4+).
+#
+# Returns 1 if the request is allowed. A rejected request returns minus the
+# number of milliseconds until the client's next request could be allowed
+# (0 if that is unknown), which callers can cache to reject locally.
+#
+# The caller picks the script from its cached view of the route's strategy.
+# If the route's config in Redis names another strategy, the script returns
+# {'strategy', <name>} without touching any counter and the caller retries
+# with the right script.
+SCRIPT_CONFIG_PRELUDE = """
+local keys = KEYS
+local known = tonumber(ARGV[7])
+local client_ttl = tonumber(ARGV[8])
+local fp = ARGV[9]
+-- Number of windows the counter state matters for after the last request
+local state_windows = 1
+
+-- Register routes on first sight
+if known % 2 == 0 and redis.call('SADD', keys[6], ARGV[3]) == 1 then
+    redis.call('HSETNX', keys[1], 'total_requests', 0)
+    redis.call('HSETNX', keys[1], 'allowed_requests', 0)
+    redis.call('HSETNX', keys[1], 'rejected_requests', 0)
+end
+
+-- Register clients that are new or were idle for half their TTL (their
+-- stats may have expired), and drop clients idle for longer than the TTL
+local seen_at = tonumber(ARGV[1])
+local seen = redis.call('ZSCORE', keys[7], ARGV[2])
+if not seen or tonumber(seen) < seen_at - client_ttl / 2 then
+    if not seen then
+        redis.call('ZREMRANGEBYSCORE', keys[7], '-inf', seen_at - client_ttl)
+    end
+    redis.call('ZADD', keys[7], seen_at, ARGV[2])
+    redis.call('HSETNX', keys[2], 'total_requests', 0)
+    redis.call('HSETNX', keys[2], 'allowed_requests', 0)
+    redis.call('HSETNX', keys[2], 'rejected_requests', 0)
+    redis.call('EXPIRE', keys[2], client_ttl)
+end
+
+-- Get or create config
+local config = redis.call('HGETALL', keys[3])
+local limit = tonumber(ARGV[5])
+local window = tonumber(ARGV[6])
+local strategy = ARGV[4]
+
+if next(config) ~= nil then
+    local i = 1
+    while i <= #config do
+        if config[i] == 'limit' then
+            limit = tonumber(config[i+1])
+        elseif config[i] == 'window' then
+            window = tonumber(config[i+1])
+        elseif config[i] == 'strategy' then
+            strategy = config[i+1]
+        end
+        i = i + 2
+    end
+else
+    redis.call('HSET', keys[3], 'limit', limit, 'window', window, 'strategy', strategy)
+end
+
+if strategy ~= script_strategy then
+    return {'strategy', strategy}
+end
+"""
+
+CHECK_SCRIPT_PRELUDE = SCRIPT_CONFIG_PRELUDE + """
+local current_time = tonumber(ARGV[1])
+local allowed = false
+local retry_after = 0
+"""
+
+# Refreshes the TTL of the counter state, listed by the strategy in
+# `state_fields`. A missing state means a full bucket or an empty window,
+# which is what the state would have decayed to `state_windows` windows
+# after the last request.
+COUNTER_TTL = """
+local ttl = math.ceil(window * state_windows) + 1
+if fp == '' then
+    redis.call('EXPIRE', keys[4], ttl)
+else
+    local fields = {}
+    for i, field in ipairs(state_fields) do
+        fields[i] = fp .. field
+    end
+    redis.call('HEXPIRE', keys[4], ttl, 'FIELDS', #fields, unpack(fields))
+end
+"""
+
+CHECK_SCRIPT_EPILOGUE = COUNTER_TTL + """
+if allowed then
+    return 1
+end
+return -math.ceil(retry_after * 1000)
+"""
+
+# Sliding windows are approximated from two fixed windows: the current one's
+# count plus the previous one's, weighted by how much of it still overlaps
+# the sliding window. That keeps three fields per client instead of one per
+# request, and a check is O(1) however high the limit.
+TWO_WINDOW_STATE = """
+state_windows = 2
+local state_fields = {'win', 'curr', 'prev'}
+local window_index = math.floor(current_time / window)
+local state = redis.call('HMGET', keys[4], fp .. 'win', fp .. 'curr', fp .. 'prev')
+
+local curr = 0
+local prev = 0
+local stored_index = tonumber(state[1])
+if stored_index == window_index then
+    curr = tonumber(state[2] or 0)
+    prev = tonumber(state[3] or 0)
+elseif stored_index == window_index - 1 then
+    prev = tonumber(state[2] or 0)
+end
+
+-- Fraction of the current fixed window that has elapsed
+local elapsed = current_time / window - window_index
+local count = prev * (1 - elapsed) + curr
+"""
+
+STRATEGY_SCRIPTS = {
+    "TOKEN_BUCKET": """
+local state_fields = {'last_time', 'tokens'}
+local last_time_key = fp .. 'last_time'
+local tokens_key = fp .. 'tokens'
+
+local last_time = tonumber(redis.call('HGET', keys[4], last_time_key) or 0)
+local tokens = tonumber(redis.call('HGET', keys[4], tokens_key) or limit)
+
+-- Calculate new token count
+local new_tokens = math.min(limit, tokens + ((current_time - last_time) * limit / window))
+
+if new_tokens >= 1 then
+    new_tokens = new_tokens - 1
+    allowed = true
+else
+    retry_after = (1 - new_tokens) * window / limit
+end
+
+redis.call('HSET', keys[4], last_time_key, current_time)
+redis.call('HSET', keys[4], tokens_key, new_tokens)
+""",
+    "LEAKY_BUCKET": """
+local state_fields = {'queue', 'last_leak'}
+local queue_key = fp .. 'queue'
+local last_leak_key = fp .. 'last_leak'
+
+local queue = tonumber(redis.call('HGET', keys[4], queue_key) or 0)
+local last_leak = tonumber(redis.call('HGET', keys[4], last_leak_key) or current_time)
+
+-- Calculate leakage, carrying the time of a partial leak over to the next
+-- call so frequent calls cannot stall the bucket
+local leak_rate = limit / window
+local leaked = math.floor((current_time - last_leak) * leak_rate)
+if leaked >= queue then
+    queue = 0
+    last_leak = current_time
+elseif leaked > 0 then
+    queue = queue - leaked
+    last_leak = last_leak + leaked / leak_rate
+end
+
+if queue < limit then
+    queue = queue + 1
+    allowed = true
+else
+    retry_after = last_leak + (queue - limit + 1) / leak_rate - current_time
+end
+
+redis.call('HSET', keys[4], queue_key, queue)
+redis.call('HSET', keys[4], last_leak_key, last_leak)
+""",
+    "FIXED_WINDOW": """
+local state_fields = {'win', 'count'}
+local window_index = math.floor(current_time / window)
+local state = redis.call('HMGET', keys[4], fp .. 'win', fp .. 'count')
+
+-- The count only applies to the window it was recorded in
+local requests = 0
+if tonumber(state[1]) == window_index then
+    requests = tonumber(state[2] or 0)
+end
+
+if requests < limit then
+    redis.call('HSET', keys[4], fp .. 'win', window_index, fp .. 'count', requests + 1)
+    allowed = true
+else
+    retry_after = (window_index + 1) * window - current_time
+end
+""",
+    "SLIDING_WINDOW": TWO_WINDOW_STATE + """
+if count < limit then
+    redis.call('HSET', keys[4], fp .. 'win', window_index, fp .. 'curr', curr + 1, fp .. 'prev', prev)
+    allowed = true
+elseif curr < limit then
+    -- Until the previous window's share has decayed below the headroom
+    retry_after = (1 - (limit - curr) / prev - elapsed) * window
+else
+    -- Until this window's requests, as the previous window, have decayed enough
+    retry_after = (window_index + 2 - limit / curr) * window - current_time
+end
+""",
+    "ADAPTIVE_WINDOW": TWO_WINDOW_STATE + """
+-- Count and load-adjusted limit at a point of a fixed window. Recent requests
+-- contribute more to load; with requests assumed evenly spread over each
+-- fixed window, the current window weighs 1 - elapsed / 2 on average and the
+-- overlapping part of the previous one (1 - elapsed) / 2.
+local function window_limit(at, window_curr, window_prev)
+    local window_count = window_prev * (1 - at) + window_curr
+    local load = window_curr * (1 - at / 2) + window_prev * (1 - at) * (1 - at) / 2
+    local load_factor = 1.0
+    if window_count > 0 then
+        load_factor = math.max(0.5, math.min(1.0, 1.0 - (load / limit / 2)))
+    end
+    return window_count, math.max(1, math.floor(limit * load_factor))
+end
+
+local effective_limit
+count, effective_limit = window_limit(elapsed, curr, prev)
+
+if count < effective_limit then
+    redis.call('HSET', keys[4], fp .. 'win', window_index, fp .. 'curr', curr + 1, fp .. 'prev', prev)
+    allowed = true
+else
+    -- Sample the two windows the state can matter for. The sample before the
+    -- first allowed one is a lower bound, so a cached rejection never outlasts
+    -- the real one.
+    local step = window / 20
+    retry_after = 2 * window
+    for i = 1, 40 do
+        local at = current_time + i * step
+        local index = math.floor(at / window)
+        local window_curr, window_prev = 0, 0
+        if index == window_index then
+            window_curr, window_prev = curr, prev
+        elseif index == window_index + 1 then
+            window_prev = curr
+        end
+        local later_count, later_limit = window_limit(at / window - index, window_curr, window_prev)
+        if later_count < later_limit then
+            retry_after = (i - 1) * step
+            break
+        end
+    end
+end
+""",
+}
+
+
+def build_check_script(strategy: str) -> str:
+    """Assemble the Lua check script for one strategy."""
+    return (
+        f"local script_strategy = '{strategy}'\n"
+        + CHECK_SCRIPT_PRELUDE
+        + STRATEGY_SCRIPTS[strategy]
+        + CHECK_SCRIPT_EPILOGUE
+    )
+
+
+CHECK_SCRIPTS = {strategy: build_check_script(strategy) for strategy in STRATEGY_SCRIPTS}
+
+# Reserves a block of tokens from a TOKEN_BUCKET route's bucket for local use.
+# Takes the check script's KEYS and ARGV, followed by:
+# ARGV: lease fraction of the limit (0 to only give tokens back), unused
+#       tokens of the previous lease
+#
+# Returned tokens go back into the bucket (capped at the limit). Returns the
+# number of tokens granted, or, when none are left and a lease was asked for,
+# like the check scripts minus the milliseconds until the next token.
+LEASE_SCRIPT = "local script_strategy = 'TOKEN_BUCKET'\n" + SCRIPT_CONFIG_PRELUDE + """
+local current_time = tonumber(ARGV[1])
+local fraction = tonumber(ARGV[10])
+local returned = tonumber(ARGV[11])
+local state_fields = {'last_time', 'tokens'}
+
+local last_time = tonumber(redis.call('HGET', keys[4], fp .. 'last_time') or 0)
+local tokens = tonumber(redis.call('HGET', keys[4], fp .. 'tokens') or limit)
+tokens = math.min(limit, tokens + returned + ((current_time - last_time) * limit / window))
+
+local granted = 0
+if fraction > 0 then
+    granted = math.min(math.floor(tokens), math.max(1, math.floor(limit * fraction)))
+end
+
+redis.call('HSET', keys[4], fp .. 'last_time', current_time, fp .. 'tokens', tokens - granted)
+""" + COUNTER_TTL + """
+if fraction > 0 and granted == 0 then
+    return -math.ceil((1 - tokens) * window / limit * 1000)
+end
+return granted
+"""
+
+# Maximum number of routes remembered as registered per instance
+KNOWN_CACHE_SIZE = 100000
+
+
+def remember_known(known: Set[str], item: str) -> None:
+    """Remember a registered route, starting over when full."""
+    if len(known) >= KNOWN_CACHE_SIZE:
+        known.clear()
+    known.add(item)
+
+# Maximum number of blocked (route, client) pairs remembered per instance
+NEGATIVE_CACHE_SIZE = 100000
+
+
+def sharded_stats_keys(stats_key: str, shards: Iterable[str]) -> List[str]:
+    """A stats key followed by its per-instance shards."""
+    return [stats_key] + [f"{stats_key}@{shard}" for shard in sorted(shards)]
+
+
+def merge_stats(replies: Iterable[Dict[str, str]]) -> Dict[str, int]:
+    """Sum the HGETALL replies of a stats key and its shards."""
+    merged: Dict[str, int] = {}
+    for stats in replies:
+        for field, value in stats.items():
+            merged[field] = merged.get(field, 0) + int(value)
+    return merged
+
+
+def queue_stats_flush(
+    pipe: Any,
+    keys: RedisKeys,
+    decisions: Dict[Tuple[str, str], List[int]],
+    shard: Optional[str],
+    client_ttl: int,
+    current_time: float
+) -> None:
+    """
+    Queue the commands adding locally counted decisions to the Redis stats.
+    
+    Global and route stats go to the instance's shard when it has one, so
+    instances do not all write the same hot keys; readers sum the shards.
+    Client stats are spread over many keys already and are not sharded.
+    
+    Args:
+        pipe: Sync or asyncio pipeline to queue the commands on
+        keys: Key names of the shield's namespace
+        decisions: (route, client_id) -> [allowed, rejected]
+        shard: Name of this instance's stats shard, or None for the shared keys
+        client_ttl: Seconds a client's stats are kept after its last request
+        current_time: Time the clients were last seen
+    """
+    suffix = f"@{shard}" if shard else ""
+    if shard:
+        pipe.sadd(keys.stats_shards_key, shard)
+    
+    route_totals: Dict[str, List[int]] = {}
+    for (route, client_id), (allowed, rejected) in decisions.items():
+        totals = route_totals.setdefault(route, [0, 0])
+        totals[0] += allowed
+        totals[1] += rejected
+        
+        client_stats_key = keys.client_stats_key(client_id)
+        pipe.hincrby(client_stats_key, "total_requests", allowed + rejected)
+        pipe.hincrby(client_stats_key, "allowed_requests", allowed)
+        pipe.hincrby(client_stats_key, "rejected_requests", rejected)
+        pipe.expire(client_stats_key, client_ttl)
+        # Fast path clients are registered here rather than by a script
+        pipe.zadd(keys.clients_key, {client_id: current_time})
+    pipe.zremrangebyscore(keys.clients_key, "-inf", current_time - client_ttl)
+    
+    total = [0, 0]
+    for route, (allowed, rejected) in route_totals.items():
+        total[0] += allowed
+        total[1] += rejected
+        route_stats_key = f"{keys.route_stats_prefix}{route}{suffix}"
+        pipe.hincrby(route_stats_key, "total_requests", allowed + rejected)
+        pipe.hincrby(route_stats_key, "allowed_requests", allowed)
+        pipe.hincrby(route_stats_key, "rejected_requests", rejected)
+    
+    global_stats_key = f"{keys.global_stats_key}{suffix}"
+    pipe.hincrby(global_stats_key, "total_requests", total[0] + total[1])
+    pipe.hincrby(global_stats_key, "allowed_requests", total[0])
+    pipe.hincrby(global_stats_key, "rejected_requests", total[1])
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent checks from different threads into pipelined batches.
+    
+    Callers block in `submit` while a background thread collects requests for
+    up to `window` seconds after the first one arrives (or until `max_size`
+    are queued) and evaluates them with a single batch call.
+    """
+    
+    def __init__(
+        self,
+        check_batch: Callable[[List[Tuple[str, str]]], List[bool]],
+        window: float = 0.001,
+        max_size: int = 128
+    ):
+        """
+        Initialize the batcher and start its worker thread.
+        
+        Args:
+            check_batch: Function deciding a list of (client_id, route) pairs
+            window: How long to wait for more requests to join a batch, in seconds
+            max_size: Maximum number of requests per batch
+        """
+        self.check_batch = check_batch
+        self.window = window
+        self.max_size = max_size
+        # (client_id, route, result slot, done event) per waiting caller
+        self._pending: List[Tuple[str, str, List[bool], threading.Event]] = []
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    def submit(self, client_id: str, route: str) -> bool:
+        """Queue a check and wait for its decision."""
+        slot = [True]
+        done = threading.Event()
+        with self._condition:
+            self._pending.append((client_id, route, slot, done))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_size:
+                self._condition.notify()
+        done.wait()
+        return slot[0]
+    
+    def _run(self) -> None:
+        """Worker loop collecting and deciding batches."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                
+                batch = self._pending[:self.max_size]
+                del self._pending[:self.max_size]
+            
+            try:
+                results = self.check_batch([(client_id, route) for client_id, route, _, _ in batch])
+            except Exception as e:
+                logging.error(f"Error checking rate limit batch: {e}")
+                results = [True] * len(batch)
+            
+            for (_, _, slot, done), allowed in zip(batch, results):
+                slot[0] = allowed
+                done.set()
+
+
 class DistributedAdaptiveShield:
     def __init__(
         self,
@@ -64,7 +604,20 @@ class DistributedAdaptiveShield:
         default_window: int = 60,
         default_strategy: RateLimitStrategy = RateLimitStrategy.TOKEN_BUCKET,
         monitor_interval: int = 10,
-        auto_adapt: bool = False
+        auto_adapt: bool = False,
+        clock: Optional[Clock] = None,
+        micro_batch_window: Optional[float] = None,
+        micro_batch_size: int = 128,
+        lease_fraction: Optional[float] = None,
+        lease_ttl: float = 1.0,
+        negative_cache: bool = False,
+        stats_flush_interval: float = 0.1,
+        client_ttl: int = 86400,
+        compact_keys: bool = False,
+        route_hash: bool = False,
+        fixed_window_fast_path: bool = False,
+        config_cache_ttl: float = 1.0,
+        stats_shard: Optional[str] = None
     ):
         self.redis = redis.Redis(
             host=redis_host,
@@ -73,15 +626,82 @@ class DistributedAdaptiveShield:
             password=redis_password,
             decode_responses=True
         )
-        self.keys = RedisKeys(namespace)
+        self.keys = RedisKeys(namespace, compact_keys, route_hash)
+        # Seconds a client's stats are kept after its last request
+        self.client_ttl = client_ttl
         self.default_limit = default_limit
         self.default_window = default_window
         self.default_strategy = default_strategy
         self.monitor_interval = monitor_interval
         self.auto_adapt = auto_adapt
+        # Timestamps are stored in Redis and compared across instances, so the
+        # default has to be the wall clock rather than a per-process monotonic one
+        self.clock = clock or WallClock()
+        
+        # Scripts are sent once and then invoked by SHA; redis-py reloads
+        # them transparently if the server answers NOSCRIPT
+        self._scripts = {
+            strategy: self.redis.register_script(source)
+            for strategy, source in CHECK_SCRIPTS.items()
+        }
+        # Last strategy seen in Redis for each route, used to pick the script
+        self._route_strategies: Dict[str, str] = {}
+        # Routes this instance knows are registered in Redis
+        self._known_routes: Set[str] = set()
         
         self._initialize_redis()
         
+        # With a window set, concurrent check_request calls are coalesced
+        # into pipelined batches instead of one round trip each
+        self._batcher: Optional[MicroBatcher] = None
+        if micro_batch_window is not None:
+            self._batcher = MicroBatcher(self.check_requests_batch, micro_batch_window, micro_batch_size)
+        
+        # With a lease fraction set, TOKEN_BUCKET routes reserve blocks of
+        # tokens from Redis and decide locally until a block runs out. Leased
+        # tokens are taken out of the Redis bucket, so admission never exceeds
+        # the limit; unused tokens return to it when their lease expires.
+        # (route, client_id) -> [tokens left, expiry time]
+        self.lease_fraction = lease_fraction
+        self.lease_ttl = lease_ttl
+        self._leases: Dict[Tuple[str, str], List[float]] = {}
+        self._lease_lock = threading.Lock()
+        self._lease_stats = {"local_decisions": 0, "lease_requests": 0}
+        if lease_fraction is not None:
+            if not 0 < lease_fraction <= 1:
+                raise ValueError("lease_fraction must be in (0, 1]")
+            self._lease_script = self.redis.register_script(LEASE_SCRIPT)
+            self._start_lease_thread()
+        
+        # With the negative cache on, a rejected (route, client) pair is
+        # rejected locally until the retry time the script computed.
+        # (route, client_id) -> blocked until
+        self.negative_cache = negative_cache
+        self._blocked: Dict[Tuple[str, str], float] = {}
+        
+        # With the fast path on, FIXED_WINDOW routes are decided by INCR on a
+        # key per window, using a locally cached copy of the route's config.
+        # Every instance sharing a route has to use the same setting, since
+        # the fast path and the script keep separate counters.
+        # route -> (strategy, limit, window, cached until)
+        self.fixed_window_fast_path = fixed_window_fast_path
+        self.config_cache_ttl = config_cache_ttl
+        self._route_configs: Dict[str, Tuple[str, int, float, float]] = {}
+        
+        # Stats are kept off the request path: decisions are counted here and
+        # added to Redis every `stats_flush_interval` seconds in one pipeline,
+        # into this instance's own shard of the global and route stats if
+        # `stats_shard` is set. Reads flush first and sum all shards.
+        # (route, client_id) -> [allowed, rejected]
+        self.stats_flush_interval = stats_flush_interval
+        self.stats_shard = stats_shard
+        self._local_decisions: Dict[Tuple[str, str], List[int]] = {}
+        # Guards the negative cache and the local decisions
+        self._local_lock = threading.Lock()
+        # Held for a whole flush, so a read waits for a flush in progress
+        self._flush_lock = threading.Lock()
+        self._start_stats_flush_thread()
+        
         if self.auto_adapt:
             self._start_monitor_thread()
 
@@ -97,7 +717,7 @@ class DistributedAdaptiveShield:
             self.redis.sadd(self.keys.routes_key, "/")
             
         if not self.redis.exists(self.keys.clients_key):
-            self.redis.sadd(self.keys.clients_key, "default")
+            self.redis.zadd(self.keys.clients_key, {"default": self.clock.now()})
             
         for route in self.redis.smembers(self.keys.routes_key):
             route_stats_key = f"{self.keys.route_stats_prefix}{route}"
@@ -127,6 +747,30 @@ class DistributedAdaptiveShield:
                 
         thread = threading.Thread(target=monitor_loop, daemon=True)
         thread.start()
+    
+    def _start_lease_thread(self):
+        def lease_loop():
+            while True:
+                time.sleep(self.lease_ttl)
+                try:
+                    self.release_leases(expired_only=True)
+                except Exception as e:
+                    logging.error(f"Error releasing leases: {e}")
+        
+        thread = threading.Thread(target=lease_loop, daemon=True)
+        thread.start()
+    
+    def _start_stats_flush_thread(self):
+        def flush_loop():
+            while True:
+                time.sleep(self.stats_flush_interval)
+                try:
+                    self.flush_local_stats()
+                except Exception as e:
+                    logging.error(f"Error flushing local stats: {e}")
+        
+        thread = threading.Thread(target=flush_loop, daemon=True)
+        thread.start()
 
     def _monitor_and_adapt(self):
         for route in self.redis.smembers(self.keys.routes_key):
@@ -134,7 +778,7 @@ class DistributedAdaptiveShield:
             config_key = f"{self.keys.route_config_prefix}{route}"
             auto_adapt_key = f"{self.keys.auto_adapt_prefix}{route}"
             
-            stats = self.redis.hgetall(stats_key)
+            stats = self._read_stats(stats_key)
             config = self.redis.hgetall(config_key)
             
             if not stats or not config:
@@ -174,249 +818,431 @@ class DistributedAdaptiveShield:
                 self.redis.hset(config_key, "limit", new_limit)
                 logging.info(f"Auto-adapted {route}: decreased limit from {current_limit} to {new_limit}")
     
-    def check_request(self, client_id: str, route: str) -> bool:
-        lua_script = """
-        local keys = {
-            KEYS[1], -- global_stats
-            KEYS[2], -- route stats
-            KEYS[3], -- client stats
-            KEYS[4], -- route config
-            KEYS[5], -- route counters
-            KEYS[6], -- client counters
-            KEYS[7], -- routes set
-            KEYS[8]  -- clients set
-        }
-
-        local args = {
-            ARGV[1], -- current time
-            ARGV[2], -- client_id
-            ARGV[3], -- route
-            ARGV[4], -- strategy name
-            ARGV[5], -- default_limit
-            ARGV[6]  -- default_window
-        }
-
-        -- Ensure route and client exist in sets
-        redis.call('SADD', keys[7], args[3])
-        redis.call('SADD', keys[8], args[2])
-
-        -- Get or create config
-        local config = redis.call('HGETALL', keys[4])
-        local limit = tonumber(ARGV[5])
-        local window = tonumber(ARGV[6])
-        local strategy = ARGV[4]
-
-        if next(config) ~= nil then
-            local i = 1
-            while i <= #config do
-                if config[i] == 'limit' then
-                    limit = tonumber(config[i+1])
-                elseif config[i] == 'window' then
-                    window = tonumber(config[i+1])
-                elseif config[i] == 'strategy' then
-                    strategy = config[i+1]
-                end
-                i = i + 2
-            end
-        else
-            redis.call('HSET', keys[4], 'limit', limit, 'window', window, 'strategy', strategy)
-        end
-
-        -- Increment request counters
-        redis.call('HINCRBY', keys[1], 'total_requests', 1)
-        redis.call('HINCRBY', keys[2], 'total_requests', 1)
-        redis.call('HINCRBY', keys[3], 'total_requests', 1)
-
-        local current_time = tonumber(args[1])
-        local allowed = false
-
-        if strategy == 'TOKEN_BUCKET' then
-            local last_time_key = 'last_time'
-            local tokens_key = 'tokens'
-            
-            local last_time = tonumber(redis.call('HGET', keys[5], last_time_key) or 0)
-            local tokens = tonumber(redis.call('HGET', keys[5], tokens_key) or limit)
-            
-            -- Calculate new token count
-            local new_tokens = math.min(limit, tokens + ((current_time - last_time) * limit / window))
-            
-            if new_tokens >= 1 then
-                new_tokens = new_tokens - 1
-                allowed = true
-            end
-            
-            redis.call('HSET', keys[5], last_time_key, current_time)
-            redis.call('HSET', keys[5], tokens_key, new_tokens)
-        
-        elseif strategy == 'LEAKY_BUCKET' then
-            local queue_key = 'queue'
-            local last_leak_key = 'last_leak'
-            
-            local queue = tonumber(redis.call('HGET', keys[5], queue_key) or 0)
-            local last_leak = tonumber(redis.call('HGET', keys[5], last_leak_key) or current_time)
-            
-            -- Calculate leakage
-            local leak_rate = limit / window
-            local leaked = math.floor((current_time - last_leak) * leak_rate)
-            queue = math.max(0, queue - leaked)
-            
-            if queue < limit then
-                queue = queue + 1
-                allowed = true
-            end
-            
-            redis.call('HSET', keys[5], queue_key, queue)
-            redis.call('HSET', keys[5], last_leak_key, current_time)
-            
-        elseif strategy == 'FIXED_WINDOW' then
-            local window_key = math.floor(current_time / window)
-            local requests = tonumber(redis.call('HGET', keys[5], window_key) or 0)
-            
-            if requests < limit then
-                redis.call('HSET', keys[5], window_key, requests + 1)
-                allowed = true
-            end
-            
-            -- Clean up old windows (keep only current)
-            local keys_to_del = {}
-            local all_keys = redis.call('HKEYS', keys[5])
-            for i, k in ipairs(all_keys) do
-                if k ~= tostring(window_key) and k ~= 'limit' and k ~= 'window' and k ~= 'strategy' then
-                    table.insert(keys_to_del, k)
-                end
-            end
-            if #keys_to_del > 0 then
-                redis.call('HDEL', keys[5], unpack(keys_to_del))
-            end
-            
-        elseif strategy == 'SLIDING_WINDOW' then
-            local window_start = current_time - window
-            local count = 0
-            
-            -- Count requests in window
-            local all_keys = redis.call('HKEYS', keys[5])
-            local all_vals = redis.call('HVALS', keys[5])
-            local keys_to_del = {}
-            
-            for i, k in ipairs(all_keys) do
-                if string.match(k, '^ts:') then
-                    local ts = tonumber(string.sub(k, 4))
-                    if ts > window_start then
-                        count = count + tonumber(all_vals[i])
-                    else
-                        table.insert(keys_to_del, k)
-                    end
-                end
-            end
-            
-            -- Clean up old entries
-            if #keys_to_del > 0 then
-                redis.call('HDEL', keys[5], unpack(keys_to_del))
-            end
-            
-            if count < limit then
-                -- Add the new request
-                local ts_key = 'ts:' .. current_time
-                redis.call('HINCRBY', keys[5], ts_key, 1)
-                allowed = true
-            end
-            
-        elseif strategy == 'ADAPTIVE_WINDOW' then
-            local window_start = current_time - window
-            local count = 0
-            local load = 0
-            
-            -- Count requests in window and calculate load
-            local all_keys = redis.call('HKEYS', keys[5])
-            local all_vals = redis.call('HVALS', keys[5])
-            local keys_to_del = {}
-            
-            for i, k in ipairs(all_keys) do
-                if string.match(k, '^ts:') then
-                    local ts = tonumber(string.sub(k, 4))
-                    if ts > window_start then
-                        count = count + tonumber(all_vals[i])
-                        -- Recent requests contribute more to load
-                        local age_factor = 1 - ((current_time - ts) / window)
-                        load = load + (tonumber(all_vals[i]) * age_factor)
-                    else
-                        table.insert(keys_to_del, k)
-                    end
-                end
-            end
-            
-            -- Clean up old entries
-            if #keys_to_del > 0 then
-                redis.call('HDEL', keys[5], unpack(keys_to_del))
-            end
-            
-            -- Adjust effective limit based on load
-            local load_factor = 1.0
-            if count > 0 then
-                load_factor = math.max(0.5, math.min(1.0, 1.0 - (load / limit / 2)))
-            end
-            local effective_limit = math.max(1, math.floor(limit * load_factor))
-            
-            if count < effective_limit then
-                -- Add the new request
-                local ts_key = 'ts:' .. current_time
-                redis.call('HINCRBY', keys[5], ts_key, 1)
-                allowed = true
-            end
-        end
-
-        -- Update allowed/rejected counts
-        if allowed then
-            redis.call('HINCRBY', keys[1], 'allowed_requests', 1)
-            redis.call('HINCRBY', keys[2], 'allowed_requests', 1)
-            redis.call('HINCRBY', keys[3], 'allowed_requests', 1)
-        else
-            redis.call('HINCRBY', keys[1], 'rejected_requests', 1)
-            redis.call('HINCRBY', keys[2], 'rejected_requests', 1)
-            redis.call('HINCRBY', keys[3], 'rejected_requests', 1)
-        end
-
-        return allowed and 1 or 0
+    def _check_call(
+        self, client_id: str, route: str, current_time: float
+    ) -> Tuple[List[str], List[Any]]:
+        """Keys and arguments passed to the check scripts, in the order they expect."""
+        keys = self.keys.check_request_keys(client_id, route)
+        args = [
+            current_time,
+            client_id,
+            route,
+            self.default_strategy.name,
+            self.default_limit,
+            self.default_window,
+            1 if route in self._known_routes else 0,
+            self.client_ttl,
+            self.keys.counter_field_prefix(client_id)
+        ]
+        return keys, args
+    
+    def _remember(self, route: str):
+        if route not in self._known_routes:
+            remember_known(self._known_routes, route)
+    
+    def _is_blocked(self, client_id: str, route: str, current_time: float) -> bool:
+        """Reject locally if the pair is in the negative cache, counting the rejection."""
+        key = (route, client_id)
+        with self._local_lock:
+            until = self._blocked.get(key)
+            if until is None:
+                return False
+            if until <= current_time:
+                del self._blocked[key]
+                return False
+            self._count_local(key, False)
+            return True
+    
+    def _count_local(self, key: Tuple[str, str], allowed: bool):
+        """Count a decision for the next stats flush; the caller holds `_local_lock`."""
+        counts = self._local_decisions.get(key)
+        if counts is None:
+            counts = self._local_decisions[key] = [0, 0]
+        counts[0 if allowed else 1] += 1
+    
+    def _record(self, client_id: str, route: str, allowed: bool):
+        """Count a decision for the next stats flush."""
+        with self._local_lock:
+            self._count_local((route, client_id), allowed)
+    
+    def _block(self, client_id: str, route: str, result: int, current_time: float):
+        """Remember a rejection's retry time, given the script result in -milliseconds."""
+        if not self.negative_cache or result >= 0:
+            return
+        with self._local_lock:
+            if len(self._blocked) >= NEGATIVE_CACHE_SIZE:
+                # Start over rather than evicting one by one
+                self._blocked = {}
+            self._blocked[(route, client_id)] = current_time - result / 1000
+    
+    def flush_local_stats(self):
+        """Add the requests decided since the last flush to the Redis stats in one pipeline."""
+        with self._flush_lock:
+            with self._local_lock:
+                decisions = self._local_decisions
+                self._local_decisions = {}
+        
+            if not decisions:
+                return
+        
+            pipe = self.redis.pipeline(transaction=False)
+            queue_stats_flush(pipe, self.keys, decisions, self.stats_shard, self.client_ttl, self.clock.now())
+            pipe.execute()
+    
+    def _read_stats(self, stats_key: str) -> Dict[str, int]:
+        """Read a stats hash, flushing local counts first and summing the shards."""
+        self.flush_local_stats()
+        shards = self.redis.smembers(self.keys.stats_shards_key)
+        pipe = self.redis.pipeline(transaction=False)
+        for key in sharded_stats_keys(stats_key, shards):
+            pipe.hgetall(key)
+        return merge_stats(pipe.execute())
+    
+    def get_negative_cache_stats(self) -> Dict[str, int]:
+        """
+        Get this instance's negative cache counters.
+        
+        Returns:
+            Dict[str, int]: Pairs currently blocked and local rejections not
+                            yet flushed to Redis
+        """
+        with self._local_lock:
+            return {
+                "blocked": len(self._blocked),
+                "pending_rejections": sum(counts[1] for counts in self._local_decisions.values())
+            }
+    
+    def get_retry_after(self, client_id: str, route: str) -> float:
         """
+        Estimate how long a rejected client should wait, without reading stats.
         
-        current_time = time.time()
+        Uses the pair's negative cache entry when there is one, and otherwise
+        the route's window from the cached route config.
         
-        self._ensure_route(route)
-        self._ensure_client(client_id)
+        Returns:
+            float: Seconds until the client should retry
+        """
+        current_time = self.clock.now()
+        with self._local_lock:
+            until = self._blocked.get((route, client_id))
+        if until is not None and until > current_time:
+            return until - current_time
         
-        route_stats_key = f"{self.keys.route_stats_prefix}{route}"
-        client_stats_key = f"{self.keys.client_stats_prefix}{client_id}"
-        route_config_key = f"{self.keys.route_config_prefix}{route}"
-        route_counters_key = f"{self.keys.route_counters_prefix}{route}:{client_id}"
-        client_counters_key = f"{self.keys.client_counters_prefix}{client_id}:{route}"
+        try:
+            config = self._route_config(route, current_time)
+        except Exception as e:
+            logging.error(f"Error reading route config: {e}")
+            config = None
+        return config[2] if config is not None else float(self.default_window)
+    
+    def check_request(self, client_id: str, route: str) -> bool:
+        if self.negative_cache and self._is_blocked(client_id, route, self.clock.now()):
+            return False
+        
+        if self.fixed_window_fast_path:
+            try:
+                allowed = self._check_fixed_window(client_id, route)
+                if allowed is not None:
+                    return allowed
+            except Exception as e:
+                logging.error(f"Error checking rate limit: {e}")
+                return True
+        
+        if (self.lease_fraction is not None
+                and self._route_strategies.get(route, self.default_strategy.name) == "TOKEN_BUCKET"):
+            try:
+                allowed = self._check_leased(client_id, route)
+                if allowed is not None:
+                    return allowed
+            except Exception as e:
+                logging.error(f"Error checking rate limit: {e}")
+                return True
+        
+        if self._batcher is not None:
+            return self._batcher.submit(client_id, route)
+        
+        current_time = self.clock.now()
         
         try:
-            result = self.redis.eval(
-                lua_script,
-                8,  # num keys
-                self.keys.global_stats_key,
-                route_stats_key,
-                client_stats_key,
-                route_config_key,
-                route_counters_key,
-                client_counters_key,
-                self.keys.routes_key,
-                self.keys.clients_key,
-                # args
-                current_time,
-                client_id,
-                route,
-                self.default_strategy.name,
-                self.default_limit,
-                self.default_window
-            )
+            strategy = self._route_strategies.get(route, self.default_strategy.name)
+            keys, args = self._check_call(client_id, route, current_time)
+            result = self._scripts[strategy](keys=keys, args=args)
+            
+            if isinstance(result, list):
+                # The route's strategy was changed (possibly by another
+                # instance); nothing was counted, so retry with its script
+                strategy = self._route_strategies[route] = result[1]
+                keys, args = self._check_call(client_id, route, current_time)
+                result = self._scripts[strategy](keys=keys, args=args)
             
-            return bool(result)
+            self._remember(route)
+            self._record(client_id, route, result > 0)
+            self._block(client_id, route, result, current_time)
+            return result > 0
         except Exception as e:
             logging.error(f"Error checking rate limit: {e}")
-            return True 
+            return True
+    
+    def _route_config(self, route: str, current_time: float) -> Optional[Tuple[str, int, float, float]]:
+        """Get the route's (strategy, limit, window, cached until), reading Redis when stale."""
+        config = self._route_configs.get(route)
+        if config is not None and config[3] > current_time:
+            return config
+        
+        stored = self.redis.hgetall(f"{self.keys.route_config_prefix}{route}")
+        if not stored:
+            # Not registered yet; the script path registers it
+            return None
+        
+        strategy = self._route_strategies[route] = stored.get("strategy", self.default_strategy.name)
+        config = (
+            strategy,
+            int(stored.get("limit", self.default_limit)),
+            float(stored.get("window", self.default_window)),
+            current_time + self.config_cache_ttl
+        )
+        if len(self._route_configs) >= KNOWN_CACHE_SIZE:
+            # Start over rather than evicting one by one
+            self._route_configs = {}
+        self._route_configs[route] = config
+        return config
+    
+    def _check_fixed_window(self, client_id: str, route: str) -> Optional[bool]:
+        """
+        Decide a FIXED_WINDOW request with INCR on a key per window, without a script.
+        
+        The counter key expires a window after its first increment, so old
+        windows never need cleaning up.
+        
+        Returns:
+            Optional[bool]: Whether the request is allowed, or None if the
+                            route does not use FIXED_WINDOW or is not
+                            registered yet
+        """
+        current_time = self.clock.now()
+        config = self._route_config(route, current_time)
+        if config is None or config[0] != "FIXED_WINDOW":
+            return None
+        
+        _, limit, window, _ = config
+        window_index = int(current_time // window)
+        key = self.keys.fixed_window_key(client_id, route, window_index)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.incr(key)
+        pipe.expire(key, math.ceil(window) + 1, nx=True)
+        count = pipe.execute()[0]
+        
+        allowed = count <= limit
+        self._record(client_id, route, allowed)
+        if not allowed:
+            retry_after = (window_index + 1) * window - current_time
+            self._block(client_id, route, -math.ceil(retry_after * 1000), current_time)
+        return allowed
+    
+    def _check_leased(self, client_id: str, route: str) -> Optional[bool]:
+        """
+        Decide a TOKEN_BUCKET request from a local lease, renewing it if needed.
+        
+        Returns:
+            Optional[bool]: Whether the request is allowed, or None if the
+                            route no longer uses TOKEN_BUCKET
+        """
+        key = (route, client_id)
+        current_time = self.clock.now()
+        
+        with self._lease_lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[0] >= 1 and lease[1] > current_time:
+                lease[0] -= 1
+                self._lease_stats["local_decisions"] += 1
+                leased = True
+            else:
+                leased = False
+                if lease is not None:
+                    del self._leases[key]
+                self._lease_stats["lease_requests"] += 1
+        if leased:
+            self._record(client_id, route, True)
+            return True
+        
+        # Give back what is left of the old lease while asking for a new one
+        returned = lease[0] if lease is not None else 0
+        keys, args = self._check_call(client_id, route, current_time)
+        granted = self._lease_script(keys=keys, args=args + [self.lease_fraction, returned])
+        
+        if isinstance(granted, list):
+            # The route moved to another strategy; the old lease is dropped
+            self._route_strategies[route] = granted[1]
+            return None
+        
+        self._remember(route)
+        self._record(client_id, route, granted > 0)
+        if granted <= 0:
+            self._block(client_id, route, granted, current_time)
+            return False
+        
+        with self._lease_lock:
+            lease = self._leases.get(key)
+            if lease is None:
+                self._leases[key] = [granted - 1, current_time + self.lease_ttl]
+            else:
+                # Another thread renewed concurrently; pool the tokens
+                lease[0] += granted - 1
+        return True
+    
+    def release_leases(self, expired_only: bool = False):
+        """
+        Return unused leased tokens to Redis.
+        
+        Args:
+            expired_only: Only release leases past their expiry time
+        """
+        current_time = self.clock.now()
+        with self._lease_lock:
+            released = [
+                (key, lease) for key, lease in self._leases.items()
+                if not expired_only or lease[1] <= current_time
+            ]
+            for key, _ in released:
+                del self._leases[key]
+        
+        if not released:
+            return
+        
+        pipe = self.redis.pipeline(transaction=False)
+        for (route, client_id), lease in released:
+            keys, args = self._check_call(client_id, route, current_time)
+            self._lease_script(keys=keys, args=args + [0, lease[0]], client=pipe)
+        pipe.execute()
+    
+    def get_lease_stats(self) -> Dict[str, int]:
+        """
+        Get this instance's lease counters.
+        
+        Returns:
+            Dict[str, int]: Requests decided locally, requests that went to
+                            Redis for a lease, and leases currently held
+        """
+        with self._lease_lock:
+            return dict(self._lease_stats, active_leases=len(self._leases))
+    
+    def check_requests_batch(self, requests: Sequence[Tuple[str, str]]) -> List[bool]:
+        """
+        Check many requests in a single pipelined round trip.
+        
+        Requests are evaluated in order, each by its own EVALSHA, so the
+        decisions are the same as calling `check_request` for each of them.
+        With `fixed_window_fast_path`, FIXED_WINDOW items use the same
+        INCR and EXPIRE NX counters as `check_request`, queued in the same
+        pipeline. Items whose script is missing on the server or whose route
+        changed strategy count nothing and are retried in another round
+        trip. Pairs in the negative cache are rejected without being sent.
+        
+        Args:
+            requests: (client_id, route) pairs
+        
+        Returns:
+            List[bool]: Whether each request is allowed; requests left
+                        undecided by an error fail open
+        """
+        current_time = self.clock.now()
+        strategies = [self._route_strategies.get(route, self.default_strategy.name) for _, route in requests]
+        # None until decided; undecided requests fail open, but decisions
+        # already recorded in the stats are kept even if the batch fails
+        results: List[Optional[bool]] = [None] * len(requests)
+        pending = list(range(len(requests)))
+        if self.negative_cache:
+            pending = []
+            for index, (client_id, route) in enumerate(requests):
+                if self._is_blocked(client_id, route, current_time):
+                    results[index] = False
+                else:
+                    pending.append(index)
+            if not pending:
+                return results
+        
+        try:
+            # Must count on the same keys as check_request, or mixing the
+            # two entry points would keep two counters per client
+            fast = []
+            if self.fixed_window_fast_path:
+                scripted = []
+                for index in pending:
+                    config = self._route_config(requests[index][1], current_time)
+                    if config is not None and config[0] == "FIXED_WINDOW":
+                        fast.append((index, config[1], config[2]))
+                    else:
+                        scripted.append(index)
+                pending = scripted
+            
+            # Retries happen at most once for flushed scripts and once for a
+            # changed strategy
+            for _ in range(3):
+                # Plain EVALSHA rather than Script objects, which would add a
+                # SCRIPT EXISTS round trip to every pipeline
+                pipe = self.redis.pipeline(transaction=False)
+                for index, _, window in fast:
+                    client_id, route = requests[index]
+                    key = self.keys.fixed_window_key(client_id, route, int(current_time // window))
+                    pipe.incr(key)
+                    pipe.expire(key, math.ceil(window) + 1, nx=True)
+                for index in pending:
+                    client_id, route = requests[index]
+                    keys, args = self._check_call(client_id, route, current_time)
+                    pipe.evalsha(self._scripts[strategies[index]].sha, len(keys), *keys, *args)
+                replies = pipe.execute(raise_on_error=False)
+                
+                for (index, limit, window), count in zip(fast, replies[::2]):
+                    if isinstance(count, Exception):
+                        logging.error(f"Error checking rate limit: {count}")
+                        continue
+                    client_id, route = requests[index]
+                    results[index] = count <= limit
+                    self._record(client_id, route, count <= limit)
+                    if count > limit:
+                        retry_after = (int(current_time // window) + 1) * window - current_time
+                        self._block(client_id, route, -math.ceil(retry_after * 1000), current_time)
+                replies = replies[2 * len(fast):]
+                fast = []
+                
+                retry = []
+                missing = False
+                for index, reply in zip(pending, replies):
+                    if isinstance(reply, NoScriptError):
+                        missing = True
+                        retry.append(index)
+                    elif isinstance(reply, list):
+                        strategies[index] = self._route_strategies[requests[index][1]] = reply[1]
+                        retry.append(index)
+                    elif isinstance(reply, Exception):
+                        logging.error(f"Error checking rate limit: {reply}")
+                    else:
+                        results[index] = reply > 0
+                        self._record(requests[index][0], requests[index][1], reply > 0)
+                        self._block(requests[index][0], requests[index][1], reply, current_time)
+                
+                if not retry:
+                    break
+                if missing:
+                    # Load every script, so a strategy change discovered in
+                    # the retry does not hit a missing script again
+                    pipe = self.redis.pipeline(transaction=False)
+                    for source in CHECK_SCRIPTS.values():
+                        pipe.script_load(source)
+                    pipe.execute()
+                pending = retry
+        except Exception as e:
+            logging.error(f"Error checking rate limit batch: {e}")
+            return [True if result is None else result for result in results]
+        
+        for _, route in requests:
+            self._remember(route)
+        return [True if result is None else result for result in results]
     
     def _ensure_route(self, route: str):
+        if route in self._known_routes:
+            return
+        
         if not self.redis.sismember(self.keys.routes_key, route):
             self.redis.sadd(self.keys.routes_key, route)
             
@@ -433,17 +1259,20 @@ class DistributedAdaptiveShield:
                 "window": self.default_window,
                 "strategy": self.default_strategy.name
             })
+        
+        remember_known(self._known_routes, route)
     
     def _ensure_client(self, client_id: str):
-        if not self.redis.sismember(self.keys.clients_key, client_id):
-            self.redis.sadd(self.keys.clients_key, client_id)
-            
-            client_stats_key = f"{self.keys.client_stats_prefix}{client_id}"
+        if self.redis.zscore(self.keys.clients_key, client_id) is None:
+            self.redis.zadd(self.keys.clients_key, {client_id: self.clock.now()})
+        
+            client_stats_key = self.keys.client_stats_key(client_id)
             self.redis.hset(client_stats_key, mapping={
                 "total_requests": 0,
                 "allowed_requests": 0,
                 "rejected_requests": 0
             })
+            self.redis.expire(client_stats_key, self.client_ttl)
     
     def set_route_limit(
         self, 
@@ -460,10 +1289,11 @@ class DistributedAdaptiveShield:
             "window": window,
             "strategy": strategy.name
         })
+        self._route_strategies[route] = strategy.name
+        self._route_configs.pop(route, None)
     
     def get_global_stats(self) -> Dict[str, int]:
-        stats = self.redis.hgetall(self.keys.global_stats_key)
-        return {k: int(v) for k, v in stats.items()}
+        return self._read_stats(self.keys.global_stats_key)
     
     def get_route_stats(self, route: str) -> Dict[str, Any]:
         self._ensure_route(route)
@@ -471,7 +1301,7 @@ class DistributedAdaptiveShield:
         route_stats_key = f"{self.keys.route_stats_prefix}{route}"
         route_config_key = f"{self.keys.route_config_prefix}{route}"
         
-        stats = self.redis.hgetall(route_stats_key)
+        stats = self._read_stats(route_stats_key)
         config = self.redis.hgetall(route_config_key)
         
         result = {
@@ -489,9 +1319,9 @@ class DistributedAdaptiveShield:
     
     def get_client_stats(self, client_id: str) -> Dict[str, int]:
         self._ensure_client(client_id)
+        self.flush_local_stats()
         
-        client_stats_key = f"{self.keys.client_stats_prefix}{client_id}"
-        stats = self.redis.hgetall(client_stats_key)
+        stats = self.redis.hgetall(self.keys.client_stats_key(client_id))
         
         return {k: int(v) for k, v in stats.items()}
     
@@ -499,9 +1329,13 @@ class DistributedAdaptiveShield:
         return list(self.redis.smembers(self.keys.routes_key))
     
     def get_all_clients(self) -> List[str]:
-        return list(self.redis.smembers(self.keys.clients_key))
+        return self.redis.zrange(self.keys.clients_key, 0, -1)
     
     def reset_stats(self):
+        with self._local_lock:
+            self._local_decisions = {}
+        shards = self.redis.smembers(self.keys.stats_shards_key)
+        
         self.redis.hset(self.keys.global_stats_key, mapping={
             "total_requests": 0,
             "allowed_requests": 0,
@@ -515,15 +1349,352 @@ class DistributedAdaptiveShield:
                 "allowed_requests": 0,
                 "rejected_requests": 0
             })
+            if shards:
+                self.redis.delete(*sharded_stats_keys(route_stats_key, shards)[1:])
         
-        for client_id in self.redis.smembers(self.keys.clients_key):
-            client_stats_key = f"{self.keys.client_stats_prefix}{client_id}"
+        if shards:
+            self.redis.delete(*sharded_stats_keys(self.keys.global_stats_key, shards)[1:])
+        
+        for client_id in self.redis.zrange(self.keys.clients_key, 0, -1):
+            client_stats_key = self.keys.client_stats_key(client_id)
             self.redis.hset(client_stats_key, mapping={
                 "total_requests": 0,
                 "allowed_requests": 0,
                 "rejected_requests": 0
             })
+            self.redis.expire(client_stats_key, self.client_ttl)
+
+
+class AsyncDistributedAdaptiveShield:
+    """
+    Asyncio variant of DistributedAdaptiveShield backed by `redis.asyncio`.
+    
+    It shares the Redis layout and the check scripts with the synchronous
+    shield, so both can serve the same namespace. Redis round trips are
+    awaited instead of blocking the event loop, and adaptation runs as an
+    asyncio task. Works with `adaptive_shield.RateLimitMiddleware`.
+    """
+    
+    def __init__(
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_db: int = 0,
+        redis_password: Optional[str] = None,
+        namespace: str = "adaptive_shield",
+        default_limit: int = 100,
+        default_window: int = 60,
+        default_strategy: RateLimitStrategy = RateLimitStrategy.TOKEN_BUCKET,
+        monitor_interval: int = 10,
+        auto_adapt: bool = False,
+        clock: Optional[Clock] = None,
+        client_ttl: int = 86400,
+        compact_keys: bool = False,
+        route_hash: bool = False,
+        stats_flush_interval: float = 0.1,
+        stats_shard: Optional[str] = None
+    ):
+        self.redis = aioredis.Redis(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            password=redis_password,
+            decode_responses=True
+        )
+        self.keys = RedisKeys(namespace, compact_keys, route_hash)
+        self.client_ttl = client_ttl
+        self.default_limit = default_limit
+        self.default_window = default_window
+        self.default_strategy = default_strategy
+        self.monitor_interval = monitor_interval
+        self.auto_adapt = auto_adapt
+        self.clock = clock or WallClock()
+        self._scripts = {
+            strategy: self.redis.register_script(source)
+            for strategy, source in CHECK_SCRIPTS.items()
+        }
+        self._route_strategies: Dict[str, str] = {}
+        self._known_routes: Set[str] = set()
+        self._monitor_task: Optional[asyncio.Task] = None
+        # Decisions counted for the next stats flush, as in the sync shield
+        # (route, client_id) -> [allowed, rejected]
+        self.stats_flush_interval = stats_flush_interval
+        self.stats_shard = stats_shard
+        self._local_decisions: Dict[Tuple[str, str], List[int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Created on first use, inside the event loop it belongs to
+        self._flush_lock: Optional[asyncio.Lock] = None
+        # When each rejected (route, client_id) pair may retry, from the
+        # scripts' -milliseconds results; only used for Retry-After
+        self._retry_until: Dict[Tuple[str, str], float] = {}
+    
+    async def start(self):
+        await self._initialize_redis()
+        
+        if self.auto_adapt and self._monitor_task is None:
+            self._monitor_task = asyncio.get_running_loop().create_task(self._monitor_loop())
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def close(self):
+        for task in (self._monitor_task, self._flush_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._monitor_task = None
+        self._flush_task = None
+        
+        try:
+            await self.flush_local_stats()
+        except Exception as e:
+            logging.error(f"Error flushing local stats: {e}")
+        await self.redis.close()
+    
+    async def _initialize_redis(self):
+        if not await self.redis.exists(self.keys.global_stats_key):
+            await self.redis.hset(self.keys.global_stats_key, mapping={
+                "total_requests": 0,
+                "allowed_requests": 0,
+                "rejected_requests": 0
+            })
+        
+        if not await self.redis.exists(self.keys.routes_key):
+            await self.redis.sadd(self.keys.routes_key, "/")
+            
+        if not await self.redis.exists(self.keys.clients_key):
+            await self.redis.zadd(self.keys.clients_key, {"default": self.clock.now()})
+    
+    async def _monitor_loop(self):
+        while True:
+            await asyncio.sleep(self.monitor_interval)
+            try:
+                await self._monitor_and_adapt()
+            except Exception as e:
+                logging.error(f"Error in monitor task: {e}")
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.stats_flush_interval)
+            try:
+                await self.flush_local_stats()
+            except Exception as e:
+                logging.error(f"Error flushing local stats: {e}")
+    
+    async def flush_local_stats(self):
+        """Add the requests decided since the last flush to the Redis stats in one pipeline."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            decisions = self._local_decisions
+            if not decisions:
+                return
+            self._local_decisions = {}
             
+            pipe = self.redis.pipeline(transaction=False)
+            queue_stats_flush(pipe, self.keys, decisions, self.stats_shard, self.client_ttl, self.clock.now())
+            await pipe.execute()
+    
+    async def _read_stats(self, stats_key: str) -> Dict[str, int]:
+        """Read a stats hash, flushing local counts first and summing the shards."""
+        await self.flush_local_stats()
+        shards = await self.redis.smembers(self.keys.stats_shards_key)
+        pipe = self.redis.pipeline(transaction=False)
+        for key in sharded_stats_keys(stats_key, shards):
+            pipe.hgetall(key)
+        return merge_stats(await pipe.execute())
+    
+    async def _monitor_and_adapt(self):
+        for route in await self.redis.smembers(self.keys.routes_key):
+            stats_key = f"{self.keys.route_stats_prefix}{route}"
+            config_key = f"{self.keys.route_config_prefix}{route}"
+            auto_adapt_key = f"{self.keys.auto_adapt_prefix}{route}"
+            
+            stats = await self._read_stats(stats_key)
+            config = await self.redis.hgetall(config_key)
+            
+            if not stats or not config:
+                continue
+                
+            total = int(stats.get("total_requests", 0))
+            rejected = int(stats.get("rejected_requests", 0))
+            
+            if total == 0:
+                continue
+                
+            rejection_rate = rejected / total
+            
+            history = [float(r) for r in await self.redis.lrange(auto_adapt_key, 0, -1)]
+            
+            if len(history) >= 10:
+                await self.redis.ltrim(auto_adapt_key, -9, -1)
+            
+            await self.redis.rpush(auto_adapt_key, rejection_rate)
+            
+            if len(history) < 3:
+                continue
+                
+            avg_rejection = sum(history) / len(history)
+            current_limit = int(config.get("limit", self.default_limit))
+            
+            if avg_rejection > 0.2 and rejection_rate > 0.25:
+                new_limit = int(current_limit * 1.2)
+                await self.redis.hset(config_key, "limit", new_limit)
+                logging.info(f"Auto-adapted {route}: increased limit from {current_limit} to {new_limit}")
+                
+            elif avg_rejection < 0.05 and rejection_rate < 0.03:
+                new_limit = max(10, int(current_limit * 0.9))
+                await self.redis.hset(config_key, "limit", new_limit)
+                logging.info(f"Auto-adapted {route}: decreased limit from {current_limit} to {new_limit}")
+    
+    def _check_call(
+        self, client_id: str, route: str, current_time: float
+    ) -> Tuple[List[str], List[Any]]:
+        """Keys and arguments passed to the check scripts, in the order they expect."""
+        keys = self.keys.check_request_keys(client_id, route)
+        args = [
+            current_time,
+            client_id,
+            route,
+            self.default_strategy.name,
+            self.default_limit,
+            self.default_window,
+            1 if route in self._known_routes else 0,
+            self.client_ttl,
+            self.keys.counter_field_prefix(client_id)
+        ]
+        return keys, args
+    
+    async def check_request(self, client_id: str, route: str) -> bool:
+        current_time = self.clock.now()
+        
+        try:
+            strategy = self._route_strategies.get(route, self.default_strategy.name)
+            keys, args = self._check_call(client_id, route, current_time)
+            result = await self._scripts[strategy](keys=keys, args=args)
+            
+            if isinstance(result, list):
+                strategy = self._route_strategies[route] = result[1]
+                keys, args = self._check_call(client_id, route, current_time)
+                result = await self._scripts[strategy](keys=keys, args=args)
+            
+            if route not in self._known_routes:
+                remember_known(self._known_routes, route)
+            
+            counts = self._local_decisions.get((route, client_id))
+            if counts is None:
+                counts = self._local_decisions[(route, client_id)] = [0, 0]
+            counts[0 if result > 0 else 1] += 1
+            if result < 0:
+                if len(self._retry_until) >= NEGATIVE_CACHE_SIZE:
+                    # Start over rather than evicting one by one
+                    self._retry_until = {}
+                self._retry_until[(route, client_id)] = current_time - result / 1000
+            return result > 0
+        except Exception as e:
+            logging.error(f"Error checking rate limit: {e}")
+            return True
+    
+    async def get_retry_after(self, client_id: str, route: str) -> float:
+        """
+        Estimate how long a rejected client should wait, without reading stats.
+        
+        Uses the retry time of the pair's last rejection when it is still
+        ahead, and otherwise the route's configured window.
+        
+        Returns:
+            float: Seconds until the client should retry
+        """
+        current_time = self.clock.now()
+        until = self._retry_until.get((route, client_id))
+        if until is not None and until > current_time:
+            return until - current_time
+        
+        try:
+            window = await self.redis.hget(f"{self.keys.route_config_prefix}{route}", "window")
+        except Exception as e:
+            logging.error(f"Error reading route config: {e}")
+            window = None
+        return float(window) if window is not None else float(self.default_window)
+    
+    async def _ensure_route(self, route: str):
+        if route in self._known_routes:
+            return
+        
+        if not await self.redis.sismember(self.keys.routes_key, route):
+            await self.redis.sadd(self.keys.routes_key, route)
+            
+            await self.redis.hset(f"{self.keys.route_stats_prefix}{route}", mapping={
+                "total_requests": 0,
+                "allowed_requests": 0,
+                "rejected_requests": 0
+            })
+            
+            await self.redis.hset(f"{self.keys.route_config_prefix}{route}", mapping={
+                "limit": self.default_limit,
+                "window": self.default_window,
+                "strategy": self.default_strategy.name
+            })
+        
+        remember_known(self._known_routes, route)
+    
+    async def _ensure_client(self, client_id: str):
+        if await self.redis.zscore(self.keys.clients_key, client_id) is None:
+            await self.redis.zadd(self.keys.clients_key, {client_id: self.clock.now()})
+        
+            client_stats_key = self.keys.client_stats_key(client_id)
+            await self.redis.hset(client_stats_key, mapping={
+                "total_requests": 0,
+                "allowed_requests": 0,
+                "rejected_requests": 0
+            })
+            await self.redis.expire(client_stats_key, self.client_ttl)
+    
+    async def set_route_limit(
+        self, 
+        route: str, 
+        limit: int, 
+        window: int, 
+        strategy: RateLimitStrategy
+    ):
+        await self._ensure_route(route)
+        
+        await self.redis.hset(f"{self.keys.route_config_prefix}{route}", mapping={
+            "limit": limit,
+            "window": window,
+            "strategy": strategy.name
+        })
+        self._route_strategies[route] = strategy.name
+    
+    async def get_global_stats(self) -> Dict[str, int]:
+        return await self._read_stats(self.keys.global_stats_key)
+    
+    async def get_route_stats(self, route: str) -> Dict[str, Any]:
+        await self._ensure_route(route)
+        
+        stats = await self._read_stats(f"{self.keys.route_stats_prefix}{route}")
+        config = await self.redis.hgetall(f"{self.keys.route_config_prefix}{route}")
+        
+        return {
+            "total_requests": int(stats.get("total_requests", 0)),
+            "allowed_requests": int(stats.get("allowed_requests", 0)),
+            "rejected_requests": int(stats.get("rejected_requests", 0)),
+            "config": {
+                "limit": int(config.get("limit", self.default_limit)),
+                "window": int(config.get("window", self.default_window)),
+                "strategy": config.get("strategy", self.default_strategy.name)
+            }
+        }
+    
+    async def get_client_stats(self, client_id: str) -> Dict[str, int]:
+        await self._ensure_client(client_id)
+        await self.flush_local_stats()
+        
+        stats = await self.redis.hgetall(self.keys.client_stats_key(client_id))
+        return {k: int(v) for k, v in stats.items()}
+
 
 shield = DistributedAdaptiveShield(
     redis_host="localhost",
@@ -570,9 +1741,8 @@ def rate_limit(f: Callable) -> Callable:
             })
             response.status_code = 429
             
-            stats = shield.get_route_stats(route)
-            retry_after = max(1, min(60, stats["config"]["limit"] * 100))
-            response.headers["Retry-After"] = str(int(retry_after))
+            retry_after = max(1, min(60, math.ceil(shield.get_retry_after(client_id, route))))
+            response.headers["Retry-After"] = str(retry_after)
             
             return response
         
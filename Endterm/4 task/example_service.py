@@ -1,19 +1,20 @@
 import time
 import uuid
+import asyncio
 import uvicorn
 from typing import Dict, Any, Optional
-from fastapi import FastAPI, Request, Response, Depends, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
-from adaptive_shield import AdaptiveShield, RateLimitStrategy
+from adaptive_shield import AsyncAdaptiveShield, RateLimitMiddleware, RateLimitStrategy, RouteNormalizer
 
-shield = AdaptiveShield(
+shield = AsyncAdaptiveShield(
     default_limit=100,
     default_window=60,
     default_strategy=RateLimitStrategy.TOKEN_BUCKET,
     monitor_interval=10,
-    auto_adapt=True
+    auto_adapt=True,
+    route_normalizer=RouteNormalizer(max_routes=1000)
 )
 
 shield.set_route_limit("/api/public", 200, 60, RateLimitStrategy.SLIDING_WINDOW)
@@ -34,34 +35,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-async def get_client_id(request: Request) -> str:
-    api_key = request.headers.get("X-API-Key")
-    if api_key:
-        return api_key
-    
-    client_host = request.client.host if request.client else "unknown"
-    return f"ip:{client_host}"
-
-async def check_rate_limit(
-    request: Request,
-    client_id: str = Depends(get_client_id)
-) -> str:
-    route = request.url.path
-    
-    allowed = shield.check_request(client_id, route)
-    
-    if not allowed:
-        raise HTTPException(
-            status_code=429,
-            detail={
-                "error": "Too Many Requests",
-                "message": "Rate limit exceeded. Please slow down your requests.",
-                "client_id": client_id,
-                "route": route
-            }
-        )
-    
-    return client_id
+app.add_middleware(RateLimitMiddleware, shield=shield, path_prefixes=["/api/"])
+
+@app.on_event("startup")
+async def start_shield():
+    await shield.start()
+
+@app.on_event("shutdown")
+async def stop_shield():
+    await shield.close()
 
 @app.get("/")
 async def root():
@@ -75,9 +57,9 @@ async def root():
         ]
     }
 
-@app.get("/api/public", dependencies=[Depends(check_rate_limit)])
+@app.get("/api/public")
 async def public_endpoint():
-    time.sleep(0.01)
+    await asyncio.sleep(0.01)
     return {
         "message": "This is a public endpoint with higher rate limit (200 requests/min)",
         "data": {
@@ -86,9 +68,9 @@ async def public_endpoint():
         }
     }
 
-@app.get("/api/users", dependencies=[Depends(check_rate_limit)])
+@app.get("/api/users")
 async def users_endpoint():
-    time.sleep(0.05)
+    await asyncio.sleep(0.05)
     return {
         "message": "This is a users endpoint with medium rate limit (50 requests/min)",
         "data": {
@@ -97,9 +79,9 @@ async def users_endpoint():
         }
     }
 
-@app.get("/api/admin", dependencies=[Depends(check_rate_limit)])
+@app.get("/api/admin")
 async def admin_endpoint():
-    time.sleep(0.1)
+    await asyncio.sleep(0.1)
     return {
         "message": "This is an admin endpoint with low rate limit (20 requests/min)",
         "data": {
@@ -129,13 +111,5 @@ async def route_stats(route: str):
     
     return shield.get_route_stats(route)
 
-@app.exception_handler(429)
-async def rate_limit_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
-        status_code=429,
-        content=exc.detail,
-        headers={"Retry-After": "60"}
-    )
-
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
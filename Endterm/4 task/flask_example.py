@@ -1,3 +1,4 @@
+import math
 import time
 import uuid
 import json
@@ -7,7 +8,7 @@ from typing import Dict, Any, Optional, Callable, List
 from flask import Flask, request, jsonify, g, Response
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from adaptive_shield import AdaptiveShield, RateLimitStrategy
+from adaptive_shield import AdaptiveShield, RateLimitStrategy, RouteNormalizer
 
 shield = AdaptiveShield(
     default_limit=100,
@@ -15,7 +16,8 @@ shield = AdaptiveShield(
     default_strategy=RateLimitStrategy.TOKEN_BUCKET,
     monitor_interval=10,
     metrics_retention=3600,
-    auto_adapt=True
+    auto_adapt=True,
+    route_normalizer=RouteNormalizer(max_routes=1000)
 )
 
 shield.set_route_limit("/api/public", 200, 60, RateLimitStrategy.SLIDING_WINDOW)
@@ -58,9 +60,10 @@ def rate_limit(f: Callable) -> Callable:
             })
             response.status_code = 429
             
-            stats = shield.get_client_stats(client_id)
-            retry_after = stats.get("time_until_reset", 60)
-            response.headers["Retry-After"] = str(int(retry_after))
+            retry_after = shield.get_retry_after(client_id, route)
+            if retry_after is None:
+                retry_after = 60
+            response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
             
             return response
         
@@ -173,6 +176,11 @@ def get_strategy_description(strategy: RateLimitStrategy) -> str:
             "consistent average rate. Each request consumes one token, and tokens "
             "are replenished at a constant rate."
         ),
+        RateLimitStrategy.GCRA: (
+            "Generic Cell Rate Algorithm - Same burst behaviour as the token bucket "
+            "but stores a single timestamp per client, and reports the exact time "
+            "until the next request will be allowed."
+        ),
         RateLimitStrategy.SLIDING_WINDOW: (
             "Sliding Window Counter - Divides time into discrete windows and counts "
             "requests in each window. Provides more accurate counting than fixed windows "